@@ -1,20 +1,36 @@
 """HR Process Mining Tool - Backend (v5)"""
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Header, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 from typing import Optional
+import asyncio
+import json
 import logging
+import os
 import time
+from contextlib import asynccontextmanager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-app = FastAPI(title="Process Coaching AI 베타버전")
+
+try:
+    from .fast_json import FastJSONResponse, dumps as json_dumps
+    from .wire_format import FlowIngestRoute
+except ImportError:
+    from fast_json import FastJSONResponse, dumps as json_dumps
+    from wire_format import FlowIngestRoute
+
+# orjson 기반 기본 응답 + dict 반환 엔드포인트는 jsonable_encoder 생략
+app = FastAPI(title="Process Coaching AI 베타버전", default_response_class=FastJSONResponse)
+app.router.route_class = FlowIngestRoute
 
 # Import CORS configuration
 try:
-    from .env_config import ALLOWED_ORIGINS
+    from .env_config import ALLOWED_ORIGINS, USE_MOCK
 except ImportError:
-    from env_config import ALLOWED_ORIGINS
+    from env_config import ALLOWED_ORIGINS, USE_MOCK
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,24 +51,69 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 try:
-    from .schemas import ReviewRequest, ChatRequest, ValidateL7Request, ContextualSuggestRequest, CategorizeNodesRequest
-    from .llm_service import check_llm, call_llm, close_http_client, get_llm_debug_status
-    from .chat_orchestrator import orchestrate_chat, get_chain_status, _classify_intent
-    from .prompt_templates import REVIEW_SYSTEM, COACH_TEMPLATE, CONTEXTUAL_SUGGEST_SYSTEM, FIRST_SHAPE_SYSTEM, PDD_ANALYSIS, PDD_INSIGHTS_SYSTEM, KNOWLEDGE_PROMPT, CATEGORIZE_PROMPT, INTERVIEW_START_SYSTEM, FLOW_OVERVIEW_SYSTEM
+    from .schemas import ReviewRequest, ChatRequest, ValidateL7Request, ContextualSuggestRequest, CategorizeNodesRequest, AnalyzeAllRequest, JobSubmitRequest
+    from .schemas import ValidateL7Response, ReviewResponse, CategorizeNodesResponse
+    from .llm_service import check_llm, call_llm, close_http_client, get_http_client, warm_llm_connections, get_llm_debug_status, get_circuit_status, resolve_schema_mode
+    from .chat_orchestrator import orchestrate_chat, get_chain_status, _classify_intent, build_intent_matchers, provisional_answer, CHAT_PROGRESSIVE
+    from .prompt_templates import REVIEW_SYSTEM, COACH_TEMPLATE, CONTEXTUAL_SUGGEST_SYSTEM, FIRST_SHAPE_SYSTEM, PDD_ANALYSIS, PDD_INSIGHTS_SYSTEM, KNOWLEDGE_PROMPT, CATEGORIZE_PROMPT, INTERVIEW_START_SYSTEM, FLOW_OVERVIEW_SYSTEM, SUGGEST_PHASES_SYSTEM
     from .flow_services import describe_flow, mock_review, mock_validate
-    from .l345_reference import get_l345_context
+    from .l345_reference import get_l345_parts, find_l3_for_l4, build_indexes as build_l345_indexes
+    from .l7_rule_engine import get_rule_engine
+    from .metrics import record_fallback, render_prometheus
+    from .profiling import ServerTimingMiddleware, get_slow_requests
+    from .compression import CompressionMiddleware
+    from .disconnect import DisconnectCancelMiddleware
+    from .loop_monitor import loop_monitor
+    from .prompt_assembler import assemble_prompt, get_prefix_cache_status
+    from .prompt_registry import get_prompt_registry
+    from .response_cache import get_cache, load_snapshot, save_snapshot, get_cache_status
+    from .shared_state import get_store, acquire_lease, release_lease
+    from .warmup import WARMUP_SNAPSHOT, WARMUP_TTL, WARMUP_LEASE_SEC, WARMUP_CONCURRENCY, WARMUP_HOUR, WARMUP_ON_STARTUP, standard_contexts, warm_up, run_daily
+    from .flow_chunking import should_chunk, chunk_flow, map_chunks, merge_categorizations, merge_pdd_insights
+    from .job_queue import JOB_MAX_BATCH, QueueFull, get_job_queue
+    from .question_cache import get_knowledge_cache
+    from .knowledge_retrieval import get_knowledge_index
+    from .latest_wins import Superseded, latest_wins, get_latest_wins_status
 except ImportError:
-    from schemas import ReviewRequest, ChatRequest, ValidateL7Request, ContextualSuggestRequest, CategorizeNodesRequest
-    from llm_service import check_llm, call_llm, close_http_client, get_llm_debug_status
-    from chat_orchestrator import orchestrate_chat, get_chain_status, _classify_intent
-    from prompt_templates import REVIEW_SYSTEM, COACH_TEMPLATE, CONTEXTUAL_SUGGEST_SYSTEM, FIRST_SHAPE_SYSTEM, PDD_ANALYSIS, PDD_INSIGHTS_SYSTEM, KNOWLEDGE_PROMPT, CATEGORIZE_PROMPT, INTERVIEW_START_SYSTEM, FLOW_OVERVIEW_SYSTEM
+    from schemas import ReviewRequest, ChatRequest, ValidateL7Request, ContextualSuggestRequest, CategorizeNodesRequest, AnalyzeAllRequest, JobSubmitRequest
+    from schemas import ValidateL7Response, ReviewResponse, CategorizeNodesResponse
+    from llm_service import check_llm, call_llm, close_http_client, get_http_client, warm_llm_connections, get_llm_debug_status, get_circuit_status, resolve_schema_mode
+    from chat_orchestrator import orchestrate_chat, get_chain_status, _classify_intent, build_intent_matchers, provisional_answer, CHAT_PROGRESSIVE
+    from prompt_templates import REVIEW_SYSTEM, COACH_TEMPLATE, CONTEXTUAL_SUGGEST_SYSTEM, FIRST_SHAPE_SYSTEM, PDD_ANALYSIS, PDD_INSIGHTS_SYSTEM, KNOWLEDGE_PROMPT, CATEGORIZE_PROMPT, INTERVIEW_START_SYSTEM, FLOW_OVERVIEW_SYSTEM, SUGGEST_PHASES_SYSTEM
     from flow_services import describe_flow, mock_review, mock_validate
-    from l345_reference import get_l345_context
-
-
-# ── 인터뷰 응답 TTL 캐시 (동일 컨텍스트 반복 호출 방지, TTL=5분) ──
-_INTERVIEW_CACHE: dict[str, tuple[float, dict]] = {}
-_INTERVIEW_CACHE_TTL = 300  # seconds
+    from l345_reference import get_l345_parts, find_l3_for_l4, build_indexes as build_l345_indexes
+    from l7_rule_engine import get_rule_engine
+    from metrics import record_fallback, render_prometheus
+    from profiling import ServerTimingMiddleware, get_slow_requests
+    from compression import CompressionMiddleware
+    from disconnect import DisconnectCancelMiddleware
+    from loop_monitor import loop_monitor
+    from prompt_assembler import assemble_prompt, get_prefix_cache_status
+    from prompt_registry import get_prompt_registry
+    from response_cache import get_cache, load_snapshot, save_snapshot, get_cache_status
+    from shared_state import get_store, acquire_lease, release_lease
+    from warmup import WARMUP_SNAPSHOT, WARMUP_TTL, WARMUP_LEASE_SEC, WARMUP_CONCURRENCY, WARMUP_HOUR, WARMUP_ON_STARTUP, standard_contexts, warm_up, run_daily
+    from flow_chunking import should_chunk, chunk_flow, map_chunks, merge_categorizations, merge_pdd_insights
+    from job_queue import JOB_MAX_BATCH, QueueFull, get_job_queue
+    from question_cache import get_knowledge_cache
+    from knowledge_retrieval import get_knowledge_index
+    from latest_wins import Superseded, latest_wins, get_latest_wins_status
+
+# LLM을 호출하는 엔드포인트 — 응답 전에 클라이언트가 떠나면 처리(업스트림 호출·재시도·curl)를 취소한다
+_LLM_PATHS = ("/api/review", "/api/pdd-insights", "/api/analyze-pdd", "/api/analyze-all", "/api/chat", "/api/chat/stream",
+              "/api/contextual-suggest", "/api/first-shape-welcome", "/api/interview-start",
+              "/api/categorize-nodes", "/api/suggest-phases")
+app.add_middleware(DisconnectCancelMiddleware, paths=_LLM_PATHS)
+# 요청/응답 압축 — ServerTimingMiddleware 안쪽에 있어야 압축 CPU 시간이 Server-Timing에 들어간다
+app.add_middleware(CompressionMiddleware)
+# 구간별 타이밍(Server-Timing 헤더) — CORS보다 바깥에서 전체 처리 시간을 잰다
+app.add_middleware(ServerTimingMiddleware)
+
+
+# ── 컨텍스트 기반 응답 TTL 캐시 (동일 컨텍스트 반복 호출 방지, TTL=5분 / 워밍업 항목은 WARMUP_TTL) ──
+# 키 앞에 응답을 만든 템플릿 버전을 붙인다 — 템플릿을 고치면 해당 캐시 항목만 무효화
+_interview_cache = get_cache("interview", ttl=300, version=get_prompt_registry().cache_version("interview-start"))
+_phases_cache = get_cache("suggest-phases", ttl=300, version=get_prompt_registry().cache_version("suggest-phases"))
 
 
 def _interview_cache_key(context: dict, start_label: str = "", end_label: str = "") -> str:
@@ -65,17 +126,8 @@ def _interview_cache_key(context: dict, start_label: str = "", end_label: str =
     return base
 
 
-def _get_interview_cache(key: str) -> Optional[dict]:
-    entry = _INTERVIEW_CACHE.get(key)
-    if entry and (time.time() - entry[0]) < _INTERVIEW_CACHE_TTL:
-        return entry[1]
-    if key in _INTERVIEW_CACHE:
-        del _INTERVIEW_CACHE[key]
-    return None
-
-
-def _set_interview_cache(key: str, value: dict) -> None:
-    _INTERVIEW_CACHE[key] = (time.time(), value)
+def _phases_cache_key(context: dict) -> str:
+    return f"{context.get('l4','')}/{context.get('l5','')}/{context.get('processName','')}".lower()
 
 
 def _calc_flow_metrics(nodes, edges) -> dict:
@@ -121,44 +173,104 @@ def _append_actor_scope(ctx_lines: str, nodes, swim_lane_labels: list[str]) -> s
     return ctx_lines
 
 
-def _build_l345_block(context: dict) -> str:
-    """req.context에서 L345 참조 블록 생성. 매칭 실패 시 빈 문자열."""
+def _build_l345_parts(context: dict, nodes=(), branching: bool = False) -> tuple[str, str]:
+    """req.context에서 (L3 구조 블록, 현재 작업 위치 한 줄) 생성. 매칭 실패 시 ("", "").
+    구조 블록은 프롬프트 앞쪽(reference), 위치는 컨텍스트 섹션에 넣어 prefix 캐시를 살린다.
+    nodes 라벨은 L4가 확정되지 않았을 때 관련 L4를 고르는 데 쓰고, branching=True면 분기점 예시를 붙인다
+    (system 프롬프트에 BRANCHING_GUIDE_CORE만 있는 review/coach용)."""
     if not isinstance(context, dict):
-        return ""
-    return get_l345_context(
+        return ("", "") if not branching else get_l345_parts("", branching=True)
+    return get_l345_parts(
         context.get("l4", ""),
         context.get("l5", ""),
         context.get("processName", ""),
+        labels=[n.label for n in nodes],
+        branching=branching,
     )
 
 
-@app.post("/api/review")
-async def review_flow(req: ReviewRequest):
-    fd = describe_flow(req.currentNodes, req.currentEdges)
-    l345 = _build_l345_block(req.context) if isinstance(req.context, dict) else ""
-    ctx_block = (
+def _process_context_block(context, position: str = "") -> str:
+    """[프로세스 컨텍스트] L4/L5/L6 + 현재 작업 위치"""
+    is_dict = isinstance(context, dict)
+    block = (
         f"[프로세스 컨텍스트]\n"
-        f"L4: {req.context.get('l4', '미설정') if isinstance(req.context, dict) else req.context}\n"
-        f"L5: {req.context.get('l5', '미설정') if isinstance(req.context, dict) else ''}\n"
-        f"L6(활동): {req.context.get('processName', '미설정') if isinstance(req.context, dict) else ''}\n"
+        f"L4: {context.get('l4', '미설정') if is_dict else context}\n"
+        f"L5: {context.get('l5', '미설정') if is_dict else ''}\n"
+        f"L6(활동): {context.get('processName', '미설정') if is_dict else ''}\n"
     )
-    if l345:
-        ctx_block += f"\n{l345}\n"
-    ctx_block = _append_actor_scope(ctx_block, req.currentNodes, req.swimLaneLabels)
-    r = await call_llm(REVIEW_SYSTEM, f"{ctx_block}\n플로우:\n{fd}",
-                       max_tokens=1200, temperature=0.3)
-    return r or mock_review(req.currentNodes, req.currentEdges)
+    if position:
+        block += f"{position}\n"
+    return block
+
+
+class _AnalysisMaterial:
+    """review / pdd-insights / analyze-pdd가 공유하는 프롬프트 재료.
+    /api/analyze-all에서는 한 번 만들어 세 분석이 함께 쓴다."""
+    __slots__ = ("req", "l345", "position", "_fd", "_review_l345")
+
+    def __init__(self, req: ReviewRequest):
+        self.req = req
+        self.l345, self.position = _build_l345_parts(req.context, req.currentNodes)
+        self._fd: Optional[str] = None
+        self._review_l345: Optional[str] = None
+
+    @property
+    def review_l345(self) -> str:
+        """review용 참조 블록 — 관련 L4의 분기점 예시 포함"""
+        if self._review_l345 is None:
+            self._review_l345 = _build_l345_parts(self.req.context, self.req.currentNodes, branching=True)[0]
+        return self._review_l345
+
+    @property
+    def fd(self) -> str:
+        if self._fd is None:
+            self._fd = describe_flow(self.req.currentNodes, self.req.currentEdges)
+        return self._fd
+
+    @property
+    def pdd_ctx(self) -> str:
+        return f"컨텍스트: {self.req.context}\n{self.position}"
+
+
+async def _run_review(m: _AnalysisMaterial):
+    req = m.req
+    ctx_block = _append_actor_scope(_process_context_block(req.context, m.position), req.currentNodes, req.swimLaneLabels)
+    prompt = assemble_prompt(reference=m.review_l345, context=ctx_block, flow=f"플로우:\n{m.fd}")
+    r = await call_llm(REVIEW_SYSTEM, prompt, max_tokens=1200, temperature=0.3, endpoint="review")
+    if isinstance(r, dict) and r:
+        return r
+    return mock_review(req.currentNodes, req.currentEdges)
+
+
+def _pdd_insights_fallback() -> dict:
+    return {"summary": "분석에 충분한 정보가 없습니다.", "inefficiencies": [], "digitalWorker": [], "sscCandidates": [], "redesign": []}
+
+
+async def _run_pdd_insights(m: _AnalysisMaterial):
+    req = m.req
+
+    async def analyze(fd: str, header: str = ""):
+        prompt = assemble_prompt(reference=m.l345, context=m.pdd_ctx, flow=f"{header}\n플로우:\n{fd}" if header else f"플로우:\n{fd}")
+        return await call_llm(PDD_INSIGHTS_SYSTEM, prompt, max_tokens=1000, temperature=0.5, endpoint="pdd-insights")
+
+    if should_chunk(req.currentNodes):
+        # 대형 플로우: 구간별 인사이트를 동시에 받아 병합 (전체 타임아웃 → 키워드 폴백 방지)
+        chunks = chunk_flow(req.currentNodes, req.currentEdges)
+        results = await map_chunks(chunks, lambda c: analyze(describe_flow(c.nodes, c.edges), c.header()))
+        r = merge_pdd_insights(chunks, results)
+    else:
+        r = await analyze(m.fd)
+    return r or _pdd_insights_fallback()
+
+
+@app.post("/api/review", response_model=ReviewResponse, response_model_exclude_unset=True)
+async def review_flow(req: ReviewRequest):
+    return await _run_review(_AnalysisMaterial(req))
 
 
 @app.post("/api/pdd-insights")
 async def pdd_insights(req: ReviewRequest):
-    fd = describe_flow(req.currentNodes, req.currentEdges)
-    l345 = _build_l345_block(req.context) if isinstance(req.context, dict) else ""
-    pdd_ctx = f"컨텍스트: {req.context}\n"
-    if l345:
-        pdd_ctx += f"\n{l345}\n"
-    r = await call_llm(PDD_INSIGHTS_SYSTEM, f"{pdd_ctx}플로우:\n{fd}", max_tokens=1000, temperature=0.5)
-    return r or {"summary": "분석에 충분한 정보가 없습니다.", "inefficiencies": [], "digitalWorker": [], "sscCandidates": [], "redesign": []}
+    return await _run_pdd_insights(_AnalysisMaterial(req))
 
 
 @app.post("/api/chat")
@@ -174,34 +286,27 @@ async def chat(req: ChatRequest):
         history_block = "\n".join(history_lines) if history_lines else "(없음)"
         summary = req.conversationSummary or "(없음)"
 
-        l345 = _build_l345_block(req.context) if isinstance(req.context, dict) else ""
-        ctx_lines = (
-            f"[프로세스 컨텍스트]\n"
-            f"L4: {req.context.get('l4', '미설정') if isinstance(req.context, dict) else req.context}\n"
-            f"L5: {req.context.get('l5', '미설정') if isinstance(req.context, dict) else ''}\n"
-            f"L6(활동): {req.context.get('processName', '미설정') if isinstance(req.context, dict) else ''}\n"
-        )
-        if l345:
-            ctx_lines += f"\n{l345}\n"
-
-        ctx_lines = _append_actor_scope(ctx_lines, req.currentNodes, req.swimLaneLabels)
+        # COACH_TEMPLATE(지식·코칭)에는 분기점 예시를 참조 블록으로 붙인다 — 흐름 설명(FLOW_OVERVIEW_SYSTEM)은 구조만
+        l345, position = _build_l345_parts(req.context, req.currentNodes, branching=intent != "flow_overview")
+        ctx_lines = _append_actor_scope(_process_context_block(req.context, position), req.currentNodes, req.swimLaneLabels)
 
         if intent == "flow_overview":
             process_name = req.context.get("processName", "이 업무") if isinstance(req.context, dict) else "이 업무"
             start_label = next((n.label for n in req.currentNodes if n.type == "start"), "시작")
             end_label = next((n.label for n in req.currentNodes if n.type == "end"), "종료")
-            ov_prompt = (
-                f"{ctx_lines}\n"
-                f"시작 노드: {start_label} / 종료 노드: {end_label}\n"
-                f"현재 노드 수: {len(req.currentNodes)}개\n"
-                f"\n질문: {req.message}"
+            ov_prompt = assemble_prompt(
+                reference=l345,
+                context=ctx_lines,
+                flow=f"시작 노드: {start_label} / 종료 노드: {end_label}\n현재 노드 수: {len(req.currentNodes)}개",
+                question=f"질문: {req.message}",
             )
             _default_qq = [
                 "첫 단계부터 같이 그려볼까요?",
                 "예외 처리는 어떻게 표현하나요?",
                 "어떤 분기점이 있을까요?",
             ]
-            ov_r = await call_llm(FLOW_OVERVIEW_SYSTEM, ov_prompt, allow_text_fallback=True, max_tokens=700, temperature=0.4)
+            ov_r = await call_llm(FLOW_OVERVIEW_SYSTEM, ov_prompt, allow_text_fallback=True, max_tokens=700, temperature=0.4,
+                                  endpoint="flow-overview")
             ov_text = ""
             ov_qq = _default_qq
             if ov_r:
@@ -222,22 +327,43 @@ async def chat(req: ChatRequest):
                 "fallbackLevel": 0,
             }
         elif intent == "knowledge":
-            # 지식 질문: 플로우 상세 생략, 노드 수만 전달하여 토큰 절약
+            # 지식 질문: 플로우와 거의 무관 → 방법론 FAQ 로컬 검색 → L3 범위 유사 질문 캐시 → LLM 순
+            index = get_knowledge_index()
+            local = index.answer(req.message) if index is not None else None
+            if local is not None:
+                record_fallback("chat", 0, "retrieval")
+                return {**local, "intent": "knowledge", "source": "retrieval", "fallbackLevel": 0}
+            qcache = get_knowledge_cache()
+            l3 = find_l3_for_l4(req.context.get("l4", "")) if isinstance(req.context, dict) else None
+            scope = l3[0] if l3 else ""
+            if qcache is not None:
+                cached = qcache.lookup(scope, req.message)
+                if cached is not None:
+                    value, similarity = cached
+                    record_fallback("chat", 0, "cache")
+                    return {**value, "intent": "knowledge", "source": "cache", "cached": True,
+                            "similarity": round(similarity, 2)}
+            # 플로우 상세 생략, 노드 수만 전달하여 토큰 절약
             node_count = len(req.currentNodes)
-            prompt = (
-                f"{ctx_lines}\n"
-                f"현재 플로우: 노드 {node_count}개\n"
-                f"최근 대화:\n{history_block}\n"
-                f"질문: {req.message}"
+            prompt = assemble_prompt(
+                reference=l345,
+                context=ctx_lines,
+                flow=f"현재 플로우: 노드 {node_count}개",
+                history=f"최근 대화:\n{history_block}",
+                question=f"질문: {req.message}",
             )
+            result = await orchestrate_chat(COACH_TEMPLATE, prompt, req.message, req.currentNodes, req.currentEdges)
+            if qcache is not None and result.get("source") == "llm":
+                qcache.store(scope, req.message, {k: v for k, v in result.items() if k != "intent"})
+            return result
         else:
             fd = describe_flow(req.currentNodes, req.currentEdges)
-            prompt = (
-                f"{ctx_lines}\n"
-                f"플로우:\n{fd}\n"
-                f"대화 요약: {summary}\n"
-                f"최근 대화:\n{history_block}\n"
-                f"질문: {req.message}"
+            prompt = assemble_prompt(
+                reference=l345,
+                context=ctx_lines,
+                flow=f"플로우:\n{fd}",
+                history=f"대화 요약: {summary}\n최근 대화:\n{history_block}",
+                question=f"질문: {req.message}",
             )
         return await orchestrate_chat(COACH_TEMPLATE, prompt, req.message, req.currentNodes, req.currentEdges)
     except Exception:
@@ -246,7 +372,55 @@ async def chat(req: ChatRequest):
         return {"message": error_msg, "speech": error_msg, "suggestions": [], "quickQueries": []}
 
 
-@app.post("/api/validate-l7")
+@app.get("/api/l7-rules")
+async def l7_rules(full: bool = False):
+    """L7 규칙 세트 버전·해시 (프론트 rulesLoader.ts와 동기화 확인용). full=true면 규칙 파일 전체 포함"""
+    engine = get_rule_engine()
+    info = engine.describe()
+    if full:
+        info["spec"] = engine.spec
+    return info
+
+
+CHAT_PROVISIONAL_DELAY = float(os.getenv("CHAT_PROVISIONAL_DELAY_MS", "150")) / 1000
+CHAT_STREAM_HEARTBEAT = float(os.getenv("CHAT_STREAM_HEARTBEAT", "15"))
+
+
+def _sse(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + json_dumps(data) + b"\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """/api/chat의 점진 응답판 (SSE).
+    답이 CHAT_PROVISIONAL_DELAY 안에 나오지 않으면(LLM 대기) 규칙 기반 코칭을 provisional 이벤트로 먼저 보내고,
+    /api/chat과 같은 경로로 만든 답을 final 이벤트로 보낸다 (upgrade: LLM 답으로 교체되었는지)."""
+    answer = asyncio.ensure_future(chat(req))
+
+    async def stream():
+        try:
+            done, _ = await asyncio.wait({answer}, timeout=CHAT_PROVISIONAL_DELAY)
+            preview = None
+            if not done:
+                preview = provisional_answer(req.message, req.currentNodes, req.currentEdges)
+                if preview is not None:
+                    yield _sse("provisional", {**preview, "provisional": True})
+            while not done:
+                done, _ = await asyncio.wait({answer}, timeout=CHAT_STREAM_HEARTBEAT)
+                if not done:
+                    yield b": ping\n\n"  # 프록시 유휴 타임아웃 방지
+            result = answer.result()
+            upgrade = preview is not None and result.get("source") == "llm"
+            CHAT_PROGRESSIVE.inc(outcome="direct" if preview is None else "upgraded" if upgrade else "kept")
+            yield _sse("final", {**result, "provisional": False, "upgrade": upgrade})
+        finally:
+            answer.cancel()  # 클라이언트가 먼저 떠났으면 LLM 호출도 멈춘다
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/api/validate-l7", response_model=ValidateL7Response, response_model_exclude_unset=True)
 async def validate_l7(req: ValidateL7Request):
     # Phase 1: 실시간 L7 판정은 프론트 룰 엔진에서 처리.
     # 백엔드 validate-l7는 저장/배치/호환 용도로 룰 기반 결과만 반환.
@@ -254,7 +428,7 @@ async def validate_l7(req: ValidateL7Request):
 
 
 @app.post("/api/contextual-suggest")
-async def contextual_suggest(req: ContextualSuggestRequest):
+async def contextual_suggest(req: ContextualSuggestRequest, x_session_id: Optional[str] = Header(None)):
     # 초기 가이드용이므로 요약 모드로 토큰 절약
     fd = describe_flow(req.currentNodes, req.currentEdges, summary=True)
 
@@ -267,7 +441,13 @@ async def contextual_suggest(req: ContextualSuggestRequest):
         diag_lines.append(f"독립 노드: {m['orphan_count']}개 (연결 없음)")
     diag_block = ("\n[플로우 진단]\n" + "\n".join(diag_lines) + "\n") if diag_lines else ""
 
-    r = await call_llm(CONTEXTUAL_SUGGEST_SYSTEM, f"컨텍스트: {req.context}\n플로우:\n{fd}{diag_block}")
+    prompt = assemble_prompt(context=f"컨텍스트: {req.context}", flow=f"플로우:\n{fd}{diag_block}")
+    # 캔버스를 고칠 때마다 호출된다 — 같은 세션의 새 요청이 오면 이 호출의 생성은 버려진다
+    try:
+        r = await latest_wins("contextual-suggest").run(
+            x_session_id or req.sessionId, call_llm(CONTEXTUAL_SUGGEST_SYSTEM, prompt, endpoint="contextual-suggest"))
+    except Superseded:
+        return {"message": "", "guidance": "", "quickQueries": [], "superseded": True}
     if r:
         guidance = r.get("guidance", "")
         return {
@@ -282,12 +462,13 @@ async def contextual_suggest(req: ContextualSuggestRequest):
 async def first_shape_welcome(req: ContextualSuggestRequest):
     process_name = req.context.get("processName", "HR 프로세스")
     process_type = req.context.get("l5", "프로세스")
-    l345 = _build_l345_block(req.context) if isinstance(req.context, dict) else ""
-    welcome_prompt = f"프로세스명: {process_name}\n프로세스 타입: {process_type}\n"
-    if l345:
-        welcome_prompt += f"\n{l345}\n"
-    welcome_prompt += "\n사용자가 이 프로세스의 첫 번째 단계를 추가했습니다. 환영하고 격려해주세요."
-    r = await call_llm(FIRST_SHAPE_SYSTEM, welcome_prompt)
+    l345, position = _build_l345_parts(req.context, req.currentNodes)
+    welcome_prompt = assemble_prompt(
+        reference=l345,
+        context=f"프로세스명: {process_name}\n프로세스 타입: {process_type}\n{position}",
+        question="사용자가 이 프로세스의 첫 번째 단계를 추가했습니다. 환영하고 격려해주세요.",
+    )
+    r = await call_llm(FIRST_SHAPE_SYSTEM, welcome_prompt, endpoint="first-shape-welcome")
 
     if r:
         text = f"👋 {r.get('greeting', '')}\n\n{r.get('processFlowExample', '')}\n\n{r.get('guidanceText', '')}"
@@ -310,27 +491,34 @@ async def first_shape_welcome(req: ContextualSuggestRequest):
 async def interview_start(req: ContextualSuggestRequest):
     """AI 인터뷰 시작: 4섹션 산문(FLOW_OVERVIEW_SYSTEM)으로 전체 흐름을 첫 버블에 바로 표시"""
     ctx = req.context if isinstance(req.context, dict) else {}
-    process_name = ctx.get("processName", "HR 프로세스") or "HR 프로세스"
-    l4 = ctx.get("l4", "")
-    l5 = ctx.get("l5", "")
-
     start_label = next((n.label for n in req.currentNodes if n.type == "start"), "")
     end_label = next((n.label for n in req.currentNodes if n.type == "end"), "")
 
     cache_key = _interview_cache_key(ctx, start_label, end_label)
-    cached = _get_interview_cache(cache_key)
+    cached = _interview_cache.get(cache_key)
     if cached:
         return cached
 
-    l345 = _build_l345_block(ctx)
+    result, _ = await _generate_interview(ctx, start_label, end_label)
+    _interview_cache.set(cache_key, result)
+    return result
+
+
+async def _generate_interview(ctx: dict, start_label: str, end_label: str) -> tuple[dict, bool]:
+    """인터뷰 첫 버블 생성. (응답, LLM 생성 여부) 반환 — 폴백 문구면 False."""
+    process_name = ctx.get("processName", "HR 프로세스") or "HR 프로세스"
+    l4 = ctx.get("l4", "")
+    l5 = ctx.get("l5", "")
+
+    l345, position = _build_l345_parts(ctx)
     ctx_lines = (
         f"[프로세스 컨텍스트]\n"
         f"L4: {l4 or '미설정'}\n"
         f"L5: {l5 or '미설정'}\n"
         f"L6(활동): {process_name}\n"
     )
-    if l345:
-        ctx_lines += f"\n{l345}\n"
+    if position:
+        ctx_lines += f"{position}\n"
 
     _scope_defaults = {"시작", "시작 노드", "종료", "종료 노드", "start", "end", ""}
     scope_hint = ""
@@ -339,7 +527,8 @@ async def interview_start(req: ContextualSuggestRequest):
     if end_label.strip() not in _scope_defaults:
         scope_hint += f"사용자 지정 종료 노드: '{end_label}'\n"
 
-    ov_prompt = f"{ctx_lines}{scope_hint}\n질문: {process_name}의 전체 흐름을 설명해주세요."
+    ov_prompt = assemble_prompt(reference=l345, context=ctx_lines + scope_hint,
+                                question=f"질문: {process_name}의 전체 흐름을 설명해주세요.")
 
     _default_qq = [
         "첫 단계부터 같이 그려볼까요?",
@@ -347,7 +536,8 @@ async def interview_start(req: ContextualSuggestRequest):
         "어떤 분기점이 있을까요?",
     ]
 
-    r = await call_llm(FLOW_OVERVIEW_SYSTEM, ov_prompt, allow_text_fallback=True, max_tokens=700, temperature=0.4)
+    r = await call_llm(FLOW_OVERVIEW_SYSTEM, ov_prompt, allow_text_fallback=True, max_tokens=700, temperature=0.4,
+                       endpoint="interview-start")
 
     text = ""
     qq = _default_qq
@@ -358,6 +548,7 @@ async def interview_start(req: ContextualSuggestRequest):
         elif isinstance(r, str):
             text = r
 
+    from_llm = bool(text)
     if not text:
         text = (
             f"▶ 이 업무의 범위\n'{process_name}' 업무의 흐름을 함께 그려봐요.\n\n"
@@ -372,18 +563,12 @@ async def interview_start(req: ContextualSuggestRequest):
         "suggestions": [],
         "quickQueries": qq,
     }
-    _set_interview_cache(cache_key, result)
-    return result
+    return result, from_llm
 
 
-@app.post("/api/analyze-pdd")
-async def analyze_pdd(req: ReviewRequest):
-    fd = describe_flow(req.currentNodes, req.currentEdges)
-    r = await call_llm(PDD_ANALYSIS, f"컨텍스트: {req.context}\n플로우:\n{fd}", max_tokens=800, temperature=0.3)
-    if r:
-        return r
+def _rule_analyze_pdd(nodes) -> dict:
     recs = []
-    for n in req.currentNodes:
+    for n in nodes:
         if n.type in ("start", "end"):
             continue
         cat = "as_is"
@@ -395,12 +580,68 @@ async def analyze_pdd(req: ReviewRequest):
     return {"recommendations": recs, "summary": "규칙 기반 자동 분류입니다."}
 
 
-@app.post("/api/categorize-nodes")
-async def categorize_nodes(req: CategorizeNodesRequest):
-    """ZBR 기준으로 노드의 카테고리 추천 (TO-BE 모드 전용)"""
-    # Prepare node descriptions
+async def _run_analyze_pdd(m: _AnalysisMaterial):
+    prompt = assemble_prompt(context=f"컨텍스트: {m.req.context}", flow=f"플로우:\n{m.fd}")
+    r = await call_llm(PDD_ANALYSIS, prompt, max_tokens=800, temperature=0.3, endpoint="analyze-pdd")
+    return r or _rule_analyze_pdd(m.req.currentNodes)
+
+
+@app.post("/api/analyze-pdd")
+async def analyze_pdd(req: ReviewRequest):
+    return await _run_analyze_pdd(_AnalysisMaterial(req))
+
+
+# ── 분석 화면 통합 호출: 공유 재료 1회 생성 → 하위 분석 동시 실행 ──
+ANALYZE_PART_TIMEOUT = float(os.getenv("ANALYZE_PART_TIMEOUT", "120"))
+
+# 응답 키 → (LLM 분석, 타임아웃/실패 시 폴백)
+_ANALYZE_PARTS = {
+    "review": (_run_review, lambda m: mock_review(m.req.currentNodes, m.req.currentEdges)),
+    "pddInsights": (_run_pdd_insights, lambda m: _pdd_insights_fallback()),
+    "analyzePdd": (_run_analyze_pdd, lambda m: _rule_analyze_pdd(m.req.currentNodes)),
+}
+
+
+@app.post("/api/analyze-all")
+async def analyze_all(req: AnalyzeAllRequest):
+    """review + pdd-insights + analyze-pdd를 한 번에.
+    파트별로 ANALYZE_PART_TIMEOUT을 두고, 시간 안에 못 끝난 파트는 폴백 결과에 timedOut=true를 붙여 돌려준다."""
+    parts = [p for p in req.parts if p in _ANALYZE_PARTS] or list(_ANALYZE_PARTS)
+    m = _AnalysisMaterial(req)  # describe_flow는 처음 필요한 파트에서 한 번만 생성된다
+
+    # LLM 가용성 게이트도 한 번만 — 불가하면 네트워크 호출 없이 전부 폴백
+    llm_ok = await check_llm() or USE_MOCK == "false"
+
+    async def run_part(name: str):
+        run, fallback = _ANALYZE_PARTS[name]
+        t0 = time.perf_counter()
+        timed_out = False
+        if not llm_ok:
+            result = fallback(m)
+        else:
+            try:
+                result = await asyncio.wait_for(run(m), timeout=ANALYZE_PART_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"/api/analyze-all {name} 타임아웃 ({ANALYZE_PART_TIMEOUT}초)")
+                timed_out = True
+                result = fallback(m)
+            except Exception:
+                logger.exception(f"/api/analyze-all {name} 실패")
+                result = fallback(m)
+        if timed_out and isinstance(result, dict):
+            result = {**result, "timedOut": True}
+        return name, result, timed_out, (time.perf_counter() - t0) * 1000
+
+    done = await asyncio.gather(*(run_part(p) for p in parts))
+    response = {name: result for name, result, _, _ in done}
+    response["partial"] = any(t for _, _, t, _ in done)
+    response["timings"] = {name: round(ms, 1) for name, _, _, ms in done}
+    return response
+
+
+def _categorize_prompt(context: dict, nodes) -> str:
     node_descriptions = []
-    for n in req.nodes:
+    for n in nodes:
         if n.type in ("start", "end"):
             continue
         desc = f"- {n.label} (ID: {n.id}, 타입: {n.type})"
@@ -411,88 +652,141 @@ async def categorize_nodes(req: CategorizeNodesRequest):
         node_descriptions.append(desc)
 
     if not node_descriptions:
-        return []
+        return ""
+
+    return assemble_prompt(
+        context=(
+            f"프로세스: {context.get('processName', 'Unknown')}\n"
+            f"L4 모듈: {context.get('l4', 'Unknown')}\n"
+            f"L5 단위업무: {context.get('l5', 'Unknown')}"
+        ),
+        flow="[분류 대상 노드 목록]\n" + "\n".join(node_descriptions),
+        question="위 노드들을 ZBR 4가지 질문 기준으로 분류하고 JSON 배열로 반환하세요.",
+    )
+
+
+def _rule_categorize(nodes) -> list[dict]:
+    """LLM 실패 시 규칙 기반 분류"""
+    fallback = []
+    for n in nodes:
+        if n.type in ("start", "end"):
+            continue
+        cat = "as_is"
+        reasoning = "LLM 실패로 규칙 기반 분류"
+
+        if any(k in n.label for k in ["조회", "입력", "추출", "집계", "계산", "전송"]):
+            cat = "digital_worker"
+            reasoning = "데이터 처리 작업으로 자동화 가능"
+        elif any(k in n.label for k in ["통보", "안내", "발송", "접수", "정산"]):
+            cat = "ssc_transfer"
+            reasoning = "표준화 가능한 공통 업무"
+        elif any(k in n.label for k in ["확인", "검토"]) and "승인" not in n.label:
+            cat = "delete_target"
+            reasoning = "형식적 확인 단계로 통합 또는 제거 검토"
+
+        fallback.append({
+            "nodeId": n.id,
+            "category": cat,  # suggestedCategory → category
+            "confidence": "low",
+            "reasoning": reasoning
+        })
+    return fallback
+
+
+def _normalize_categorizations(result: list) -> list[dict]:
+    """LLM이 배열로 반환한 경우: suggestedCategory → category"""
+    return [
+        {
+            "nodeId": item.get("nodeId"),
+            "category": item.get("suggestedCategory") or item.get("category"),
+            "confidence": item.get("confidence") or "medium",
+            "reasoning": item.get("reasoning") or ""
+        }
+        for item in result
+        if isinstance(item, dict) and item.get("nodeId")
+    ]
 
-    prompt = f"""프로세스: {req.context.get('processName', 'Unknown')}
-L4 모듈: {req.context.get('l4', 'Unknown')}
-L5 단위업무: {req.context.get('l5', 'Unknown')}
 
-[분류 대상 노드 목록]
-{chr(10).join(node_descriptions)}
+@app.post("/api/categorize-nodes", response_model=CategorizeNodesResponse, response_model_exclude_unset=True)
+async def categorize_nodes(req: CategorizeNodesRequest):
+    """ZBR 기준으로 노드의 카테고리 추천 (TO-BE 모드 전용)"""
+    if should_chunk(req.nodes):
+        return await _categorize_chunked(req)
 
-위 노드들을 ZBR 4가지 질문 기준으로 분류하고 JSON 배열로 반환하세요."""
+    prompt = _categorize_prompt(req.context, req.nodes)
+    if not prompt:
+        return {"categorizations": []}
 
-    result = await call_llm(CATEGORIZE_PROMPT, prompt)
+    result = await call_llm(CATEGORIZE_PROMPT, prompt, endpoint="categorize-nodes")
 
     # Fallback: 규칙 기반 분류
     if not result:
-        fallback = []
-        for n in req.nodes:
-            if n.type in ("start", "end"):
-                continue
-            cat = "as_is"
-            reasoning = "LLM 실패로 규칙 기반 분류"
-
-            if any(k in n.label for k in ["조회", "입력", "추출", "집계", "계산", "전송"]):
-                cat = "digital_worker"
-                reasoning = "데이터 처리 작업으로 자동화 가능"
-            elif any(k in n.label for k in ["통보", "안내", "발송", "접수", "정산"]):
-                cat = "ssc_transfer"
-                reasoning = "표준화 가능한 공통 업무"
-            elif any(k in n.label for k in ["확인", "검토"]) and "승인" not in n.label:
-                cat = "delete_target"
-                reasoning = "형식적 확인 단계로 통합 또는 제거 검토"
-
-            fallback.append({
-                "nodeId": n.id,
-                "category": cat,  # suggestedCategory → category
-                "confidence": "low",
-                "reasoning": reasoning
-            })
-        return {"categorizations": fallback}
+        return {"categorizations": _rule_categorize(req.nodes)}
 
     # LLM 응답을 프론트엔드 형식으로 변환
     if isinstance(result, list):
-        # LLM이 배열로 반환한 경우: suggestedCategory → category
-        normalized = [
-            {
-                "nodeId": item.get("nodeId"),
-                "category": item.get("suggestedCategory") or item.get("category"),
-                "confidence": item.get("confidence", "medium"),
-                "reasoning": item.get("reasoning", "")
-            }
-            for item in result
-            if item.get("nodeId")
-        ]
-        return {"categorizations": normalized}
+        return {"categorizations": _normalize_categorizations(result)}
 
     # LLM이 이미 올바른 형식으로 반환한 경우
-    return result
+    if isinstance(result, dict):
+        return {**result, "categorizations": _normalize_categorizations(result.get("categorizations") or [])}
+    return {"categorizations": _rule_categorize(req.nodes)}
+
+
+async def _categorize_chunked(req: CategorizeNodesRequest):
+    """대형 플로우: 청크별로 분류해 원래 노드 순서로 병합. 실패한 청크만 규칙 기반으로 채운다."""
+    chunks = chunk_flow(req.nodes, [])
+
+    async def categorize(chunk):
+        prompt = _categorize_prompt(req.context, chunk.nodes)
+        if not prompt:
+            return []
+        result = await call_llm(CATEGORIZE_PROMPT, prompt, endpoint="categorize-nodes")
+        if isinstance(result, dict):
+            result = result.get("categorizations")
+        if isinstance(result, list):
+            items = _normalize_categorizations(result)
+            if items:
+                return items
+        return _rule_categorize(chunk.nodes)
+
+    results = await map_chunks(chunks, categorize)
+    per_chunk = [r if r is not None else _rule_categorize(c.nodes) for c, r in zip(chunks, results)]
+    return {"categorizations": merge_categorizations(req.nodes, per_chunk)}
 
 
 @app.post("/api/suggest-phases")
 async def suggest_phases(req: dict):
     """Phase AI 자동 추천 전용 엔드포인트.
-    orchestrate_chat 를 거치지 않으므로 Circuit Breaker에 영향을 주지 않는다.
+    orchestrate_chat 를 거치지 않으며, Circuit Breaker는 chat이 아닌 suggest 클래스로 집계된다.
     Qwen3 등이 JSON 배열을 직접 반환해도 정상 처리.
     """
     context = req.get("context", {}) if isinstance(req, dict) else {}
+    if not isinstance(context, dict):
+        context = {}
+    cache_key = _phases_cache_key(context)
+    cached = _phases_cache.get(cache_key)
+    if cached:
+        return cached
+    result = await _generate_phases(context)
+    if result["text"]:
+        _phases_cache.set(cache_key, result)
+    return result
+
+
+async def _generate_phases(context: dict) -> dict:
     process_name = context.get("processName", "")
     l4 = context.get("l4", "")
     l5 = context.get("l5", "")
 
-    system = "당신은 HR 업무 프로세스 전문가입니다. 요청한 형식(JSON 배열)으로만 응답하세요."
-    prompt = (
-        f'HR 업무 "{process_name}"(L4: {l4}, L5: {l5})의 내부를 논리적으로 3~4개 Phase로 분해해줘.\n\n'
-        f'【중요 제약】이 L6 업무 자체의 내부 흐름만 Phase로 나눠야 해. '
-        f'이 업무의 선행·후행에 해당하는 다른 L6(예: 신청접수, 결과통보 등)는 포함하지 마.\n\n'
-        f'각 Phase 이름은 4~6글자 명사형(예: "심사기준파악", "서류검토", "합부판정"). '
-        f'아래처럼 JSON 배열만 출력해 (설명 없이):\n["Phase1", "Phase2", "Phase3"]'
-    )
+    # 고정 지시문은 system에 두고 user에는 업무명만 → 모든 요청이 같은 prefix를 공유
+    system = SUGGEST_PHASES_SYSTEM
+    prompt = f'HR 업무 "{process_name}"(L4: {l4}, L5: {l5})의 내부를 논리적으로 3~4개 Phase로 분해해줘.'
 
     import json as _json
     try:
-        result = await call_llm(system, prompt, allow_text_fallback=True, max_tokens=200, temperature=0.3)
+        result = await call_llm(system, prompt, allow_text_fallback=True, max_tokens=200, temperature=0.3,
+                                endpoint="suggest-phases")
     except Exception:
         logger.exception("/api/suggest-phases call_llm 실패")
         return {"text": ""}
@@ -513,9 +807,89 @@ async def suggest_phases(req: dict):
     return {"text": str(result) if result else ""}
 
 
+# ── 비동기 작업 — 오래 걸리는 분석을 제출하고 작업 ID로 조회/구독 (연결을 LLM 응답까지 잡아 두지 않는다) ──
+# kind → (요청 모델, 동기 엔드포인트 함수, 응답 모델). 결과는 동기 엔드포인트 응답과 같은 형태로 저장한다.
+_JOB_KINDS = {
+    "review": (ReviewRequest, review_flow, ReviewResponse),
+    "pdd-insights": (ReviewRequest, pdd_insights, None),
+    "categorize-nodes": (CategorizeNodesRequest, categorize_nodes, CategorizeNodesResponse),
+    "analyze-all": (AnalyzeAllRequest, analyze_all, None),
+}
+_jobs = get_job_queue()
+
+
+def _job_handler(endpoint, response_model):
+    async def run(req):
+        result = await endpoint(req)
+        if response_model is not None:
+            try:
+                return response_model.model_validate(result).model_dump(mode="json", by_alias=True, exclude_unset=True)
+            except ValidationError as e:
+                # 응답 하나가 형식을 벗어났다고 항목 전체를 실패시키지 않는다 — 받은 그대로 저장
+                logger.warning(f"작업 결과 형식 불일치 ({response_model.__name__}), 원본 저장: {e.error_count()}건")
+        return json.loads(json_dumps(result))  # 공유 저장소에 넣을 수 있는 순수 JSON 값으로
+    return run
+
+
+for _kind, (_, _endpoint, _response_model) in _JOB_KINDS.items():
+    _jobs.register(_kind, _job_handler(_endpoint, _response_model))
+
+
+def _job_not_found(job_id: str) -> JSONResponse:
+    return JSONResponse(status_code=404, content={"message": f"작업을 찾을 수 없습니다 (만료되었거나 없는 ID): {job_id}"})
+
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(req: JobSubmitRequest):
+    """review / pdd-insights / categorize-nodes / analyze-all을 작업으로 제출 — 곧바로 작업 ID를 반환.
+    payloads로 여러 플로우(예: L4 전체)를 한 작업에 넣을 수 있다. 대기 항목이 가득 차면 429."""
+    if req.kind not in _JOB_KINDS:
+        raise RequestValidationError([{"type": "literal_error", "loc": ("body", "kind"), "input": req.kind,
+                                       "msg": f"지원하는 작업: {', '.join(_JOB_KINDS)}"}])
+    raw = req.payloads or ([req.payload] if req.payload is not None else [])
+    if not raw or len(raw) > JOB_MAX_BATCH:
+        raise RequestValidationError([{"type": "too_long" if raw else "missing", "loc": ("body", "payloads"), "input": len(raw),
+                                       "msg": f"payload 또는 payloads(1~{JOB_MAX_BATCH}개)가 필요합니다"}])
+    model = _JOB_KINDS[req.kind][0]
+    payloads = []
+    for i, item in enumerate(raw):
+        try:
+            payloads.append(model.model_validate(item))
+        except ValidationError as e:
+            raise RequestValidationError([{**err, "loc": ("body", "payloads", i, *err["loc"])} for err in e.errors(include_url=False)])
+    try:
+        meta = _jobs.submit(req.kind, payloads)
+    except QueueFull as e:
+        return JSONResponse(status_code=429, content={"message": f"분석 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요. ({e})"},
+                            headers={"Retry-After": "30"})
+    return {**meta, "statusUrl": f"/api/jobs/{meta['id']}", "eventsUrl": f"/api/jobs/{meta['id']}/events"}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태와 항목별 결과 (results[i] = {ok, result | error, durationMs}, 아직 끝나지 않은 항목은 null)."""
+    job = _jobs.get(job_id)
+    return job if job is not None else _job_not_found(job_id)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """작업 진행 구독 (SSE) — progress 이벤트를 보내다가 끝나면 결과를 담은 done 이벤트 하나로 종료."""
+    if _jobs.get(job_id, include_results=False) is None:
+        return _job_not_found(job_id)
+
+    async def stream():
+        async for job in _jobs.watch(job_id):
+            yield _sse("done" if job["status"] in ("done", "failed") else "progress", job)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.get("/api/health")
 async def health():
     llm = await check_llm()
+    qcache = get_knowledge_cache()
     return {
         "status": "ok",
         "version": "5.0",
@@ -523,13 +897,162 @@ async def health():
         "mode": "live" if llm else "mock",
         "llm_debug": get_llm_debug_status(),
         "chat_chain": get_chain_status(),
+        "circuit_breaker": get_circuit_status(),
+        "event_loop": loop_monitor.status(),
+        "response_cache": get_cache_status(),
+        "question_cache": qcache.status() if qcache else None,
+        "shared_state": get_store().status(),
+        "l7_rules": get_rule_engine().version_hash,
+        "jobs": _jobs.status(),
+        "latest_wins": get_latest_wins_status(),
+        "ready": _readiness["ready"],
     }
 
 
-@app.on_event("shutdown")
-async def shutdown():
-    await close_http_client()
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 텍스트 포맷 메트릭 (LLM 호출 지연·토큰·재시도, 캐시, 폴백)"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/debug/prompt-cache")
+async def debug_prompt_cache():
+    """엔드포인트별 업스트림 prefix 캐시 적중률 추정치 (TTFB는 /metrics의 llm_time_to_first_byte_seconds와 대조)"""
+    return get_prefix_cache_status()
+
+
+@app.get("/api/debug/prompts")
+async def debug_prompts():
+    """프롬프트 템플릿별 버전(내용 해시)·추정 토큰, 엔드포인트별 사용 템플릿과 응답 캐시 버전"""
+    return get_prompt_registry().status()
+
+
+@app.get("/api/debug/slow-requests")
+async def debug_slow_requests(limit: int = 20):
+    """최근 샘플링된 요청 중 느린 순으로 구간별 소요시간을 반환"""
+    return {"requests": get_slow_requests(limit)}
+
+
+# ── 표준 프로세스 캐시 워밍업 (warmup.py CLI / 예약 작업 공용) ──
+async def _warm_interview(ctx: dict) -> bool:
+    key = _interview_cache_key(ctx)
+    if _interview_cache.remaining_ttl(key) > WARMUP_TTL / 2:
+        return True
+    result, from_llm = await _generate_interview(ctx, "", "")
+    if from_llm:
+        _interview_cache.set(key, result, ttl=WARMUP_TTL)
+    return from_llm
+
 
+async def _warm_phases(ctx: dict) -> bool:
+    key = _phases_cache_key(ctx)
+    if _phases_cache.remaining_ttl(key) > WARMUP_TTL / 2:
+        return True
+    result = await _generate_phases(ctx)
+    if result["text"]:
+        _phases_cache.set(key, result, ttl=WARMUP_TTL)
+    return bool(result["text"])
+
+
+async def warm_standard_responses(concurrency: int = WARMUP_CONCURRENCY, limit: int = 0) -> dict:
+    """L345 트리의 모든 표준 컨텍스트에 대해 interview-start / suggest-phases 응답을 미리 캐시."""
+    contexts = standard_contexts()
+    if limit:
+        contexts = contexts[:limit]
+    return await warm_up({"interview": _warm_interview, "suggest-phases": _warm_phases}, contexts, concurrency)
+
+
+async def _scheduled_warmup() -> None:
+    # 공유 저장소를 쓰는 다중 워커 배포에서는 한 워커만 데운다 (캐시는 모두가 같이 쓴다)
+    if not acquire_lease("warmup", WARMUP_LEASE_SEC):
+        logger.info("예약 워밍업 건너뜀: 다른 워커가 실행 중")
+        return
+    try:
+        if not await check_llm():
+            logger.warning("예약 워밍업 건너뜀: LLM 연결 불가")
+            return
+        await warm_standard_responses()
+        save_snapshot(WARMUP_SNAPSHOT)
+    finally:
+        release_lease("warmup")
+
+
+_background_tasks: list[asyncio.Task] = []
+
+# ── 기동 예열 + 준비 상태 (/api/ready) ──
+# 예열이 끝나기 전에도 요청은 처리되지만(첫 요청이 예열 비용을 낼 뿐), 로드밸런서는 /api/ready가 200이 된 뒤에 트래픽을 보낸다.
+READY_PROBE_TIMEOUT = float(os.getenv("READY_PROBE_TIMEOUT", "30"))
+_readiness: dict = {"ready": False, "startedAt": 0.0, "readyAt": None, "steps": {}}
+
+
+async def _warm_start() -> None:
+    steps = _readiness["steps"]
+
+    async def step(name: str, fn):
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+            if asyncio.iscoroutine(result):
+                result = await result
+            steps[name] = {"ok": True, "ms": round((time.perf_counter() - t0) * 1000, 1), "result": result}
+        except Exception as e:
+            logger.exception(f"기동 예열 단계 실패: {name}")
+            steps[name] = {"ok": False, "ms": round((time.perf_counter() - t0) * 1000, 1), "error": str(e)}
+
+    async def _open_http_client():
+        await get_http_client()
+        return True
+
+    try:
+        await step("indexes", lambda: {"l345": build_l345_indexes(), "intent": build_intent_matchers(),
+                                       "l7_rules": get_rule_engine().version_hash,
+                                       "knowledge": len(get_knowledge_index().docs) if get_knowledge_index() else 0})
+        await step("http_client", _open_http_client)
+        if USE_MOCK != "true":
+            await step("connections", warm_llm_connections)
+            await step("llm_probe", lambda: asyncio.wait_for(check_llm(), READY_PROBE_TIMEOUT))
+            await step("schema_probe", lambda: asyncio.wait_for(resolve_schema_mode(), READY_PROBE_TIMEOUT))
+    finally:
+        _readiness["ready"] = True
+        _readiness["readyAt"] = time.time()
+        summary = {k: v["ok"] for k, v in steps.items()}
+        logger.info(f"기동 예열 완료 ({_readiness['readyAt'] - _readiness['startedAt']:.1f}초): {summary}")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    _readiness.update(ready=False, startedAt=time.time(), readyAt=None, steps={})
+    loop_monitor.start()
+    _jobs.start()
+    # 공유 저장소면 스냅샷 적재도 한 워커만 (임대는 만료되도록 두어 재시작 시 다시 적재 가능)
+    if acquire_lease("warmup-snapshot", 60):
+        load_snapshot(WARMUP_SNAPSHOT)
+    _background_tasks.append(asyncio.create_task(_warm_start()))
+    if WARMUP_HOUR is not None:
+        _background_tasks.append(asyncio.create_task(run_daily(_scheduled_warmup, WARMUP_HOUR)))
+    if WARMUP_ON_STARTUP:
+        _background_tasks.append(asyncio.create_task(_scheduled_warmup()))
+    try:
+        yield
+    finally:
+        for task in _background_tasks:
+            task.cancel()
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+        _background_tasks.clear()
+        await _jobs.stop()
+        await loop_monitor.stop()
+        await close_http_client()
+
+
+app.router.lifespan_context = lifespan
+
+
+@app.get("/api/ready")
+async def ready():
+    """로드밸런서 준비 확인 — 기동 예열(인덱스·HTTP 연결·첫 LLM 확인)이 끝나면 200, 그 전에는 503.
+    LLM 연결 실패는 준비 실패가 아니다 (규칙/mock 폴백으로 서비스 가능)."""
+    body = {**_readiness, "elapsedSec": round((_readiness["readyAt"] or time.time()) - _readiness["startedAt"], 2)}
+    return JSONResponse(status_code=200 if _readiness["ready"] else 503, content=body)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+"""합성 플로우 생성기 — 벤치마크용 (10 ~ 1000 노드)
+
+시작 → (태스크/분기 반복) → 종료 형태의 연결된 플로우를 만든다.
+분기 노드는 Yes/No 두 갈래를 만들고 다음 태스크에서 합류한다.
+같은 seed면 항상 같은 플로우가 나온다.
+
+실행:
+    python bench/flowgen.py --nodes 200 --out flow_200.json
+"""
+import argparse
+import json
+import random
+
+_OBJECTS = ["급여 항목", "지원서", "근태 기록", "증명서", "인사발령 명단", "교육 신청서", "평가 결과", "계약서",
+            "복리후생 신청", "출장 신청", "면접 일정", "퇴직금 내역", "보험 자격", "연봉 계약", "조직도"]
+_VERBS = ["조회한다", "입력한다", "수정한다", "저장한다", "추출한다", "비교한다", "집계한다", "기록한다",
+          "첨부한다", "발송한다", "요청한다", "안내한다", "검토한다", "처리한다"]
+_DECISIONS = ["승인 여부", "서류가 제출되었는가?", "D-7 이전인가?", "대상자가 있는가?", "오류 여부", "한도 초과 여부"]
+_SYSTEMS = ["", "", "", "SAP", "HR포털", "그룹웨어"]
+_LANES = ["lane-0", "lane-1", "lane-2", "lane-3"]
+
+
+def _task_label(rng: random.Random) -> str:
+    obj = rng.choice(_OBJECTS)
+    last = obj[-1]
+    has_batchim = "가" <= last <= "힣" and (ord(last) - 0xAC00) % 28 != 0
+    return f"{obj}{'을' if has_batchim else '를'} {rng.choice(_VERBS)}"
+
+
+def generate_flow(n_nodes: int, seed: int = 0, decision_ratio: float = 0.15, lanes: int = 3) -> dict:
+    """n_nodes개(시작/종료 포함) 노드의 플로우를 dict(nodes, edges)로 반환."""
+    rng = random.Random(seed)
+    n_nodes = max(3, n_nodes)
+    lane_ids = _LANES[:max(0, min(lanes, len(_LANES)))]
+    nodes = [{"id": "start", "type": "start", "label": "신청서 접수", "position": {"x": 0, "y": 0}}]
+    edges = []
+    prev_ids = ["start"]
+    body = n_nodes - 2
+    i = 0
+    while i < body:
+        node_id = f"n{i}"
+        is_decision = i < body - 2 and rng.random() < decision_ratio
+        if is_decision:
+            label = rng.choice(_DECISIONS)
+            node_type = "decision"
+        else:
+            label = _task_label(rng)
+            node_type = "process"
+        node = {"id": node_id, "type": node_type, "label": label, "position": {"x": 200 * (i + 1), "y": 0}}
+        system = rng.choice(_SYSTEMS)
+        if system and node_type == "process":
+            node["systemName"] = system
+        if lane_ids:
+            node["swimLaneId"] = rng.choice(lane_ids)
+        nodes.append(node)
+        for p in prev_ids:
+            edges.append({"id": f"e{len(edges)}", "source": p, "target": node_id})
+        if is_decision:
+            # Yes/No 두 갈래 → 다음 노드들이 모두 합류
+            yes_id, no_id = f"n{i + 1}", f"n{i + 2}"
+            for branch_id, branch_label in ((yes_id, "Yes"), (no_id, "No")):
+                nodes.append({
+                    "id": branch_id,
+                    "type": "process",
+                    "label": _task_label(rng),
+                    "position": {"x": 200 * (i + 2), "y": 0},
+                    **({"swimLaneId": rng.choice(lane_ids)} if lane_ids else {}),
+                })
+                edges.append({"id": f"e{len(edges)}", "source": node_id, "target": branch_id, "label": branch_label})
+            prev_ids = [yes_id, no_id]
+            i += 3
+        else:
+            prev_ids = [node_id]
+            i += 1
+    nodes.append({"id": "end", "type": "end", "label": "결과 저장 완료", "position": {"x": 200 * (body + 1), "y": 0}})
+    for p in prev_ids:
+        edges.append({"id": f"e{len(edges)}", "source": p, "target": "end"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 플로우 생성")
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--decision-ratio", type=float, default=0.15)
+    parser.add_argument("--lanes", type=int, default=3)
+    parser.add_argument("--out", default="-")
+    args = parser.parse_args()
+    flow = generate_flow(args.nodes, args.seed, args.decision_ratio, args.lanes)
+    text = json.dumps(flow, ensure_ascii=False, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""요청 디코딩 벤치마크 — FastAPI 기본 경로 vs wire_format 경로
+
+ReviewRequest(노드 N개 + 엣지) 본문을 디코딩해 요청 모델을 만드는 데 드는 시간·본문 크기·메모리 피크를 비교한다.
+
+  stock        json.loads → pydantic 검증 (FastAPI 기본 경로)
+  json         model_validate_json 한 번 (application/json, FlowIngestRoute 기본)
+  columnar     열 지향 JSON → LiteNode/LiteEdge (application/vnd.flow.columnar+json)
+  msgpack      열 지향 msgpack → LiteNode/LiteEdge (application/msgpack, 설치 시)
+
+실행 (backend 디렉터리에서):
+    python bench/ingest_bench.py --sizes 100,500,1000
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from flowgen import generate_flow  # noqa: E402
+from schemas import ReviewRequest  # noqa: E402
+from wire_format import COLUMNAR_JSON, decode_compact, decode_json, msgpack  # noqa: E402
+
+
+def columnar(items: list[dict]) -> dict:
+    cols = sorted({k for it in items for k in it})
+    return {"cols": cols, "rows": [[it.get(c) for c in cols] for it in items]}
+
+
+def _measure(fn, repeat: int) -> tuple[float, float]:
+    """(건당 ms, 메모리 피크 KB)"""
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    ms = (time.perf_counter() - t0) / repeat * 1000
+    tracemalloc.start()
+    result = fn()  # noqa: F841 — 결과 객체가 살아 있는 동안의 피크
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ms, peak / 1024
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    rows = []
+    for size in sizes:
+        flow = generate_flow(size, seed=size)
+        for n in flow["nodes"]:
+            n.setdefault("position", {"x": 120.5, "y": 80.25})  # 프론트가 보내는 좌표
+        body = {"currentNodes": flow["nodes"], "currentEdges": flow["edges"], "userMessage": "",
+                "context": {"l4": "채용", "l5": "채용 공고"}}
+        compact = {**body, "currentNodes": columnar([{k: v for k, v in n.items() if k != "position"} for n in flow["nodes"]]),
+                   "currentEdges": columnar(flow["edges"])}
+        json_body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        cases = [
+            ("stock", json_body, lambda b=json_body: ReviewRequest.model_validate(json.loads(b))),
+            ("json", json_body, lambda b=json_body: decode_json(ReviewRequest, b)),
+        ]
+        col_body = json.dumps(compact, ensure_ascii=False).encode("utf-8")
+        cases.append(("columnar", col_body, lambda b=col_body: decode_compact(ReviewRequest, b, COLUMNAR_JSON)))
+        if msgpack is not None:
+            mp_body = msgpack.packb(compact)
+            cases.append(("msgpack", mp_body, lambda b=mp_body: decode_compact(ReviewRequest, b, "application/msgpack")))
+        for name, payload, fn in cases:
+            ms, peak_kb = _measure(fn, repeat)
+            rows.append({"nodes": size, "format": name, "kb": round(len(payload) / 1024, 1),
+                         "decode_ms": round(ms, 2), "peak_kb": round(peak_kb)})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="요청 디코딩 벤치마크")
+    parser.add_argument("--sizes", default="100,500,1000")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if msgpack is None:
+        print("msgpack 미설치 — msgpack 경로는 건너뜀")
+    for r in run(sizes, args.repeat):
+        print(f"{r['nodes']:>5} nodes {r['format']:<9} {r['kb']:>8.1f} KB | decode {r['decode_ms']:>7.2f} ms "
+              f"| peak {r['peak_kb']:>6} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""백엔드 부하 드라이버 — 처리량, p50/p95/p99, 이벤트 루프 지연
+
+기본 모드는 모의 LLM 서버(bench/mock_llm_server.py)를 자식 프로세스로 띄우고,
+app을 같은 프로세스·같은 이벤트 루프에서 ASGI로 직접 호출한다.
+그래서 동기 curl 호출이나 큰 플로우의 프롬프트 생성처럼 루프를 막는 코드는
+"이벤트 루프 지연" 수치로 바로 드러난다.
+
+실행 (backend 디렉터리에서):
+    python bench/load_driver.py --sizes 10,100,1000 --requests 40 --concurrency 8
+    python bench/load_driver.py --endpoints chat,review --transport curl --latency 1.0
+    python bench/load_driver.py --target http://127.0.0.1:8000   # 이미 떠 있는 서버 대상 (루프 지연 제외)
+    python bench/load_driver.py --endpoints chat,review --malformed-rate 0.2 --schema-mode off   # 스키마 강제 전
+    python bench/load_driver.py --endpoints chat,review --malformed-rate 0.2 --schema-mode auto  # 스키마 강제 후
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from flowgen import generate_flow  # noqa: E402
+
+ENDPOINTS = ("chat", "review", "validate-l7", "interview-start")
+_CHAT_MESSAGES = ["다음 단계 추천해줘", "누락된 단계가 있을까?", "분기점은 어디에 두면 좋을까?", "전체 흐름을 검토해줘"]
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class LoopLagSampler:
+    """interval마다 깨어나 예정 시각 대비 늦은 만큼을 기록한다."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self) -> None:
+        self.samples.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        ms = [s * 1000 for s in self.samples]
+        return {
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+            "max_ms": round(max(ms), 2) if ms else 0.0,
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_mock_server(args) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    cmd = [sys.executable, str(BENCH_DIR / "mock_llm_server.py"), "--port", str(port),
+           "--latency", str(args.latency), "--jitter", str(args.jitter), "--failure-rate", str(args.failure_rate),
+           "--malformed-rate", str(args.malformed_rate), "--schema-support", args.schema_support]
+    proc = subprocess.Popen(cmd, cwd=str(BACKEND_DIR))
+    base_url = f"http://127.0.0.1:{port}/v1"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return proc, base_url
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("mock LLM 서버 기동 실패")
+
+
+def _contexts() -> list[dict]:
+    from l345_reference import L345_TREE
+    ctxs = []
+    for l4_dict in L345_TREE.values():
+        for l4, l5_list in l4_dict.items():
+            for l5 in l5_list:
+                ctxs.append({"l4": l4, "l5": l5, "processName": l5})
+    return ctxs
+
+
+def build_payload(endpoint: str, flow: dict, ctx: dict, i: int) -> dict:
+    if endpoint == "chat":
+        return {"message": _CHAT_MESSAGES[i % len(_CHAT_MESSAGES)], "context": ctx,
+                "currentNodes": flow["nodes"], "currentEdges": flow["edges"]}
+    if endpoint == "review":
+        return {"context": ctx, "currentNodes": flow["nodes"], "currentEdges": flow["edges"]}
+    if endpoint == "validate-l7":
+        node = flow["nodes"][i % len(flow["nodes"])]
+        return {"nodeId": node["id"], "label": node["label"], "nodeType": node["type"], "context": ctx}
+    if endpoint == "interview-start":
+        # 인터뷰 TTL 캐시를 피하기 위해 요청마다 L6 이름을 바꾼다
+        ctx = {**ctx, "processName": f"{ctx['processName']} #{len(flow['nodes'])}-{i}"}
+        ends = [n for n in flow["nodes"] if n["type"] in ("start", "end")]
+        return {"context": ctx, "currentNodes": ends, "currentEdges": []}
+    raise ValueError(endpoint)
+
+
+async def run_endpoint(client, endpoint: str, flow: dict, ctxs: list[dict], n_requests: int,
+                       concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(n_requests))
+    rng = random.Random(0)
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            payload = build_payload(endpoint, flow, rng.choice(ctxs), i)
+            t0 = time.perf_counter()
+            try:
+                r = await client.post(f"/api/{endpoint}", json=payload)
+                if r.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": n_requests,
+        "errors": errors,
+        "rps": round(n_requests / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+
+async def main_async(args) -> list[dict]:
+    import httpx
+
+    if args.target:
+        client = httpx.AsyncClient(base_url=args.target, timeout=300)
+        sampler = None
+    else:
+        import logging
+        import app as backend_app
+        logging.getLogger().setLevel(logging.WARNING)
+        transport = httpx.ASGITransport(app=backend_app.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300)
+        sampler = LoopLagSampler()
+
+    ctxs = _contexts()
+    results = []
+    async with contextlib.AsyncExitStack() as stack:
+        stack.push_async_callback(client.aclose)
+        if not args.target:
+            # in-process 모드도 실서버처럼 lifespan(예열)을 돌리고 준비될 때까지 기다린 뒤 잰다
+            await stack.enter_async_context(backend_app.app.router.lifespan_context(backend_app.app))
+            while (await client.get("/api/ready")).status_code != 200:
+                await asyncio.sleep(0.1)
+        for size in args.sizes:
+            flow = generate_flow(size, seed=size)
+            for endpoint in args.endpoints:
+                if sampler:
+                    sampler.start()
+                row = await run_endpoint(client, endpoint, flow, ctxs, args.requests, args.concurrency)
+                row = {"endpoint": endpoint, "nodes": size, **row}
+                if sampler:
+                    lag = await sampler.stop()
+                    row.update({f"loop_lag_{k}": v for k, v in lag.items()})
+                results.append(row)
+                print(_format_row(row), flush=True)
+        _print_parse_summary((await client.get("/metrics")).text)
+    return results
+
+
+def _print_parse_summary(metrics_text: str) -> None:
+    """/metrics에서 파싱 결과(llm_parse_total)와 재시도(llm_retries_total)만 추려 출력."""
+    lines = [line for line in metrics_text.splitlines()
+             if line.startswith(("llm_parse_total{", "llm_retries_total{"))]
+    if lines:
+        print("\n".join(["", "LLM 응답 파싱 / 재시도:"] + [f"  {line}" for line in lines]), flush=True)
+
+
+def _format_row(row: dict) -> str:
+    lag = ""
+    if "loop_lag_p99_ms" in row:
+        lag = f" | loop lag p50 {row['loop_lag_p50_ms']:>7.2f} p99 {row['loop_lag_p99_ms']:>8.2f} max {row['loop_lag_max_ms']:>8.2f} ms"
+    return (f"{row['endpoint']:<16} {row['nodes']:>5} nodes | {row['requests']:>4} req {row['errors']:>3} err "
+            f"| {row['rps']:>8.2f} rps | p50 {row['p50_ms']:>8.1f} p95 {row['p95_ms']:>8.1f} p99 {row['p99_ms']:>8.1f} ms{lag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process Coaching 백엔드 부하 벤치마크")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--sizes", default="10,100,1000", help="플로우 노드 수 목록")
+    parser.add_argument("--requests", type=int, default=40, help="엔드포인트×크기당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.3, help="모의 LLM 평균 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="모의 LLM이 형식이 깨진 본문을 줄 확률")
+    parser.add_argument("--schema-support", default="json_schema,json_object,guided_json",
+                        help="모의 LLM이 받아들이는 스키마 파라미터 (빈 값이면 모두 400)")
+    parser.add_argument("--schema-mode", default="auto", help="LLM_SCHEMA_MODE 설정 (auto|json_schema|guided_json|json_object|off)")
+    parser.add_argument("--transport", choices=["httpx", "curl", "auto"], default="httpx",
+                        help="LLM_USE_CURL 설정 (httpx=false, curl=true)")
+    parser.add_argument("--target", default="", help="외부 서버 URL (지정 시 모의 LLM/in-process 모드 생략)")
+    parser.add_argument("--json", default="", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    args.sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    proc = None
+    if not args.target:
+        proc, base_url = _start_mock_server(args)
+        os.environ["LLM_BASE_URL"] = base_url
+        os.environ["USE_MOCK"] = "false"
+        os.environ["LLM_USE_CURL"] = {"httpx": "false", "curl": "true", "auto": "auto"}[args.transport]
+        os.environ["LLM_SCHEMA_MODE"] = args.schema_mode
+    try:
+        results = asyncio.run(main_async(args))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=5)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""로컬 OpenAI 호환 스텁 서버 — 벤치마크/오프라인 개발용
+
+/v1/models, /v1/chat/completions 만 흉내낸다.
+지연(latency)·지터(jitter)·실패율·스트리밍을 옵션으로 조절할 수 있어
+실제 GPU 없이도 백엔드의 재시도/폴백/동시성 동작을 재현한다.
+
+--malformed-rate: 그 확률로 형식이 깨진 본문(코드블록+설명, 잘린 JSON)을 돌려준다.
+요청에 지원하는 스키마 파라미터(response_format json_schema/json_object, guided_json)가 있으면
+유도 디코딩을 흉내내 항상 올바른 JSON을 돌려준다. --schema-support에 없는 파라미터는 400으로 거부한다.
+
+실행:
+    python bench/mock_llm_server.py --port 18533 --latency 1.5 --jitter 0.5 --failure-rate 0.05
+    python bench/mock_llm_server.py --malformed-rate 0.2 --schema-support guided_json   # json_schema는 400
+    LLM_BASE_URL=http://127.0.0.1:18533/v1 python app.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_LATENCY = float(os.getenv("MOCK_LLM_LATENCY", "0.5"))
+MOCK_JITTER = float(os.getenv("MOCK_LLM_JITTER", "0.1"))
+MOCK_FAILURE_RATE = float(os.getenv("MOCK_LLM_FAILURE_RATE", "0"))
+MOCK_STREAM_CHUNKS = int(os.getenv("MOCK_LLM_STREAM_CHUNKS", "8"))
+MOCK_MALFORMED_RATE = float(os.getenv("MOCK_LLM_MALFORMED_RATE", "0"))
+MOCK_SCHEMA_SUPPORT = os.getenv("MOCK_LLM_SCHEMA_SUPPORT", "json_schema,json_object,guided_json")
+
+app = FastAPI(title="Mock OpenAI-compatible LLM")
+_stats = {"requests": 0, "failures": 0, "malformed": 0}
+
+
+def _delay() -> float:
+    return max(0.0, MOCK_LATENCY + random.uniform(-MOCK_JITTER, MOCK_JITTER))
+
+
+def _fake_content(system: str, user: str) -> str:
+    """시스템 프롬프트 종류에 맞춰 각 엔드포인트가 파싱할 수 있는 JSON을 만든다."""
+    if "Zero-Based Redesign" in system:
+        node_ids = re.findall(r"ID: ([^,)]+)", user)
+        return json.dumps([
+            {"nodeId": nid, "suggestedCategory": "as_is", "confidence": "medium", "reasoning": "모의 분류"}
+            for nid in node_ids
+        ], ensure_ascii=False)
+    if "JSON 배열" in system:
+        return json.dumps(["요건확인", "서류검토", "결과판정"], ensure_ascii=False)
+    return json.dumps({
+        "speech": "모의 응답입니다. 흐름이 잘 정리되어 있어요.",
+        "guidance": "분기점을 한 번 더 확인해보세요.",
+        "greeting": "환영합니다!",
+        "processFlowExample": "접수 → 검토 → 통보",
+        "guidanceText": "예외 상황을 고려해보세요.",
+        "summary": "모의 분석 요약",
+        "inefficiencies": [],
+        "digitalWorker": [],
+        "sscCandidates": [],
+        "redesign": [],
+        "recommendations": [],
+        "suggestions": [],
+        "quickQueries": ["예외 처리는 어떻게 하나요?", "승인 단계가 있나요?"],
+    }, ensure_ascii=False)
+
+
+def _malform(content: str) -> str:
+    """모델이 형식을 어기는 흔한 두 경우: 코드블록+설명(정규식으로 복구 가능), 중간에 끊긴 JSON(복구 불가)."""
+    if random.random() < 0.5:
+        return f"네, 아래와 같이 정리했어요.\n```json\n{content}\n```\n참고해 주세요."
+    return content[: max(1, len(content) * 2 // 3)]
+
+
+def _schema_param(body: dict) -> str:
+    fmt = body.get("response_format")
+    if isinstance(fmt, dict) and fmt.get("type") in ("json_schema", "json_object"):
+        return fmt["type"]
+    return "guided_json" if "guided_json" in body else ""
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "mock-llm", "object": "model"}]}
+
+
+@app.get("/v1/stats")
+async def stats():
+    return _stats
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    _stats["requests"] += 1
+    messages = body.get("messages") or []
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+    delay = _delay()
+    schema = _schema_param(body)
+    supported = {m.strip() for m in MOCK_SCHEMA_SUPPORT.split(",") if m.strip()}
+    if schema and schema not in supported:
+        return JSONResponse({"error": {"message": f"Unsupported parameter: {schema}", "type": "invalid_request_error"}},
+                            status_code=400)
+
+    if random.random() < MOCK_FAILURE_RATE:
+        _stats["failures"] += 1
+        await asyncio.sleep(delay / 2)
+        return JSONResponse({"error": {"message": "mock failure"}}, status_code=503)
+
+    content = _fake_content(system, user)
+    if not schema and random.random() < MOCK_MALFORMED_RATE:
+        _stats["malformed"] += 1
+        content = _malform(content)
+    usage = {"prompt_tokens": (len(system) + len(user)) // 2, "completion_tokens": len(content) // 2}
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    created = int(time.time())
+
+    if body.get("stream"):
+        async def events():
+            # 첫 토큰까지의 지연(TTFT) 후 청크를 고르게 흘려보낸다
+            await asyncio.sleep(delay / 2)
+            n = max(1, MOCK_STREAM_CHUNKS)
+            step = max(1, len(content) // n)
+            for i in range(0, len(content), step):
+                chunk = {"id": "mock", "object": "chat.completion.chunk", "created": created,
+                         "choices": [{"index": 0, "delta": {"content": content[i:i + step]}}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(delay / 2 / n)
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(delay)
+    return {
+        "id": "mock",
+        "object": "chat.completion",
+        "created": created,
+        "model": body.get("model", "mock-llm"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+def main() -> None:
+    global MOCK_LATENCY, MOCK_JITTER, MOCK_FAILURE_RATE, MOCK_STREAM_CHUNKS, MOCK_MALFORMED_RATE, MOCK_SCHEMA_SUPPORT
+    parser = argparse.ArgumentParser(description="로컬 OpenAI 호환 모의 LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18533)
+    parser.add_argument("--latency", type=float, default=MOCK_LATENCY, help="평균 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=MOCK_JITTER, help="지연 편차(±초)")
+    parser.add_argument("--failure-rate", type=float, default=MOCK_FAILURE_RATE, help="503 응답 확률 (0~1)")
+    parser.add_argument("--stream-chunks", type=int, default=MOCK_STREAM_CHUNKS)
+    parser.add_argument("--malformed-rate", type=float, default=MOCK_MALFORMED_RATE,
+                        help="스키마 파라미터 없는 요청에 형식이 깨진 본문을 줄 확률 (0~1)")
+    parser.add_argument("--schema-support", default=MOCK_SCHEMA_SUPPORT,
+                        help="받아들이는 스키마 파라미터 (json_schema,json_object,guided_json 중; 빈 값이면 모두 400)")
+    args = parser.parse_args()
+    MOCK_LATENCY, MOCK_JITTER = args.latency, args.jitter
+    MOCK_FAILURE_RATE, MOCK_STREAM_CHUNKS = args.failure_rate, args.stream_chunks
+    MOCK_MALFORMED_RATE, MOCK_SCHEMA_SUPPORT = args.malformed_rate, args.schema_support
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""프롬프트 토큰 리포트 — L345/분기점 가이드 전체 주입 vs 관련 부분만 주입
+
+표준 컨텍스트(warmup.standard_contexts, L3/L4/L5 전체) 각각에 대해 엔드포인트별로
+system 프롬프트 + L345 참조 블록의 토큰 수(metrics.estimate_tokens 추정치)를 비교한다.
+
+  before  system에 분기점 가이드 전체(BRANCHING_GUIDE), 참조 블록은 L3 구조 전체
+  after   system에 BRANCHING_GUIDE_CORE, 참조 블록은 현재 L4와 앞뒤 L4 (+ 그 L4의 분기점 예시)
+
+--unresolved를 주면 L4를 모르는 경우(context.l4가 L3 이름, 플로우 라벨은 임의 L4의 L5 이름들)도 따로 집계한다.
+플로우·질문 등 두 방식에서 같은 부분은 빼고 비교하므로 "절감"은 요청당 절대 토큰 수다.
+
+실행 (backend 디렉터리에서):
+    python bench/prompt_token_report.py
+    python bench/prompt_token_report.py --unresolved --seed 1
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from l345_reference import L345_TREE, _l3_static_block, get_l345_parts  # noqa: E402
+from metrics import estimate_tokens  # noqa: E402
+from prompt_templates import (BRANCHING_GUIDE, BRANCHING_GUIDE_CORE, COACH_TEMPLATE, FIRST_SHAPE_SYSTEM,  # noqa: E402
+                              FLOW_OVERVIEW_SYSTEM, PDD_INSIGHTS_SYSTEM, REVIEW_SYSTEM)
+from warmup import standard_contexts  # noqa: E402
+
+# 엔드포인트 → (system 프롬프트, 참조 블록에 분기점 예시를 붙이는지) — app.py와 같은 조합
+ENDPOINTS = {
+    "review": (REVIEW_SYSTEM, True),
+    "chat-coach": (COACH_TEMPLATE, True),
+    "chat-knowledge": (COACH_TEMPLATE, True),
+    "chat-flow-overview": (FLOW_OVERVIEW_SYSTEM, False),
+    "interview-start": (FLOW_OVERVIEW_SYSTEM, False),
+    "first-shape-welcome": (FIRST_SHAPE_SYSTEM, False),
+    "pdd-insights": (PDD_INSIGHTS_SYSTEM, False),
+}
+
+
+def _before(system: str, l3: str) -> int:
+    return estimate_tokens(system.replace(BRANCHING_GUIDE_CORE, BRANCHING_GUIDE)) + estimate_tokens(_l3_static_block(l3))
+
+
+def _after(system: str, branching: bool, ctx: dict, labels: list[str]) -> int:
+    reference, _ = get_l345_parts(ctx["l4"], ctx["l5"], ctx["processName"], labels=labels, branching=branching)
+    return estimate_tokens(system) + estimate_tokens(reference)
+
+
+def report(cases: list[tuple[dict, list[str]]]) -> list[tuple]:
+    rows = []
+    for name, (system, branching) in ENDPOINTS.items():
+        before = [_before(system, ctx["l3"]) for ctx, _ in cases]
+        after = [_after(system, branching, ctx, labels) for ctx, labels in cases]
+        b, a = sum(before) / len(before), sum(after) / len(after)
+        rows.append((name, b, a, b - a, (b - a) / b * 100 if b else 0.0, max(x - y for x, y in zip(before, after))))
+    return rows
+
+
+def _print(title: str, rows: list[tuple], n: int) -> None:
+    print(f"\n{title} — 컨텍스트 {n}개, 요청당 평균 (system + L345 참조, 추정 토큰)")
+    print(f"{'endpoint':<22}{'before':>9}{'after':>9}{'saved':>9}{'saved%':>8}{'max saved':>11}")
+    for name, b, a, saved, pct, best in rows:
+        print(f"{name:<22}{b:>9.0f}{a:>9.0f}{saved:>9.0f}{pct:>7.1f}%{best:>11.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="L345/분기점 가이드 선택 주입 전후 프롬프트 토큰 비교")
+    parser.add_argument("--unresolved", action="store_true", help="L4 미확정(라벨 겹침으로 선택) 경우도 집계")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    contexts = standard_contexts()
+    _print("L4 확정", report([(ctx, []) for ctx in contexts]), len(contexts))
+
+    if args.unresolved:
+        rng = random.Random(args.seed)
+        cases = []
+        for ctx in contexts:
+            l4s = list(L345_TREE[ctx["l3"]])
+            labels = [f"{l5}을 처리한다" for l5 in L345_TREE[ctx["l3"]][rng.choice(l4s)]]
+            cases.append(({**ctx, "l4": ctx["l3"], "l5": "", "processName": ""}, labels))
+        _print("L4 미확정 (L3 이름 + 플로우 라벨)", report(cases), len(cases))
+
+
+if __name__ == "__main__":
+    main()
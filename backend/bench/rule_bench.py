@@ -0,0 +1,145 @@
+"""L7 규칙 처리량 벤치마크 — 컴파일된 규칙 엔진 vs 규칙을 매번 해석하는 경로
+
+같은 l7_rules.json을 두 방식으로 평가해 초당 라벨 수를 비교하고, 두 결과가 같은지도 확인한다.
+
+  interpreted  호출마다 규칙 파일의 표/패턴 문자열을 그대로 읽어 분기별로 검사 (엔진 도입 전 mock_validate 방식)
+  compiled     l7_rule_engine.L7RuleEngine.validate (기동 시 한 번 컴파일)
+
+라벨 묶음:
+  flow         flowgen 합성 플로우의 태스크/분기 라벨 (평범한 라벨 위주)
+  mixed        복수 동작·시스템명·금지 동사·긴 라벨을 섞은 라벨
+
+실행 (backend 디렉터리에서):
+    python bench/rule_bench.py --labels 5000 --repeat 5
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from flowgen import generate_flow  # noqa: E402
+from l7_rule_engine import L7RuleEngine, load_rules  # noqa: E402
+
+_PARTS = ["급여를", "근태 기록", "처리한다", "확인한다", "검토하고", "조회한다", "승인", "여부", "?", "(SAP)",
+          "[인사 시스템]", "(PDF)", "HR포털에서 ", "입력하며, ", "저장한 후 ", "비교한다, ", "하고자 한다", "판정",
+          "이상", "기록한다", "정리한다", "반영한다", "협의한다", "를 ", "초과", "가능"]
+
+
+def interpret(spec: dict, label: str, node_type: str = "process") -> dict:
+    """규칙 파일을 매번 해석하는 기준 구현 (엔진과 결과가 같아야 한다)."""
+    text = label.strip()
+    tables, patterns = spec["tables"], spec["patterns"]
+    banned = next((v for v in tables["banned_verbs"] if v in text), None)
+    system = None
+    for item in patterns["system_name"]:
+        m = re.search(item["pattern"], text)
+        if m and m.group(1):
+            candidate = m.group(1).strip()
+            if candidate.upper() in tables["non_system_terms"]:
+                continue
+            if re.search(patterns["system_upper"], candidate) or re.search(patterns["system_keywords"], candidate):
+                system = candidate
+                break
+    issues = []
+    for rule in spec["rules"]:
+        node_types = rule.get("nodeTypes", "all")
+        if node_types != "all" and (node_types == "decision") != (node_type == "decision"):
+            continue
+        check, values = rule["check"], None
+        if check == "too_short" and len(text) < rule["minLength"]:
+            values = {}
+        elif check == "too_long" and len(text) > rule["maxLength"]:
+            values = {}
+        elif check == "banned_verb" and banned:
+            values = {"verb": banned}
+        elif check == "system_name" and system:
+            values = {"system": system}
+        elif check == "refinable_verb" and not banned:
+            verb = next((v for v in tables["refinable_verbs"] if v in text), None)
+            if verb:
+                values = {"verb": verb, "alternatives": tables["refinable_verbs"][verb]}
+        elif check == "compound_action" and not any(re.search(i["pattern"], text) for i in patterns["intent_exclude"]):
+            for item in patterns["compound"]:
+                m = re.search(item["pattern"], text)
+                if m and m.group(1) and m.group(2):
+                    p1, p2 = m.group(1), m.group(2)
+                    values = {"p1": p1 if p1.endswith("다") else p1 + "다", "p2": p2 if p2.endswith("다") else p2 + "다"}
+                    break
+        elif check == "missing_object" and len(text) >= rule.get("minLength", 0):
+            verb = next((v for v in tables["transitive_verbs"] if v in text), None)
+            if verb and not re.search(patterns["object_particle"], text):
+                values = {"verb": verb}
+        elif check == "missing_criterion" and not any(h in text for h in tables["decision_hints"]):
+            values = {}
+        elif check == "process_ending" and re.search(patterns["process_ending"], text):
+            values = {}
+        elif check == "decision_ending" and any(re.search(p, text) for p in patterns["decision_ending"]):
+            values = {}
+        if values is not None:
+            issues.append({"ruleId": rule["id"], "severity": rule["severity"], "friendlyTag": rule["friendlyTag"],
+                           **{f: rule[f].format(**values) for f in ("message", "suggestion", "reasoning")}})
+    penalty = spec["scoring"]["penalty"]
+    score = max(0, spec["scoring"]["base"] - sum(penalty.get(i["severity"], 0) for i in issues))
+    is_pass = not any(i["severity"] == "reject" for i in issues)
+    encouragement = spec["encouragement"]["clean" if not issues else ("pass" if is_pass else "fail")]
+    result = {"pass": is_pass, "score": score, "confidence": "high", "issues": issues,
+              "rewriteSuggestion": None, "encouragement": encouragement}
+    if system:
+        result["detectedSystemName"] = system
+    return result
+
+
+def label_sets(count: int) -> dict[str, list[tuple[str, str]]]:
+    flow = generate_flow(count, seed=count)
+    flow_labels = [(n["label"], n["type"]) for n in flow["nodes"] if n["type"] in ("process", "decision")]
+    rng = random.Random(count)
+    mixed = [("".join(rng.choice(_PARTS) for _ in range(rng.randint(1, 6))), rng.choice(("process", "process", "decision")))
+             for _ in range(count)]
+    mixed += [("급여 " * 40 + "를 조회한다", "process")]
+    return {"flow": flow_labels, "mixed": mixed}
+
+
+def _rate(fn, labels: list[tuple[str, str]], repeat: int) -> float:
+    for label, node_type in labels[:200]:
+        fn(label, node_type)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for label, node_type in labels:
+            fn(label, node_type)
+    return len(labels) * repeat / (time.perf_counter() - t0)
+
+
+def run(count: int, repeat: int) -> list[dict]:
+    spec = load_rules()
+    t0 = time.perf_counter()
+    engine = L7RuleEngine(spec)
+    compile_ms = (time.perf_counter() - t0) * 1000
+    rows = []
+    for name, labels in label_sets(count).items():
+        mismatches = sum(engine.validate(lab, nt) != interpret(spec, lab, nt) for lab, nt in labels)
+        interpreted = _rate(lambda lab, nt: interpret(spec, lab, nt), labels, repeat)
+        compiled = _rate(engine.validate, labels, repeat)
+        rows.append({"set": name, "labels": len(labels), "interpreted": interpreted, "compiled": compiled,
+                     "speedup": compiled / interpreted, "mismatches": mismatches})
+    print(f"규칙 v{engine.version} ({engine.version_hash}) 컴파일 {compile_ms:.2f} ms")
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="L7 규칙 처리량 벤치마크")
+    parser.add_argument("--labels", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for r in run(args.labels, args.repeat):
+        print(f"{r['set']:<6} {r['labels']:>6} labels | interpreted {r['interpreted']:>10,.0f}/s "
+              f"| compiled {r['compiled']:>10,.0f}/s | x{r['speedup']:.1f} | 불일치 {r['mismatches']}")
+
+
+if __name__ == "__main__":
+    main()
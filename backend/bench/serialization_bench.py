@@ -0,0 +1,93 @@
+"""응답 직렬화 벤치마크 — 기본 FastAPI 경로 vs 빠른 JSON 경로
+
+대형 /api/review 응답(노드마다 제안 1개)과 배치 L7 검증 결과(노드마다 mock_validate 1건)를
+FastAPI가 실제로 거치는 단계 그대로 직렬화해 건당 소요시간을 비교한다.
+
+  stock        jsonable_encoder → JSONResponse(표준 json)          (response_model 없음, 기존 방식)
+  fast         FastJSONResponse(orjson) 직접                        (FastJSONRoute 경로)
+  model        response_model 검증·직렬화 → FastJSONResponse         (validate-l7/review/categorize)
+
+실행 (backend 디렉터리에서):
+    python bench/serialization_bench.py --sizes 100,1000 --repeat 30
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from fast_json import FastJSONResponse, orjson  # noqa: E402
+from flow_services import mock_validate  # noqa: E402
+from flowgen import generate_flow  # noqa: E402
+from schemas import ReviewResponse, ValidateL7Response  # noqa: E402
+
+
+def review_payload(flow: dict) -> dict:
+    suggestions = [{
+        "action": "MODIFY",
+        "targetNodeId": n["id"],
+        "summary": f"'{n['label']}' 라벨을 더 구체적으로",
+        "labelSuggestion": f"{n['label']} (담당자 확인)",
+        "reason": "대상과 동작이 드러나면 제3자가 바로 이해할 수 있습니다",
+        "reasoning": "HR 프로세스에서는 누가 무엇을 처리하는지 명확해야 인수인계와 감사 대응이 쉬워집니다.",
+        "confidence": "medium",
+    } for n in flow["nodes"] if n["type"] in ("process", "decision")]
+    return {"speech": "구조가 잘 잡혀 있어요. 라벨을 조금 더 구체화해볼까요?", "suggestions": suggestions,
+            "quickQueries": ["예외 처리는 어떻게 하나요?", "승인 단계가 있나요?"], "tone": "건설적"}
+
+
+def batch_payload(flow: dict) -> list[dict]:
+    return [{"nodeId": n["id"], **mock_validate(n["label"], n["type"])} for n in flow["nodes"]]
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # 워밍업
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    review_ta = TypeAdapter(ReviewResponse)
+    validate_ta = TypeAdapter(list[ValidateL7Response])
+    rows = []
+    for size in sizes:
+        flow = generate_flow(size, seed=size)
+        cases = [
+            ("review", review_payload(flow), review_ta),
+            ("validate-batch", batch_payload(flow), validate_ta),
+        ]
+        for name, payload, ta in cases:
+            stock = _time(lambda: JSONResponse(jsonable_encoder(payload)), repeat)
+            fast = _time(lambda: FastJSONResponse(payload), repeat)
+            model = _time(lambda: FastJSONResponse(ta.dump_python(ta.validate_python(payload), mode="json",
+                                                                   by_alias=True, exclude_unset=True)), repeat)
+            size_kb = len(FastJSONResponse(payload).body) / 1024
+            rows.append({"payload": name, "nodes": size, "kb": round(size_kb, 1), "stock_ms": round(stock, 2),
+                         "fast_ms": round(fast, 2), "model_ms": round(model, 2),
+                         "speedup": round(stock / fast, 1) if fast else 0.0})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="응답 직렬화 벤치마크")
+    parser.add_argument("--sizes", default="100,1000")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    print(f"orjson: {'사용' if orjson is not None else '미설치 (표준 json 대체 경로)'}")
+    for r in run(sizes, args.repeat):
+        print(f"{r['payload']:<15} {r['nodes']:>5} nodes {r['kb']:>8.1f} KB | stock {r['stock_ms']:>8.2f} ms "
+              f"| fast {r['fast_ms']:>7.2f} ms | model {r['model_ms']:>7.2f} ms | x{r['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
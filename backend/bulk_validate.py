@@ -0,0 +1,238 @@
+"""내보낸 플로우 일괄 검증 CLI — L7 라벨 규칙 + 구조 규칙, 프로세스 풀
+
+캔버스에서 내보낸 플로우 JSON(분기마다 수백 개)을 /api/validate-l7 없이 오프라인으로 검증한다.
+플로우마다 태스크/판단 노드 라벨에 mock_validate(L7 R-규칙)를, 플로우 전체에 S-규칙을 돌려
+점수 요약을 JSONL 또는 CSV로 한 줄씩 쓴다.
+
+입력 (여러 개 지정 가능):
+  flow.json         exportFlow 형식 ({"processContext", "nodes", "edges", ...}) 파일 하나
+  exports/          디렉터리 — 하위의 *.json 전부 (이름순)
+  archive.jsonl     한 줄에 플로우 하나
+
+- 파일은 경로만 워커로 넘기고 워커가 직접 읽는다. 플로우를 --batch개씩 묶어 워커에 넘기고(작업당 IPC 비용 분산)
+  묶음은 --workers × 4개까지만 띄워 둔 채 끝나는 대로 결과를 써서, 파일이 몇 개든 메모리는 일정하다
+  (결과 순서 = 완료 순서).
+- TO-BE 모드(S-13, delete_target 제외)는 파일명이 "TO-BE-"로 시작하거나 --mode TO-BE일 때 적용.
+
+실행 (backend 디렉터리에서):
+    python bulk_validate.py exports/ --out report.jsonl
+    python bulk_validate.py archive.jsonl --format csv --out report.csv --workers 8
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    from .flow_services import mock_validate
+    from .l7_rule_engine import get_rule_engine
+    from .struct_rules import analyze_structure
+except ImportError:
+    from flow_services import mock_validate
+    from l7_rule_engine import get_rule_engine
+    from struct_rules import analyze_structure
+
+logger = logging.getLogger(__name__)
+
+# 프론트 validateNode와 같은 대상: 태스크/판단 노드, 내용 입력 전 플레이스홀더 라벨 제외
+L7_NODE_TYPES = ("process", "decision")
+PLACEHOLDER_LABELS = {"새 태스크", "새 단계", "분기 조건?", "판단 조건", "L6 프로세스", "하위 절차"}
+STRUCT_PENALTY = 10  # S-규칙 이슈 1건당 감점 (모두 warning — L7 warning 감점과 같게)
+
+CSV_FIELDS = ["source", "processName", "mode", "nodes", "edges", "labelsChecked", "l7Pass", "l7Fail", "l7Score",
+              "structIssues", "score", "pass", "rules", "error"]
+
+
+def _mode_for(source: str, default: Optional[str]) -> str:
+    if default:
+        return default
+    return "TO-BE" if Path(source.split(":")[0]).name.upper().startswith("TO-BE") else "AS-IS"
+
+
+def validate_flow(source: str, flow: dict, mode: str) -> dict:
+    """플로우 하나 → 요약 레코드 (점수, 규칙별 건수, 이슈가 있는 노드)."""
+    nodes = flow.get("nodes") or flow.get("currentNodes") or []
+    edges = flow.get("edges") or flow.get("currentEdges") or []
+    context = flow.get("processContext") or flow.get("context") or {}
+    rules: Counter = Counter()
+    node_results = []
+    scores = []
+    for n in nodes:
+        node_type = n.get("type") or "process"
+        label = (n.get("label") or "").strip()
+        if node_type not in L7_NODE_TYPES or not label or label in PLACEHOLDER_LABELS:
+            continue
+        result = mock_validate(label, node_type)
+        scores.append(result["score"])
+        rules.update(i["ruleId"] for i in result["issues"])
+        if result["issues"]:
+            node_results.append({"nodeId": n.get("id"), "label": label, "score": result["score"], "pass": result["pass"],
+                                 "ruleIds": [i["ruleId"] for i in result["issues"]]})
+    struct_issues = analyze_structure(nodes, edges, mode)
+    rules.update(i["ruleId"] for i in struct_issues)
+
+    l7_fail = sum(1 for r in node_results if not r["pass"])
+    l7_score = round(sum(scores) / len(scores), 1) if scores else 100.0
+    return {
+        "source": source,
+        "processName": context.get("processName", ""),
+        "mode": mode,
+        "nodes": len(nodes),
+        "edges": len(edges),
+        "labelsChecked": len(scores),
+        "l7Pass": len(scores) - l7_fail,
+        "l7Fail": l7_fail,
+        "l7Score": l7_score,
+        "structIssues": len(struct_issues),
+        "score": max(0.0, round(l7_score - STRUCT_PENALTY * len(struct_issues), 1)),
+        "pass": l7_fail == 0,
+        "rules": dict(sorted(rules.items())),
+        "nodeIssues": node_results,
+        "structIssueDetails": [{k: v for k, v in i.items() if k != "severity"} for i in struct_issues],
+    }
+
+
+def _error(source: str, message: str) -> dict:
+    return {"source": source, "error": message}
+
+
+def run_task(task: tuple) -> dict:
+    """워커 진입점. ("file", 경로, mode) 또는 ("line", 출처, JSON 문자열, mode)."""
+    kind, source = task[0], task[1]
+    mode = task[-1]
+    try:
+        if kind == "file":
+            text = Path(source).read_text(encoding="utf-8-sig")
+        else:
+            text = task[2]
+        flow = json.loads(text)
+    except (OSError, ValueError) as e:
+        return _error(source, f"읽기 실패: {e}")
+    if not isinstance(flow, dict):
+        return _error(source, "플로우 객체가 아님")
+    try:
+        return validate_flow(source, flow, mode)
+    except (KeyError, TypeError, AttributeError) as e:
+        return _error(source, f"형식 오류: {e!r}")
+
+
+def run_batch(tasks: list) -> list[dict]:
+    return [run_task(task) for task in tasks]
+
+
+def _init_worker() -> None:
+    get_rule_engine()  # 규칙 컴파일을 워커 기동 시 한 번
+
+
+def iter_tasks(paths: list[str], mode: Optional[str]) -> Iterator[tuple]:
+    """입력 경로 → 작업 (지연 생성 — 디렉터리/JSONL 전체를 미리 읽지 않는다)."""
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            for f in sorted(path.rglob("*.json")):
+                yield ("file", str(f), _mode_for(str(f), mode))
+        elif path.suffix == ".jsonl":
+            with open(path, encoding="utf-8-sig") as fh:
+                for lineno, line in enumerate(fh, 1):
+                    if line.strip():
+                        source = f"{path}:{lineno}"
+                        yield ("line", source, line, _mode_for(source, mode))
+        elif path.exists():
+            yield ("file", str(path), _mode_for(str(path), mode))
+        else:
+            logger.warning(f"입력 없음: {raw}")
+
+
+class ReportWriter:
+    """JSONL(레코드 전체) 또는 CSV(요약 열만) 스트리밍 출력."""
+
+    def __init__(self, fh, fmt: str):
+        self.fh = fh
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(fh, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, record: dict) -> None:
+        if self.fmt == "csv":
+            row = dict(record)
+            row["rules"] = ";".join(f"{k}:{v}" for k, v in record.get("rules", {}).items())
+            self.csv.writerow(row)
+        else:
+            self.fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _batches(tasks: Iterator[tuple], size: int) -> Iterator[list]:
+    batch = []
+    for task in tasks:
+        batch.append(task)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run(paths: list[str], writer: ReportWriter, workers: int, mode: Optional[str] = None, batch: int = 8) -> dict:
+    """묶음을 workers × 4개까지만 띄워 두고 완료되는 대로 기록. 반환: 집계."""
+    stats = {"flows": 0, "errors": 0, "passed": 0, "labels": 0}
+    max_inflight = max(1, workers) * 4
+    tasks = _batches(iter_tasks(paths, mode), max(1, batch))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_inflight:
+                batch_tasks = next(tasks, None)
+                if batch_tasks is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(run_batch, batch_tasks))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                for record in fut.result():
+                    writer.write(record)
+                    stats["flows"] += 1
+                    if "error" in record:
+                        stats["errors"] += 1
+                    else:
+                        stats["passed"] += record["pass"]
+                        stats["labels"] += record["labelsChecked"]
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="내보낸 플로우 일괄 L7/구조 검증")
+    parser.add_argument("inputs", nargs="+", help="플로우 JSON 파일, 디렉터리, 또는 .jsonl 아카이브")
+    parser.add_argument("--out", default="-", help="출력 파일 (기본: 표준 출력)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default=None, help="기본: --out 확장자가 .csv면 csv, 아니면 jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=8, help="워커에 한 번에 넘기는 플로우 수")
+    parser.add_argument("--mode", choices=("AS-IS", "TO-BE"), default=None, help="모든 플로우에 적용할 모드 (기본: 파일명으로 판단)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    fmt = args.format or ("csv" if args.out.endswith(".csv") else "jsonl")
+    fh = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="" if fmt == "csv" else None)
+    t0 = time.perf_counter()
+    try:
+        stats = run(args.inputs, ReportWriter(fh, fmt), args.workers, args.mode, args.batch)
+    finally:
+        if fh is not sys.stdout:
+            fh.close()
+    elapsed = time.perf_counter() - t0
+    logger.info(f"플로우 {stats['flows']}개 (오류 {stats['errors']}, L7 통과 {stats['passed']}), 라벨 {stats['labels']}개 — "
+                f"{elapsed:.1f}초, {stats['labels'] / max(elapsed, 1e-9):,.0f} 라벨/초 (워커 {args.workers}, 규칙 {get_rule_engine().version_hash})")
+
+
+if __name__ == "__main__":
+    main()
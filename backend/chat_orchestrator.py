@@ -1,24 +1,31 @@
 import os
-import time
-from typing import Any
+import re
+from typing import Any, Optional
 
 try:
+    from .env_config import LLM_BASE_URL
     from .flow_services import mock_review
     from .llm_service import call_llm
+    from .circuit_breaker import get_breaker
+    from .metrics import Counter, record_fallback
+    from .profiling import profiled
     from .prompt_templates import KNOWLEDGE_PROMPT
 except ImportError:
+    from env_config import LLM_BASE_URL
     from flow_services import mock_review
     from llm_service import call_llm
+    from circuit_breaker import get_breaker
+    from metrics import Counter, record_fallback
+    from profiling import profiled
     from prompt_templates import KNOWLEDGE_PROMPT
 
 CHAT_CHAIN_ENABLED = os.getenv("CHAT_CHAIN_ENABLED", "true").lower() != "false"
 RULE_COACH_ENABLED = os.getenv("RULE_COACH_ENABLED", "true").lower() != "false"
 MOCK_COACH_ENABLED = os.getenv("MOCK_COACH_ENABLED", "true").lower() != "false"
-LLM_CB_FAIL_THRESHOLD = int(os.getenv("LLM_CB_FAIL_THRESHOLD", "3"))
-LLM_CB_COOLDOWN_SEC = int(os.getenv("LLM_CB_COOLDOWN_SEC", "90"))
 
-_llm_fail_count = 0
-_llm_cooldown_until = 0.0
+# 점진 응답(/api/chat/stream): 규칙 코칭을 먼저 보내고 LLM 답으로 교체
+CHAT_PROGRESSIVE = Counter("chat_progressive_total", "Progressive chat responses by how the provisional answer ended",
+                           ("outcome",))
 
 
 def _extract_text(payload: Any) -> str:
@@ -95,25 +102,41 @@ _FLOW_ACTION_KEYWORDS = [
 ]
 
 
+_REVIEW_KEYWORDS = ["검토", "개선", "리뷰", "review", "평가", "괜찮", "잘하고"]
+
+# 키워드 목록 → 하나의 정규식(부분 문자열 OR). any(k in q for k in 목록)와 같은 판정을 한 번의 탐색으로.
+_intent_matchers: dict[str, re.Pattern] = {}
+
+
+def build_intent_matchers() -> dict:
+    """의도 분류용 키워드 매처 컴파일 (기동 시 1회, 빠진 경우 첫 호출 때)."""
+    if not _intent_matchers:
+        for name, keywords in (("overview", _OVERVIEW_KEYWORDS), ("knowledge", _KNOWLEDGE_KEYWORDS),
+                               ("flow_action", _FLOW_ACTION_KEYWORDS), ("review", _REVIEW_KEYWORDS)):
+            # 긴 키워드 먼저 — 판정에는 영향 없지만 매칭 위치가 직관적이도록
+            _intent_matchers[name] = re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+    return {name: len(p.pattern) for name, p in _intent_matchers.items()}
+
+
 def _classify_intent(message: str) -> str:
     """1차 의도 분류: flow_overview / knowledge / flow_action / coaching"""
     q = (message or "").strip()
+    if not _intent_matchers:
+        build_intent_matchers()
+    m = _intent_matchers
 
     # flow_overview 최우선 (knowledge 키워드보다 먼저)
-    if any(k in q for k in _OVERVIEW_KEYWORDS):
+    if m["overview"].search(q):
         return "flow_overview"
 
-    has_knowledge_kw = any(k in q for k in _KNOWLEDGE_KEYWORDS)
-    has_flow_action_kw = any(k in q for k in _FLOW_ACTION_KEYWORDS)
-
     # 혼합 의도: flow_action 키워드가 있으면 행동 요청 우선
-    if has_flow_action_kw:
+    if m["flow_action"].search(q):
         return "flow_action"
 
-    if has_knowledge_kw:
+    if m["knowledge"].search(q):
         return "knowledge"
 
-    if any(k in q for k in ["검토", "개선", "리뷰", "review", "평가", "괜찮", "잘하고"]):
+    if m["review"].search(q):
         return "coaching"
 
     return "coaching"
@@ -155,6 +178,7 @@ def _flow_signals(nodes, edges) -> dict:
     }
 
 
+@profiled("rule_coach")
 def _rule_coach(message: str, nodes, edges) -> dict:
     classified = _classify_intent(message)
     if classified == "knowledge":
@@ -263,6 +287,19 @@ def _rule_coach(message: str, nodes, edges) -> dict:
     }
 
 
+def provisional_answer(message: str, nodes, edges) -> Optional[dict]:
+    """LLM 답이 오기 전에 먼저 보여줄 규칙 기반 코칭 (마이크로초 단위).
+    규칙 코치가 플로우 점검으로 답할 수 있는 코칭/행동 요청만 — 지식 질문·흐름 설명은 줄 내용이 없어 None."""
+    if not RULE_COACH_ENABLED or _classify_intent(message) in ("knowledge", "flow_overview"):
+        return None
+    n = _normalize(_rule_coach(message, nodes, edges))
+    if not (n["speech"] or n["suggestions"]):
+        return None
+    n["source"] = "rules"
+    n["fallbackLevel"] = 1
+    return n
+
+
 def _mock_coach(message: str, nodes, edges) -> dict:
     base = mock_review(nodes, edges)
     if not base.get("speech"):
@@ -272,29 +309,14 @@ def _mock_coach(message: str, nodes, edges) -> dict:
     return _normalize(base)
 
 
-def _llm_available_now() -> bool:
-    return time.time() >= _llm_cooldown_until
-
-
-def _mark_llm_failure() -> None:
-    global _llm_fail_count, _llm_cooldown_until
-    _llm_fail_count += 1
-    if _llm_fail_count >= LLM_CB_FAIL_THRESHOLD:
-        _llm_cooldown_until = time.time() + max(0, LLM_CB_COOLDOWN_SEC)
-
-
-def _mark_llm_success() -> None:
-    global _llm_fail_count, _llm_cooldown_until
-    _llm_fail_count = 0
-    _llm_cooldown_until = 0.0
-
-
 def get_chain_status() -> dict:
-    cooldown_left = max(0, int(_llm_cooldown_until - time.time()))
+    # Circuit Breaker는 llm_service 쪽에서 백엔드×엔드포인트 클래스 단위로 관리된다.
+    cb = get_breaker(LLM_BASE_URL, "chat").status()
     return {
         "enabled": CHAT_CHAIN_ENABLED,
-        "llm_fail_count": _llm_fail_count,
-        "llm_cooldown_left_sec": cooldown_left,
+        "llm_circuit": cb["state"],
+        "llm_fail_count": cb["window_failures"],
+        "llm_cooldown_left_sec": cb["cooldown_left_sec"],
         "rule_enabled": RULE_COACH_ENABLED,
         "mock_enabled": MOCK_COACH_ENABLED,
     }
@@ -306,25 +328,24 @@ async def orchestrate_chat(system_prompt: str, prompt: str, message: str, nodes,
 
     def _attach_meta(result: dict) -> dict:
         result["intent"] = intent
+        record_fallback("chat", result.get("fallbackLevel", 0), result.get("source", ""))
         return result
 
     if not CHAT_CHAIN_ENABLED:
-        r = await call_llm(effective_prompt, prompt, allow_text_fallback=True)
+        r = await call_llm(effective_prompt, prompt, allow_text_fallback=True, endpoint="chat")
         n = _normalize(r)
         if n["speech"]:
             n["source"] = "llm"
             n["fallbackLevel"] = 0
             return _attach_meta(n)
 
-    if _llm_available_now():
-        r = await call_llm(effective_prompt, prompt, allow_text_fallback=True)
-        n = _normalize(r)
-        if n["speech"] or n["suggestions"]:
-            _mark_llm_success()
-            n["source"] = "llm"
-            n["fallbackLevel"] = 0
-            return _attach_meta(n)
-        _mark_llm_failure()
+    # breaker가 열려 있으면 call_llm이 즉시 None → 곧바로 규칙 코치로 폴백
+    r = await call_llm(effective_prompt, prompt, allow_text_fallback=True, endpoint="chat")
+    n = _normalize(r)
+    if n["speech"] or n["suggestions"]:
+        n["source"] = "llm"
+        n["fallbackLevel"] = 0
+        return _attach_meta(n)
 
     if RULE_COACH_ENABLED:
         r2 = _rule_coach(message, nodes, edges)
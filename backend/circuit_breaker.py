@@ -0,0 +1,189 @@
+"""LLM Circuit Breaker — 백엔드 × 엔드포인트 클래스 단위 장애 차단
+
+상태 전이:
+  closed    → open      : 최근 윈도우 내 호출 수가 최소치 이상이고 실패율이 임계값 이상
+  open      → half_open : 쿨다운 경과 후 첫 호출 1건만 probe로 통과
+  half_open → closed    : probe 성공
+  half_open → open      : probe 실패 (쿨다운 재시작)
+
+차단 중에는 call_llm이 즉시 None을 반환하므로 모든 엔드포인트가
+곧바로 규칙/mock 폴백 경로로 빠진다.
+
+상태는 shared_state 저장소("breaker" 네임스페이스)에 두므로 SHARED_STATE_BACKEND=sqlite면
+모든 워커가 같은 윈도우로 실패를 세고, 함께 열리고, probe도 배포 전체에서 1건만 나간다.
+윈도우는 초 단위 버킷 [초, 호출 수, 실패 수]로 집계한다.
+"""
+import os
+import time
+
+try:
+    from .shared_state import get_store
+except ImportError:
+    from shared_state import get_store
+
+LLM_CB_ENABLED = os.getenv("LLM_CB_ENABLED", "true").lower() != "false"
+# 기존 연속 실패 임계값은 윈도우 내 최소 호출 수로 재해석한다 (실패율 판정의 표본 하한)
+LLM_CB_MIN_CALLS = int(os.getenv("LLM_CB_MIN_CALLS", os.getenv("LLM_CB_FAIL_THRESHOLD", "3")))
+LLM_CB_FAILURE_RATE = float(os.getenv("LLM_CB_FAILURE_RATE", "0.5"))
+LLM_CB_WINDOW_SEC = int(os.getenv("LLM_CB_WINDOW_SEC", "120"))
+LLM_CB_COOLDOWN_SEC = int(os.getenv("LLM_CB_COOLDOWN_SEC", "90"))
+# probe가 응답 없이 오래 걸리면 다른 요청에 probe 기회를 넘긴다
+LLM_CB_PROBE_TIMEOUT_SEC = int(os.getenv("LLM_CB_PROBE_TIMEOUT_SEC", "200"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 엔드포인트 → 클래스. 생성 길이·타임아웃 특성이 비슷한 것끼리 묶는다.
+ENDPOINT_CLASSES = {
+    "chat": "chat",
+    "flow-overview": "chat",
+    "contextual-suggest": "suggest",
+    "first-shape-welcome": "suggest",
+    "interview-start": "suggest",
+    "suggest-phases": "suggest",
+    "review": "analysis",
+    "pdd-insights": "analysis",
+    "analyze-pdd": "analysis",
+    "categorize-nodes": "analysis",
+}
+
+
+def endpoint_class(endpoint: str) -> str:
+    return ENDPOINT_CLASSES.get(endpoint, "default")
+
+
+def _new_state() -> dict:
+    return {"state": CLOSED, "opened_at": 0.0, "probe_started_at": 0.0, "trip_count": 0, "buckets": []}
+
+
+def _prune(st: dict, now: float) -> None:
+    cutoff = int(now - LLM_CB_WINDOW_SEC)
+    buckets = st["buckets"]
+    while buckets and buckets[0][0] < cutoff:
+        buckets.pop(0)
+
+
+def _window_stats(st: dict) -> tuple[int, int]:
+    return sum(b[1] for b in st["buckets"]), sum(b[2] for b in st["buckets"])
+
+
+def _trip(st: dict, now: float) -> None:
+    st.update(state=OPEN, opened_at=now, probe_started_at=0.0, trip_count=st["trip_count"] + 1, buckets=[])
+
+
+def _reset(st: dict) -> None:
+    st.update(state=CLOSED, opened_at=0.0, probe_started_at=0.0, buckets=[])
+
+
+class CircuitBreaker:
+    """실패율 윈도우 + half-open 단일 probe 방식의 breaker. 상태는 공유 저장소에 있다."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._store = get_store()
+
+    @property
+    def state(self) -> str:
+        return (self._store.get("breaker", self.name) or _new_state())["state"]
+
+    def allow(self) -> bool:
+        """호출 허용 여부. half-open에서는 probe 1건만 True."""
+        if not LLM_CB_ENABLED:
+            return True
+
+        def decide(st):
+            st = st or _new_state()
+            now = time.time()
+            if st["state"] == CLOSED:
+                return st, True
+            if st["state"] == OPEN:
+                if now - st["opened_at"] < LLM_CB_COOLDOWN_SEC:
+                    return st, False
+                st.update(state=HALF_OPEN, probe_started_at=now)
+                return st, True
+            # HALF_OPEN: 진행 중 probe가 있으면 차단, 방치된 probe는 교체
+            if now - st["probe_started_at"] < LLM_CB_PROBE_TIMEOUT_SEC:
+                return st, False
+            st["probe_started_at"] = now
+            return st, True
+
+        return self._store.update("breaker", self.name, decide)
+
+    def record(self, success: bool) -> None:
+        def apply(st):
+            st = st or _new_state()
+            now = time.time()
+            if st["state"] == HALF_OPEN:
+                if success:
+                    _reset(st)
+                else:
+                    _trip(st, now)
+                return st, None
+            _prune(st, now)
+            sec = int(now)
+            buckets = st["buckets"]
+            if buckets and buckets[-1][0] == sec:
+                buckets[-1][1] += 1
+                buckets[-1][2] += 0 if success else 1
+            else:
+                buckets.append([sec, 1, 0 if success else 1])
+            if success or st["state"] != CLOSED:
+                return st, None
+            total, failures = _window_stats(st)
+            if total >= LLM_CB_MIN_CALLS and failures / total >= LLM_CB_FAILURE_RATE:
+                _trip(st, now)
+            return st, None
+
+        self._store.update("breaker", self.name, apply)
+
+    def abandon(self) -> None:
+        """결과 없이 끝난 호출(취소 등). half-open probe 슬롯만 반납한다."""
+        def release(st):
+            if st and st["state"] == HALF_OPEN:
+                st["probe_started_at"] = 0.0
+            return st, None
+
+        self._store.update("breaker", self.name, release)
+
+    def status(self) -> dict:
+        now = time.time()
+        st = self._store.get("breaker", self.name) or _new_state()
+        _prune(st, now)
+        total, failures = _window_stats(st)
+        cooldown_left = 0
+        if st["state"] == OPEN:
+            cooldown_left = max(0, int(st["opened_at"] + LLM_CB_COOLDOWN_SEC - now))
+        return {
+            "state": st["state"],
+            "window_calls": total,
+            "window_failures": failures,
+            "failure_rate": round(failures / total, 2) if total else 0.0,
+            "cooldown_left_sec": cooldown_left,
+            "trip_count": st["trip_count"],
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(backend: str, endpoint: str) -> CircuitBreaker:
+    name = f"{backend}|{endpoint_class(endpoint)}"
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def get_breaker_status() -> dict:
+    return {
+        "enabled": LLM_CB_ENABLED,
+        "min_calls": LLM_CB_MIN_CALLS,
+        "failure_rate_threshold": LLM_CB_FAILURE_RATE,
+        "window_sec": LLM_CB_WINDOW_SEC,
+        "cooldown_sec": LLM_CB_COOLDOWN_SEC,
+        "shared_backend": get_store().backend,
+        # 다른 워커만 써 본 breaker도 보이도록 저장소의 이름까지 합친다
+        "breakers": {name: (_breakers.get(name) or CircuitBreaker(name)).status()
+                     for name in sorted(set(_breakers) | {k for k, _, _ in get_store().items("breaker")})},
+    }
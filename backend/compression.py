@@ -0,0 +1,252 @@
+"""요청/응답 압축 — 느린 VPN 구간의 대형 플로우·리뷰 응답 전송량 절감
+
+순수 ASGI 미들웨어 (ServerTimingMiddleware 안쪽에 둔다):
+- 응답: Accept-Encoding 협상으로 br(brotli 설치 시) 또는 gzip. COMPRESS_MIN_BYTES 미만,
+  이미 인코딩된 응답, 스트리밍 응답(SSE 등 본문이 여러 조각)은 그대로 보낸다.
+- 요청: COMPRESS_REQUEST_PATHS 경로에 한해 Content-Encoding: gzip/br 본문을 풀어 앱에 넘긴다.
+  풀린 크기가 COMPRESS_MAX_REQUEST_BYTES를 넘는 순간 해제를 멈추고 413 (압축 폭탄 방지).
+  br 요청은 출력 상한을 지원하는 brotli(1.2+)일 때만 받는다 (구버전이면 415).
+- 압축/해제에 쓴 CPU 시간(thread_time)은 Server-Timing의 compress/decompress 구간과
+  http_compression_cpu_seconds 메트릭으로 보고된다.
+"""
+import asyncio
+import gzip
+import logging
+import os
+import time
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    from .metrics import Counter, Histogram
+    from .profiling import current_timing
+except ImportError:
+    from metrics import Counter, Histogram
+    from profiling import current_timing
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() != "false"
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BR_QUALITY = int(os.getenv("COMPRESS_BR_QUALITY", "5"))
+COMPRESS_REQUEST_PATHS = {p.strip() for p in os.getenv(
+    "COMPRESS_REQUEST_PATHS", "/api/chat,/api/review,/api/categorize-nodes").split(",") if p.strip()}
+COMPRESS_MAX_REQUEST_BYTES = int(os.getenv("COMPRESS_MAX_REQUEST_BYTES", str(20 * 1024 * 1024)))
+COMPRESS_THREAD_BYTES = int(os.getenv("COMPRESS_THREAD_BYTES", str(256 * 1024)))  # 이보다 크면 스레드에서 압축
+
+COMPRESSION_CPU = Histogram("http_compression_cpu_seconds", "CPU time spent compressing or decompressing bodies",
+                            ("direction", "encoding"), buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25))
+COMPRESSION_BYTES = Counter("http_compression_bytes_total", "Body bytes before (raw) and after (wire) compression",
+                            ("direction", "encoding", "stage"))
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def _brotli_output_limit() -> bool:
+    """brotli 1.2+의 Decompressor.process(output_buffer_limit=)가 있는가. 없으면 해제 크기를 중간에 끊을 수 없다."""
+    try:
+        brotli.Decompressor().process(b"", output_buffer_limit=1)
+        return True
+    except TypeError:
+        return False
+
+
+# br 요청 본문은 출력 상한을 줄 수 있을 때만 받는다 (응답 압축은 brotli만 있으면 된다)
+_BR_REQUESTS = brotli is not None and _brotli_output_limit()
+
+
+def _supported() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _request_encodings() -> tuple:
+    return ("br", "gzip") if _BR_REQUESTS else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str:
+    """Accept-Encoding에서 쓸 인코딩 선택 (br 우선). 받을 수 있는 것이 없으면 ""."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+    for enc in _supported():
+        if weights.get(enc, weights.get("*", 0.0)) > 0:
+            return enc
+    return ""
+
+
+def _compress(body: bytes, encoding: str) -> tuple[bytes, float]:
+    t0 = time.thread_time()
+    if encoding == "br":
+        out = brotli.compress(body, quality=COMPRESS_BR_QUALITY)
+    else:
+        out = gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+    return out, time.thread_time() - t0
+
+
+def _brotli_decompress(body: bytes) -> bytes:
+    """상한을 넘는 순간 멈추는 brotli 해제 — 전부 풀고 나서 크기를 보면 폭탄 방지가 안 된다."""
+    d = brotli.Decompressor()
+    limit = COMPRESS_MAX_REQUEST_BYTES + 1
+    out: list[bytes] = []
+    size = 0
+    chunk = d.process(body, output_buffer_limit=limit)
+    while True:
+        size += len(chunk)
+        if size > COMPRESS_MAX_REQUEST_BYTES:
+            raise _TooLarge()
+        out.append(chunk)
+        if d.is_finished() or d.can_accept_more_data():
+            break  # 다 풀었거나, 입력을 다 썼는데 스트림이 안 끝남(아래에서 오류)
+        chunk = d.process(b"", output_buffer_limit=limit - size)
+    if not d.is_finished():
+        raise brotli.error("압축 스트림이 끝나지 않음")
+    return b"".join(out)
+
+
+def _decompress(body: bytes, encoding: str) -> tuple[bytes, float]:
+    t0 = time.thread_time()
+    if encoding == "br":
+        out = _brotli_decompress(body)
+    else:
+        d = zlib.decompressobj(wbits=zlib.MAX_WBITS | 32)  # gzip/zlib 헤더 자동 인식
+        out = d.decompress(body, COMPRESS_MAX_REQUEST_BYTES + 1)
+        if len(out) > COMPRESS_MAX_REQUEST_BYTES or d.unconsumed_tail:
+            raise _TooLarge()
+        if not d.eof:
+            raise zlib.error("압축 스트림이 끝나지 않음")
+    return out, time.thread_time() - t0
+
+
+async def _run(fn, body: bytes, encoding: str) -> tuple[bytes, float]:
+    if len(body) >= COMPRESS_THREAD_BYTES:
+        return await asyncio.to_thread(fn, body, encoding)
+    return fn(body, encoding)
+
+
+def _record(direction: str, encoding: str, raw: int, wire: int, cpu: float) -> None:
+    COMPRESSION_CPU.observe(cpu, direction=direction, encoding=encoding)
+    COMPRESSION_BYTES.inc(raw, direction=direction, encoding=encoding, stage="raw")
+    COMPRESSION_BYTES.inc(wire, direction=direction, encoding=encoding, stage="wire")
+    timing = current_timing()
+    if timing is not None:
+        timing.add("compress" if direction == "response" else "decompress", cpu * 1000)
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+
+        req_encoding = headers.get("content-encoding", "").strip().lower()
+        if req_encoding and req_encoding != "identity" and scope.get("path") in COMPRESS_REQUEST_PATHS:
+            if req_encoding not in _request_encodings():
+                await JSONResponse({"detail": f"지원하지 않는 Content-Encoding: {req_encoding}"}, status_code=415)(scope, receive, send)
+                return
+            chunks = []
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    break
+            wire = b"".join(chunks)
+            try:
+                body, cpu = await _run(_decompress, wire, req_encoding)
+            except _TooLarge:
+                await JSONResponse({"detail": "압축 해제한 요청 본문이 너무 큽니다"}, status_code=413)(scope, receive, send)
+                return
+            except Exception as e:
+                logger.warning(f"요청 본문 압축 해제 실패 ({req_encoding}, {scope.get('path')}): {e}")
+                await JSONResponse({"detail": "압축된 요청 본문을 해제할 수 없습니다"}, status_code=400)(scope, receive, send)
+                return
+            _record("request", req_encoding, len(body), len(wire), cpu)
+            scope = dict(scope)
+            scope["headers"] = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+            scope["headers"].append((b"content-length", str(len(body)).encode("latin-1")))
+            receive = _replay(body, receive)
+
+        encoding = negotiate(headers.get("accept-encoding", ""))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(send, encoding))
+
+
+def _replay(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()  # 이후에는 연결 끊김 감지용으로 원래 receive를 그대로
+
+    return replay
+
+
+class _CompressingSender:
+    """응답 시작 메시지를 첫 본문 조각까지 미뤄 두었다가 압축 여부를 정한다."""
+    __slots__ = ("send", "encoding", "start", "passthrough")
+
+    def __init__(self, send, encoding: str):
+        self.send = send
+        self.encoding = encoding
+        self.start = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if self.passthrough:
+            await self.send(message)
+            return
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.start is None:
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        self.passthrough = True  # 이후 조각은 그대로
+        body = message.get("body", b"")
+        headers = MutableHeaders(raw=list(start.get("headers", [])))
+        if (message.get("more_body", False) or len(body) < COMPRESS_MIN_BYTES
+                or "content-encoding" in headers or headers.get("content-type", "").startswith("text/event-stream")):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        compressed, cpu = await _run(_compress, body, self.encoding)
+        _record("response", self.encoding, len(body), len(compressed), cpu)
+        headers["content-encoding"] = self.encoding
+        headers["content-length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await self.send({**start, "headers": headers.raw})
+        await self.send({**message, "body": compressed})
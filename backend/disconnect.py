@@ -0,0 +1,86 @@
+"""클라이언트 연결 종료 시 요청 처리 취소 — LLM 엔드포인트용 순수 ASGI 미들웨어
+
+Starlette는 일반(비스트리밍) 응답을 만드는 동안 클라이언트가 떠나도 핸들러를 멈추지 않는다.
+40초짜리 /api/review 도중 탭을 닫아도 call_llm은 재시도·curl 폴백까지 끝까지 돈다.
+
+- 대상 경로에서는 receive()를 별도 태스크가 계속 읽어 큐로 넘긴다 (앱은 큐에서 같은 순서로 받는다).
+  응답을 다 보내기 전에 http.disconnect가 오면 핸들러 태스크를 취소한다
+- 취소는 call_llm까지 전파된다: httpx 스트림을 닫고, 재시도 대기·루프를 빠져나오고, curl 프로세스를 종료한다
+  (llm_requests_total{outcome="cancelled"}). 작업 큐(job_queue)의 항목은 별도 태스크라 영향이 없다
+- 취소 건수는 client_disconnects_total{endpoint}, 느린 요청 기록(Server-Timing)에는 상태 499로 남는다
+- 응답을 다 보낸 뒤의 연결 종료(정상)는 세지 않는다
+"""
+import asyncio
+import logging
+import os
+from typing import Iterable
+
+try:
+    from .metrics import Counter
+    from .profiling import current_timing
+except ImportError:
+    from metrics import Counter
+    from profiling import current_timing
+
+logger = logging.getLogger(__name__)
+
+DISCONNECT_CANCEL_ENABLED = os.getenv("DISCONNECT_CANCEL_ENABLED", "true").lower() == "true"
+
+CLIENT_DISCONNECTS = Counter("client_disconnects_total", "Requests cancelled because the client disconnected before the response",
+                             ("endpoint",))
+
+
+class DisconnectCancelMiddleware:
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not DISCONNECT_CANCEL_ENABLED or path not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        response_done = False
+
+        async def queued_receive():
+            return await queue.get()
+
+        async def tracked_send(message):
+            nonlocal response_done
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_done = True
+
+        handler = asyncio.ensure_future(self.app(scope, queued_receive, tracked_send))
+
+        async def pump():
+            while True:
+                message = await receive()
+                await queue.put(message)
+                if message["type"] == "http.disconnect":
+                    return
+
+        listener = asyncio.ensure_future(pump())
+        try:
+            await asyncio.wait({handler, listener}, return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_done:
+                handler.cancel()
+                endpoint = path.removeprefix("/api/")
+                CLIENT_DISCONNECTS.inc(endpoint=endpoint)
+                timing = current_timing()
+                if timing is not None:
+                    timing.status = 499
+                logger.info(f"클라이언트 연결 종료로 요청 취소: {path}")
+            try:
+                await handler
+            except asyncio.CancelledError:
+                if not handler.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        finally:
+            listener.cancel()
+            if listener.done() and not listener.cancelled():
+                listener.exception()  # receive() 오류는 핸들러 쪽에서 드러난다 — 여기서는 회수만
+            if not handler.done():  # 이 미들웨어 자체가 취소된 경우 (서버 종료)
+                handler.cancel()
@@ -0,0 +1,66 @@
+"""빠른 JSON 응답 경로
+
+- FastJSONResponse: orjson이 있으면 orjson, 없으면 표준 json(ensure_ascii=False)으로 직렬화하는 기본 응답 클래스
+- FastJSONRoute: response_model이 없는 async 엔드포인트가 dict/list를 반환하면
+  jsonable_encoder(모든 값을 재귀 복사)를 거치지 않고 바로 FastJSONResponse로 감싼다.
+  응답 대부분이 이미 JSON 호환 dict이고 한글 텍스트가 많아 이 단계가 직렬화 시간의 대부분을 차지한다.
+
+response_model이 선언된 엔드포인트는 FastAPI가 모델로 검증·직렬화한 뒤 FastJSONResponse로 내보낸다.
+"""
+import functools
+import inspect
+import json
+from typing import Any
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+def _default(obj: Any):
+    """orjson/json이 모르는 타입 처리 — 드물게 섞여 들어오는 pydantic 모델·집합형."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs):
+        response_model = kwargs.get("response_model")
+        no_model = response_model is None or (
+            isinstance(response_model, DefaultPlaceholder) and response_model.value is None
+        )
+        if (no_model and inspect.iscoroutinefunction(endpoint)
+                and inspect.signature(endpoint).return_annotation is inspect.Signature.empty):
+            endpoint = _wrap_endpoint(endpoint, kwargs.get("status_code") or 200)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _wrap_endpoint(endpoint, status_code: int):
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, (dict, list)):
+            return FastJSONResponse(result, status_code=status_code)
+        return result
+    return wrapper
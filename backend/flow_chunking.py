@@ -0,0 +1,179 @@
+"""대형 플로우 map-reduce 분할 — /api/categorize-nodes, /api/pdd-insights
+
+노드가 CHUNK_MIN_NODES개 이상이면 플로우를 청크로 나눠 청크마다 LLM을 호출하고(map),
+결과를 원래 노드 순서 기준으로 결정적으로 병합한다(reduce).
+동시 호출 수는 세마포어로 제한하므로 지연은 플로우 크기가 아니라 청크 크기에 비례한다.
+
+분할 전략 (CHUNK_STRATEGY):
+  swimlane — 수영레인별로 묶고, 큰 레인은 CHUNK_SIZE 단위로 다시 자른다
+  segment  — 시작 노드부터 연결을 따라(BFS) 정렬한 뒤 연속 구간으로 자른다
+  fixed    — 입력 순서대로 CHUNK_SIZE개씩 자른다
+  auto     — 레인이 2개 이상이면 swimlane, 아니면 segment (기본)
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MIN_NODES = int(os.getenv("CHUNK_MIN_NODES", "100"))
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "40"))
+CHUNK_CONCURRENCY = int(os.getenv("CHUNK_CONCURRENCY", "4"))
+CHUNK_STRATEGY = os.getenv("CHUNK_STRATEGY", "auto").lower()
+
+_IMPACT_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+class FlowChunk:
+    """플로우의 한 조각. edges에는 청크 내부 연결과 경계를 넘는 연결이 모두 들어간다
+    (경계 연결이 빠지면 describe_flow가 경계 노드를 고아로 오판한다)."""
+    __slots__ = ("index", "total", "label", "nodes", "edges")
+
+    def __init__(self, index: int, label: str, nodes: list, edges: list):
+        self.index = index
+        self.total = 0
+        self.label = label
+        self.nodes = nodes
+        self.edges = edges
+
+    def header(self) -> str:
+        return f"[분할 분석] 전체 플로우 중 {self.index + 1}/{self.total}번째 구간 ({self.label}, 노드 {len(self.nodes)}개)"
+
+
+def should_chunk(nodes: list) -> bool:
+    return CHUNK_SIZE > 0 and len(nodes) >= CHUNK_MIN_NODES
+
+
+def _slices(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)] or [[]]
+
+
+def _segment_order(nodes: list, edges: list) -> list:
+    """시작 노드(없으면 진입 차수 0 노드)부터 BFS. 도달하지 못한 노드는 입력 순서대로 뒤에 붙인다."""
+    index = {n.id: i for i, n in enumerate(nodes)}
+    out: dict[str, list[str]] = {n.id: [] for n in nodes}
+    indeg = {n.id: 0 for n in nodes}
+    for e in edges:
+        if e.source in out and e.target in indeg:
+            out[e.source].append(e.target)
+            indeg[e.target] += 1
+    roots = [n.id for n in nodes if n.type == "start"] or [n.id for n in nodes if indeg[n.id] == 0]
+    seen: set[str] = set()
+    order: list[str] = []
+    queue = deque(roots)
+    while queue:
+        nid = queue.popleft()
+        if nid in seen:
+            continue
+        seen.add(nid)
+        order.append(nid)
+        queue.extend(sorted(out[nid], key=index.__getitem__))
+    order.extend(n.id for n in nodes if n.id not in seen)
+    return [nodes[index[nid]] for nid in order]
+
+
+def chunk_flow(nodes: list, edges: list, strategy: str = "", size: int = 0) -> list[FlowChunk]:
+    """노드 목록을 청크로 나눈다. 같은 입력이면 항상 같은 분할이 나온다."""
+    strategy = (strategy or CHUNK_STRATEGY).lower()
+    size = size or CHUNK_SIZE
+    if strategy == "auto":
+        lanes = {n.swimLaneId for n in nodes if n.swimLaneId}
+        strategy = "swimlane" if len(lanes) >= 2 else "segment"
+
+    groups: list[tuple[str, list]] = []
+    if strategy == "swimlane":
+        by_lane: dict[str, list] = {}
+        for n in nodes:
+            by_lane.setdefault(n.swimLaneId or "", []).append(n)
+        for lane, lane_nodes in by_lane.items():
+            parts = _slices(lane_nodes, size)
+            for i, part in enumerate(parts):
+                name = f"레인 {lane or '미지정'}" + (f" {i + 1}/{len(parts)}" if len(parts) > 1 else "")
+                groups.append((name, part))
+    else:
+        ordered = _segment_order(nodes, edges) if strategy == "segment" else list(nodes)
+        for i, part in enumerate(_slices(ordered, size)):
+            groups.append((f"구간 {i + 1}", part))
+
+    # 시작/종료만 있는 조각(레인 미지정 등)은 따로 호출할 가치가 없으므로 이웃 조각에 붙인다
+    merged_groups: list[tuple[str, list]] = []
+    pending: list = []
+    for label, part in groups:
+        if all(n.type in ("start", "end") for n in part):
+            if merged_groups:
+                merged_groups[-1][1].extend(part)
+            else:
+                pending.extend(part)
+            continue
+        merged_groups.append((label, pending + part))
+        pending = []
+    if pending:
+        merged_groups.append(("구간 1", pending))
+
+    chunks = []
+    for label, part in merged_groups:
+        ids = {n.id for n in part}
+        chunk_edges = [e for e in edges if e.source in ids or e.target in ids]
+        chunks.append(FlowChunk(len(chunks), label, part, chunk_edges))
+    for c in chunks:
+        c.total = len(chunks)
+    return chunks
+
+
+async def map_chunks(chunks: list[FlowChunk], fn: Callable[[FlowChunk], Awaitable], concurrency: int = 0) -> list:
+    """청크마다 fn을 최대 concurrency개씩 동시에 실행. 결과는 청크 순서대로, 실패한 청크는 None."""
+    sem = asyncio.Semaphore(max(1, concurrency or CHUNK_CONCURRENCY))
+
+    async def run(chunk: FlowChunk):
+        async with sem:
+            try:
+                return await fn(chunk)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"청크 {chunk.index + 1}/{chunk.total} 처리 실패")
+                return None
+
+    return await asyncio.gather(*(run(c) for c in chunks))
+
+
+def merge_categorizations(nodes: list, per_chunk: list[Optional[list[dict]]]) -> list[dict]:
+    """청크별 분류 결과를 원래 노드 순서로 병합. 같은 nodeId가 겹치면 앞 청크 결과를 쓴다."""
+    by_id: dict[str, dict] = {}
+    for items in per_chunk:
+        for item in items or []:
+            nid = item.get("nodeId")
+            if nid and nid not in by_id:
+                by_id[nid] = item
+    return [by_id[n.id] for n in nodes if n.id in by_id]
+
+
+def merge_pdd_insights(chunks: list[FlowChunk], per_chunk: list[Optional[dict]]) -> Optional[dict]:
+    """청크별 인사이트를 하나로 합친다. 목록은 청크 순서대로 잇고 같은 단계/제안은 한 번만 남긴다."""
+    keys = {"inefficiencies": "step", "digitalWorker": "step", "sscCandidates": "step", "redesign": "suggestion"}
+    merged: dict = {k: [] for k in keys}
+    seen: dict[str, set] = {k: set() for k in keys}
+    summaries = []
+    for chunk, result in zip(chunks, per_chunk):
+        if not isinstance(result, dict):
+            continue
+        summary = str(result.get("summary") or "").strip()
+        if summary and "충분한 정보가 없습니다" not in summary:
+            summaries.append(f"({chunk.label}) {summary}")
+        for list_key, id_key in keys.items():
+            for item in result.get(list_key) or []:
+                if not isinstance(item, dict):
+                    continue
+                ident = str(item.get(id_key, "")).strip()
+                if ident and ident in seen[list_key]:
+                    continue
+                seen[list_key].add(ident)
+                merged[list_key].append(item)
+    if not summaries and not any(merged.values()):
+        return None
+    # 영향도 높은 비효율부터 (같은 영향도는 청크 순서 유지 → 결정적)
+    merged["inefficiencies"].sort(key=lambda it: _IMPACT_ORDER.get(str(it.get("impact", "")).lower(), 3))
+    merged["summary"] = "\n".join(summaries) or "분석에 충분한 정보가 없습니다."
+    return {"summary": merged.pop("summary"), **merged}
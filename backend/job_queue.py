@@ -0,0 +1,232 @@
+"""비동기 작업 큐 — 오래 걸리는 LLM 분석을 제출/조회 방식으로
+
+/api/review, /api/pdd-insights, /api/categorize-nodes는 LLM_GLOBAL_TIMEOUT(180초)까지 연결을 잡고 있어
+60초에서 끊는 리버스 프록시 뒤에서는 실패하고, 대기 중인 요청이 워커 용량을 갉아먹는다.
+작업으로 제출하면 곧바로 작업 ID를 돌려주고, 프로세스 내 비동기 워커 JOB_WORKERS개가 차례로 실행한다.
+
+- 작업 하나에 입력(플로우)이 여러 개일 수 있다 (L4 전체 일괄 분석). 입력 하나가 큐의 한 항목이고,
+  동시 실행 수는 작업 단위가 아니라 항목 단위로 JOB_WORKERS개로 제한된다.
+- 상태·결과는 shared_state 저장소에 둔다 (job: 메타, job-result: 항목별 결과). sqlite 백엔드면
+  제출받은 워커가 아닌 다른 워커도 조회에 응답한다. 끝난 작업은 JOB_RESULT_TTL 뒤 사라진다.
+- 대기 항목이 JOB_QUEUE_MAX를 넘으면 제출을 거절한다 (QueueFull → 429).
+- 진행 상황 구독(watch)은 같은 프로세스의 변경은 즉시, 다른 워커의 변경은 JOB_EVENT_POLL 간격으로 알린다.
+  변화가 없어도 JOB_EVENT_HEARTBEAT마다 현재 상태를 다시 보내 프록시 유휴 타임아웃에 끊기지 않게 한다.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+try:
+    from .metrics import Counter, Gauge, Histogram
+    from .shared_state import get_store
+except ImportError:
+    from metrics import Counter, Gauge, Histogram
+    from shared_state import get_store
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "200"))
+JOB_MAX_BATCH = int(os.getenv("JOB_MAX_BATCH", "50"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+JOB_ITEM_TIMEOUT = float(os.getenv("JOB_ITEM_TIMEOUT", "600"))
+JOB_EVENT_POLL = float(os.getenv("JOB_EVENT_POLL", "0.5"))
+JOB_EVENT_HEARTBEAT = float(os.getenv("JOB_EVENT_HEARTBEAT", "15"))
+
+JOB_ITEMS = Counter("job_items_total", "Job queue items finished", ("kind", "status"))
+JOB_ITEM_SECONDS = Histogram("job_item_duration_seconds", "Job queue item run time", ("kind",))
+JOB_QUEUE_DEPTH = Gauge("job_queue_depth", "Job queue items waiting to run")
+
+_NS_JOB = "job"
+_NS_RESULT = "job-result"
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _result_key(job_id: str, index: int) -> str:
+    return f"{job_id}:{index}"
+
+
+class JobQueue:
+    """작업 종류 → 비동기 처리 함수(입력 1개 → JSON 직렬화 가능한 결과)."""
+
+    def __init__(self, workers: int = JOB_WORKERS, maxsize: int = JOB_QUEUE_MAX, ttl: int = JOB_RESULT_TTL):
+        self.workers = max(1, workers)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._handlers: dict[str, Callable[[Any], Awaitable[Any]]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._watchers: dict[str, set[asyncio.Event]] = {}  # 이 프로세스에서 구독 중인 작업 → 구독자별 변경 알림
+
+    def register(self, kind: str, handler: Callable[[Any], Awaitable[Any]]) -> None:
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self) -> list[str]:
+        return list(self._handlers)
+
+    # ── 수명 ──
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"작업 큐 시작: 워커 {self.workers}개, 대기 상한 {self.maxsize}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # 실행하지 못한 항목은 실패로 기록해 조회하는 쪽이 무한정 기다리지 않게 한다
+        while self._queue is not None and not self._queue.empty():
+            job_id, index, _ = self._queue.get_nowait()
+            self._finish_item(job_id, index, None, "서버 종료로 실행되지 않음", 0.0)
+        JOB_QUEUE_DEPTH.set(0)
+
+    # ── 제출/조회 ──
+
+    def submit(self, kind: str, payloads: list) -> dict:
+        """입력 목록을 작업 하나로 큐에 넣고 작업 메타를 반환. 큐가 가득 차면 QueueFull."""
+        if self._queue is None:
+            raise RuntimeError("작업 큐가 시작되지 않았습니다")
+        if kind not in self._handlers:
+            raise KeyError(kind)
+        if self._queue.qsize() + len(payloads) > self.maxsize:
+            raise QueueFull(f"대기 중인 작업 항목 {self._queue.qsize()}개 — 상한 {self.maxsize}")
+        job_id = uuid.uuid4().hex
+        meta = {"id": job_id, "kind": kind, "status": "queued", "total": len(payloads), "completed": 0, "failed": 0,
+                "createdAt": time.time(), "startedAt": None, "finishedAt": None}
+        get_store().set(_NS_JOB, job_id, meta, ttl=self.ttl)
+        for index, payload in enumerate(payloads):
+            self._queue.put_nowait((job_id, index, payload))
+        JOB_QUEUE_DEPTH.set(self._queue.qsize())
+        return meta
+
+    def get(self, job_id: str, include_results: bool = True) -> Optional[dict]:
+        store = get_store()
+        meta = store.get(_NS_JOB, job_id)
+        if meta is None:
+            return None
+        if include_results:
+            # 저장소 값을 고치지 않는다 (memory 백엔드는 저장된 dict 자체를 돌려준다)
+            meta = {**meta, "results": [store.get(_NS_RESULT, _result_key(job_id, i)) for i in range(meta["total"])]}
+        return meta
+
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """진행 상황이 바뀔 때마다(또는 JOB_EVENT_HEARTBEAT마다) 작업 메타를 내보내고, 끝나면 결과를 포함한 마지막 상태로 종료."""
+        event = asyncio.Event()
+        self._watchers.setdefault(job_id, set()).add(event)
+        last, sent_at = None, 0.0
+        try:
+            while True:
+                meta = self.get(job_id, include_results=False)
+                if meta is None:
+                    return
+                if meta["status"] in ("done", "failed"):
+                    yield self.get(job_id) or meta
+                    return
+                progress = (meta["status"], meta["completed"], meta["failed"])
+                if progress != last or time.monotonic() - sent_at >= JOB_EVENT_HEARTBEAT:
+                    last, sent_at = progress, time.monotonic()
+                    yield meta
+                event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), JOB_EVENT_POLL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(event)
+                if not watchers:
+                    del self._watchers[job_id]
+
+    def status(self) -> dict:
+        return {"workers": self.workers, "running": bool(self._tasks), "queued": self._queue.qsize() if self._queue else 0,
+                "maxQueued": self.maxsize, "kinds": self.kinds}
+
+    # ── 실행 ──
+
+    def _notify(self, job_id: str) -> None:
+        for event in self._watchers.get(job_id, ()):
+            event.set()
+
+    def _mark_started(self, job_id: str) -> None:
+        def start(meta):
+            if meta is None or meta["startedAt"] is not None:
+                return meta, None
+            return {**meta, "status": "running", "startedAt": time.time()}, None
+        get_store().update(_NS_JOB, job_id, start, ttl=self.ttl)
+        self._notify(job_id)
+
+    def _finish_item(self, job_id: str, index: int, result: Any, error: Optional[str], duration: float) -> None:
+        store = get_store()
+        entry = {"ok": error is None, "durationMs": round(duration * 1000, 1)}
+        if error is None:
+            entry["result"] = result
+        else:
+            entry["error"] = error
+        store.set(_NS_RESULT, _result_key(job_id, index), entry, ttl=self.ttl)
+
+        def count(meta):
+            if meta is None:
+                return None, None
+            meta = {**meta, "completed": meta["completed"] + (error is None), "failed": meta["failed"] + (error is not None)}
+            if meta["completed"] + meta["failed"] >= meta["total"]:
+                meta["status"] = "done" if meta["completed"] else "failed"
+                meta["finishedAt"] = time.time()
+            return meta, meta
+        meta = store.update(_NS_JOB, job_id, count, ttl=self.ttl)
+        if meta is not None and meta["finishedAt"] is not None:
+            # 먼저 끝난 항목 결과도 작업 종료 시점부터 TTL이 흐르도록 다시 기록
+            for i in range(meta["total"]):
+                key = _result_key(job_id, i)
+                value = store.get(_NS_RESULT, key)
+                if value is not None:
+                    store.set(_NS_RESULT, key, value, ttl=self.ttl)
+            store.trim(_NS_RESULT, max(self.maxsize * 10, 1000))
+        self._notify(job_id)
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job_id, index, payload = await self._queue.get()
+            JOB_QUEUE_DEPTH.set(self._queue.qsize())
+            meta = get_store().get(_NS_JOB, job_id)
+            if meta is None:  # 만료/삭제된 작업
+                continue
+            kind = meta["kind"]
+            self._mark_started(job_id)
+            t0 = time.perf_counter()
+            result, error = None, None
+            try:
+                result = await asyncio.wait_for(self._handlers[kind](payload), JOB_ITEM_TIMEOUT)
+            except asyncio.TimeoutError:
+                error = f"시간 초과 ({JOB_ITEM_TIMEOUT:.0f}초)"
+            except asyncio.CancelledError:
+                self._finish_item(job_id, index, None, "서버 종료로 중단됨", time.perf_counter() - t0)
+                raise
+            except Exception as e:
+                logger.exception(f"작업 항목 실패: {kind} {job_id}[{index}]")
+                error = f"{type(e).__name__}: {e}"
+            duration = time.perf_counter() - t0
+            JOB_ITEMS.inc(kind=kind, status="ok" if error is None else "error")
+            JOB_ITEM_SECONDS.observe(duration, kind=kind)
+            self._finish_item(job_id, index, result, error, duration)
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
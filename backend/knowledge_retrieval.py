@@ -0,0 +1,247 @@
+"""지식 질문 로컬 검색 — prompt_templates 블록으로 만든 답변 코퍼스 + BM25
+
+"판단 노드는 어떻게 써?", "금지 동사가 뭐야?" 같은 방법론 FAQ의 답은 이미 프롬프트 블록
+(L7_GUIDE, DECISION_FORMAT_RULE, L7_LABEL_EXAMPLES, BRANCHING_GUIDE)에 있다.
+블록을 절(섹션) 단위로 잘라 답변 코퍼스를 만들고, 질문을 BM25로 검색해 확신이 높으면 LLM 없이 바로 답한다.
+
+- 코퍼스: _SPECS의 각 항목 = (출처 블록의 절) + 사람이 붙인 제목·대표 질문·첫 문장. 답변 본문은 기동 시
+  블록에서 잘라 오므로 프롬프트를 고치면 답변도 같이 바뀐다. LLM 지시용 표기(⚠️ CRITICAL 등)는 걷어낸다.
+- 토큰: 공백·부호를 뺀 문자 2-gram (형태소 분석기 없이 한국어 조사·어미 변화에 강하다).
+  제목·대표 질문은 본문보다 TITLE_WEIGHT배 가중한다.
+- 질문은 군말("어떻게", "알려줘" 등)과 끝 조사를 뗀 핵심어로 바꾼 뒤 검색한다. 핵심어가 제목·대표 질문과 같으면 바로 적중.
+- 확신 판정: 1위 문서가 질문 2-gram의 RETRIEVAL_MIN_COVERAGE 이상(idf 가중, 코퍼스에 없는 2-gram은 최대 가중)을
+  제목·대표 질문에 포함하고, BM25 점수가 2위의 RETRIEVAL_MIN_MARGIN배 이상일 때만 로컬 답변. 아니면 LLM으로 넘긴다.
+"""
+import logging
+import math
+import os
+import re
+from collections import Counter as TermCounter
+from typing import Optional
+
+try:
+    from .metrics import Counter
+    from .prompt_templates import BRANCHING_GUIDE, DECISION_FORMAT_RULE, L7_GUIDE, L7_LABEL_EXAMPLES
+    from .question_cache import normalize_question
+except ImportError:
+    from metrics import Counter
+    from prompt_templates import BRANCHING_GUIDE, DECISION_FORMAT_RULE, L7_GUIDE, L7_LABEL_EXAMPLES
+    from question_cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "true").lower() == "true"
+RETRIEVAL_MIN_COVERAGE = float(os.getenv("RETRIEVAL_MIN_COVERAGE", "0.75"))
+RETRIEVAL_MIN_MARGIN = float(os.getenv("RETRIEVAL_MIN_MARGIN", "1.2"))
+
+KNOWLEDGE_RETRIEVAL = Counter("knowledge_retrieval_total", "Knowledge questions answered locally vs passed to the LLM",
+                              ("result",))
+
+TITLE_WEIGHT = 3
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_STRIP = re.compile(r"[\W_]+", re.UNICODE)
+# 질문에만 붙는 군말 — 포함률 계산에서 빼지 않으면 "어떻게 잘 써?" 같은 표현이 확신을 깎는다
+_QUERY_FILLER = frozenset(("어떻게", "잘", "왜", "뭘", "뭐", "뭔", "좀", "목록", "보여줘", "보여주세요", "알려줘", "알려주세요",
+                           "써", "써요", "써야", "쓰나요", "쓰면", "쓸까", "돼", "돼요", "안돼", "안돼요", "해", "해요", "해야",
+                           "하나요", "넣어야", "넣나요", "넣어", "언제", "대해", "관해", "있어", "있나요", "할까"))
+_PARTICLES = ("은", "는", "을", "를", "이", "가", "랑", "과", "와", "의", "에", "으로", "로", "이란", "란")
+
+
+def _sections(block: str) -> dict[str, str]:
+    """"[제목]" 또는 "**제목**" 줄로 시작하는 절 → {제목: 본문}. 첫 제목 전 내용은 "" 키."""
+    out: dict[str, list[str]] = {"": []}
+    current = ""
+    for line in block.strip().splitlines():
+        m = re.fullmatch(r"\s*(?:\[(.+?)\]|\*\*(.+?)\*\*)\s*", line)
+        if m:
+            current = (m.group(1) or m.group(2)).strip()
+            out[current] = []
+        else:
+            out[current].append(line)
+    return {k: "\n".join(v).strip() for k, v in out.items()}
+
+
+def _clean(text: str) -> str:
+    """LLM 지시용 표기를 걷어내고 표는 목록으로."""
+    lines = []
+    for line in text.splitlines():
+        line = line.replace("⚠️ CRITICAL:", "").replace("⚠️", "").replace("**", "").replace("절대 ", "").strip()
+        line = re.sub(r"\s*—\s*추가 (ADD|MODIFY).*$", "", line)  # LLM 제안 지시
+        if line.startswith("|"):
+            cells = [c.strip() for c in line.strip("|").split("|")]
+            if cells[0] == "패턴":  # 표 머리글
+                continue
+            line = f"- {cells[0]}: {cells[1]} — 예: {cells[2]} ({cells[3]})" if len(cells) >= 4 else "- " + " / ".join(cells)
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+_L7 = _sections(L7_GUIDE)
+_BRANCH = _sections(BRANCHING_GUIDE)
+
+
+def _node_label_format() -> str:
+    # 첫 줄(경고문)은 첫 문장과 겹치므로 빼고, Decision 유효 형식 목록은 DECISION_FORMAT_RULE에서
+    return ("\n".join(_L7["노드 타입별 표준 형식"].splitlines()[1:]).replace("아래 5가지 패턴", "Decision 5패턴")
+            + "\n" + next(line for line in DECISION_FORMAT_RULE.splitlines() if "모두 유효" in line))
+
+
+# (id, 제목, 대표 질문들, 첫 문장, 본문을 만드는 함수, 후속 질문) — 본문은 _build_entries가 블록에서 잘라 온다
+_SPECS = [
+    ("l7-principles", "L7 작성 원칙",
+     ("L7이 뭐야", "L7 작성법", "L7 라벨 잘 쓰는 법", "좋은 L7 라벨", "L7 작성 원칙", "L7 단위"),
+     "L7은 제3자가 그대로 따라 할 수 있는 한 단계(아토믹 액션)예요.",
+     lambda: _L7["L7 작성 원칙"], ["판단 노드 라벨은 어떻게 쓰나요?", "쓰면 안 되는 동사가 있나요?"]),
+    ("node-label-format", "노드 타입별 라벨 형식",
+     ("태스크 노드 라벨 형식", "프로세스 노드 라벨 형식", "노드 타입별 라벨", "라벨 형식", "한다 형식", "여부 형식"),
+     "노드 타입에 따라 라벨 형식이 달라요.",
+     _node_label_format, ["Decision 라벨 패턴을 알려주세요", "라벨 예시를 보여주세요"]),
+    ("decision-patterns", "Decision 라벨 5패턴",
+     ("판단 노드 라벨", "분기 노드 라벨", "Decision 노드 라벨", "디시전 라벨", "판단 노드 어떻게 써", "분기 라벨 패턴",
+      "판단 노드 라벨 형식", "분기 노드 라벨 형식", "Decision 5패턴", "여부 인가 차이"),
+     "판단(Decision) 노드는 아래 5가지 패턴 중 상황에 맞는 것을 고르면 돼요.",
+     lambda: _L7["Decision 라벨 5패턴"], ["분기점은 언제 넣어야 하나요?", "노드 타입별 라벨 형식은?"]),
+    ("recommended-verbs", "권장 동사",
+     ("권장 동사", "어떤 동사 써", "추천 동사", "표준 동사", "쓸 수 있는 동사"),
+     "Process 노드에는 제3자가 바로 수행할 수 있는 구체 동사를 권장해요.",
+     lambda: _L7["권장 동사 (Process 노드 전용)"], ["쓰면 안 되는 동사가 있나요?", "검토한다 대신 뭘 쓰나요?"]),
+    ("banned-verbs", "사용 금지 동사",
+     ("금지 동사", "쓰면 안 되는 동사", "처리한다 써도 돼", "관리한다 써도 돼", "진행한다 안 되는 이유", "사용 금지 동사",
+      "BANNED_VERBS"),
+     "아래 동사는 무엇을 하는지 드러나지 않아 L7 라벨에 쓰지 않기를 권장해요.",
+     lambda: _L7["사용 금지 동사"], ["대신 어떤 동사를 쓰나요?", "구체화 권장 동사는 뭔가요?"]),
+    ("refinable-verbs", "구체화 권장 동사",
+     ("구체화 권장 동사", "검토한다 대신", "정리한다 대신", "분석한다 대신", "공유한다 대신", "결재한다 대신", "대체 동사"),
+     "아래 동사는 쓸 수는 있지만 더 구체적인 동사로 바꾸면 라벨이 명확해져요.",
+     lambda: _L7["구체화 권장 동사 (대안 있음)"], ["권장 동사 목록을 보여주세요", "금지 동사는 뭔가요?"]),
+    ("label-examples", "라벨 예시",
+     ("라벨 예시", "올바른 라벨 예", "잘못된 라벨 예", "좋은 라벨 나쁜 라벨", "라벨 예제"),
+     "올바른 라벨과 피해야 할 라벨 예시예요.",
+     lambda: L7_LABEL_EXAMPLES, ["Decision 라벨 패턴을 알려주세요", "금지 동사는 뭔가요?"]),
+    ("branching-when", "분기점이 필요한 때",
+     ("분기점 언제 넣어", "판단 노드는 언제 필요해", "분기 노드 언제 써", "분기점 가이드", "분기가 필요한 경우"),
+     "업무 단계가 5개 이상인데 판단 노드가 없다면 분기점이 빠졌을 가능성이 높아요.",
+     lambda: _BRANCH[""], ["Decision 라벨 패턴을 알려주세요", "예외 처리는 어떻게 표현하나요?"]),
+    ("branching-patterns", "분기점 제안 시 Decision 패턴 매핑",
+     ("분기 패턴 매핑", "분기점 유형별 라벨", "분기점 라벨 어떤 패턴"),
+     "분기의 성격에 따라 Decision 패턴을 고르면 돼요.",
+     lambda: _BRANCH["분기점 제안 시 Decision 5패턴 매핑"], ["분기점은 언제 넣어야 하나요?"]),
+] + [
+    (f"branching-{l3}", f"{l3} 분기점 예시",
+     (f"{l3} 분기점", f"{l3} 판단 노드", f"{l3} 분기 예시", f"{l3} 업무 분기"),
+     f"{l3} 업무에서 자주 쓰는 분기점 예시예요.",
+     lambda l3=l3: _BRANCH[l3], ["Decision 라벨 패턴을 알려주세요", "분기점은 언제 넣어야 하나요?"])
+    for l3 in ("채용", "보상/근태", "노사", "임원조직", "총무", "해외인사")
+]
+
+
+def _build_entries(specs: list) -> list:
+    """(id, 제목, 대표 질문들, 첫 문장, 본문, 후속 질문) 목록. 프롬프트 블록에서 절이 사라졌거나 제목이 바뀐
+    항목은 기동을 막지 않고 경고만 남기고 뺀다 (그 질문은 LLM이 답한다)."""
+    entries = []
+    for doc_id, title, questions, lead, body, quick in specs:
+        try:
+            text = body()
+        except (KeyError, StopIteration) as e:
+            logger.warning(f"지식 코퍼스 항목 제외 ({doc_id}): 프롬프트 블록에서 절을 찾을 수 없음 {e!r}")
+            continue
+        entries.append((doc_id, title, questions, lead, text, quick))
+    return entries
+
+
+_ENTRIES = _build_entries(_SPECS)
+
+
+def _query_core(question: str) -> str:
+    """질문 → 군말·끝 조사를 뺀 핵심어 (공백 없음)."""
+    words = []
+    for w in _STRIP.sub(" ", question.lower()).split():
+        if w in _QUERY_FILLER:
+            continue
+        for p in _PARTICLES:
+            if w.endswith(p) and len(w) > len(p) + 1:
+                w = w[: -len(p)]
+                break
+        words.append(w)
+    return normalize_question("".join(words))
+
+
+def _grams(text: str) -> list[str]:
+    s = _STRIP.sub("", text.lower())
+    if len(s) <= 2:
+        return [s] if s else []
+    return [s[i:i + 2] for i in range(len(s) - 1)]
+
+
+class KnowledgeIndex:
+    """BM25 인덱스 (문서 수십 개 — 메모리 상주, 기동 시 구축)."""
+
+    def __init__(self, entries: list = _ENTRIES):
+        self.docs = []
+        self.aliases: dict[str, dict] = {}  # 핵심어가 제목/대표 질문과 같으면 점수 계산 없이 적중
+        for doc_id, title, questions, lead, body, quick in entries:
+            head = _grams(title) + [g for q in questions for g in _grams(q)]
+            tf = TermCounter(head * TITLE_WEIGHT + _grams(body))
+            self.docs.append({"id": doc_id, "title": title, "head": frozenset(head), "tf": tf, "len": sum(tf.values()),
+                              "speech": f"{lead}\n\n{_clean(body)}", "quickQueries": quick})
+            for alias in (title, *questions):
+                self.aliases.setdefault(_query_core(alias), self.docs[-1])
+        n = len(self.docs)
+        self.avgdl = sum(d["len"] for d in self.docs) / max(n, 1)
+        df = TermCounter(g for d in self.docs for g in d["tf"])
+        self.idf = {g: math.log(1 + (n - c + 0.5) / (c + 0.5)) for g, c in df.items()}
+        # 코퍼스에 없는 2-gram은 df=0의 idf — 코퍼스가 모르는 말("서브프로세스"의 "서브")이 포함률을 가장 크게 깎아야 한다
+        self.idf_unseen = math.log(1 + (n + 0.5) / 0.5)
+
+    def search(self, question: str, k: int = 3) -> list[tuple[float, float, dict]]:
+        """[(BM25 점수, 제목·대표 질문 포함률, 문서)] 점수순 상위 k개."""
+        q = list(dict.fromkeys(_grams(_query_core(question))))
+        if not q:
+            return []
+        scored = []
+        for d in self.docs:
+            tf, norm = d["tf"], _BM25_K1 * (1 - _BM25_B + _BM25_B * d["len"] / self.avgdl)
+            score = sum(self.idf[g] * tf[g] * (_BM25_K1 + 1) / (tf[g] + norm) for g in q if g in tf)
+            if score > 0:
+                # 포함률은 idf 가중 (흔한 2-gram 하나보다 드문 2-gram 하나가 더 중요하다)
+                weight = sum(self.idf.get(g, self.idf_unseen) for g in q)
+                scored.append((score, sum(self.idf[g] for g in q if g in d["head"]) / weight, d))
+        scored.sort(key=lambda x: -x[0])
+        return scored[:k]
+
+    def answer(self, question: str) -> Optional[dict]:
+        """확신이 높으면 /api/chat 응답 형태의 dict, 아니면 None."""
+        exact = self.aliases.get(_query_core(question))
+        if exact is not None:
+            KNOWLEDGE_RETRIEVAL.inc(result="answered")
+            return self._response(exact, None, 1.0)
+        hits = self.search(question, k=2)
+        confident = bool(hits) and hits[0][1] >= RETRIEVAL_MIN_COVERAGE and (
+            len(hits) == 1 or hits[0][0] >= RETRIEVAL_MIN_MARGIN * hits[1][0])
+        KNOWLEDGE_RETRIEVAL.inc(result="answered" if confident else "low_confidence")
+        if not confident:
+            return None
+        score, coverage, d = hits[0]
+        return self._response(d, score, coverage)
+
+    @staticmethod
+    def _response(d: dict, score: Optional[float], coverage: float) -> dict:
+        return {"message": d["speech"], "speech": d["speech"], "suggestions": [], "quickQueries": d["quickQueries"],
+                "retrieval": {"id": d["id"], "title": d["title"], "score": None if score is None else round(score, 2),
+                              "coverage": round(coverage, 2)}}
+
+
+_index: Optional[KnowledgeIndex] = None
+
+
+def get_knowledge_index() -> Optional[KnowledgeIndex]:
+    """RETRIEVAL_ENABLED=false면 None."""
+    global _index
+    if not RETRIEVAL_ENABLED:
+        return None
+    if _index is None:
+        _index = KnowledgeIndex()
+        logger.info(f"지식 검색 인덱스 구축: 문서 {len(_index.docs)}개")
+    return _index
@@ -2,10 +2,23 @@
 
 사용자의 L4/L5 컨텍스트에 맞는 L3 블록을 동적으로 반환하여
 LLM 프롬프트에 삽입. 전체 321줄 대신 해당 L3만 주입하여 토큰 절약.
+get_l345_parts는 L3 안에서도 현재 L4와 앞뒤 L4만 남기고(L345_SELECT), 분기점 예시도 그 L4들 것만 붙인다.
 """
 
+import os
 import re
-from typing import Optional
+from typing import Iterable, Optional
+
+try:
+    from .profiling import profiled
+    from .prompt_templates import BRANCHING_BY_L3
+except ImportError:
+    from profiling import profiled
+    from prompt_templates import BRANCHING_BY_L3
+
+# 관련 L4만 주입 (false면 L3 전체 구조 + 분기점 예시 전체)
+L345_SELECT = os.getenv("L345_SELECT", "true").lower() != "false"
+L345_SELECT_MAX_L4 = int(os.getenv("L345_SELECT_MAX_L4", "3"))  # L4 미확정 시 라벨 겹침으로 고르는 최대 수
 
 # ── L345 트리: L3 → L4 → [L5 목록] ──
 L345_TREE: dict[str, dict[str, list[str]]] = {
@@ -168,18 +181,13 @@ def _find_l5_in_tree(l5_raw: str, l3_name: str) -> Optional[tuple[str, str]]:
     return None
 
 
-def get_l345_context(l4_raw: str, l5_raw: str = "", process_name: str = "") -> str:
-    """사용자의 L4/L5에 맞는 L3 블록을 프롬프트 삽입용 문자열로 반환.
-
-    Returns:
-        포맷된 L345 참조 블록. 매칭 실패 시 빈 문자열.
-    """
+def _resolve_position(l4_raw: str, l5_raw: str = "", process_name: str = "") -> Optional[tuple[str, str, str, str]]:
+    """(L3명, 현재 L4, 현재 L5, '현재 작업' 설명) 반환. 매칭 실패 시 None."""
     result = find_l3_for_l4(l4_raw)
     if not result:
-        return ""
+        return None
 
     l3_name, matched_l4 = result
-    l3_block = L345_TREE[l3_name]
 
     # L5 위치 파악
     current_l4 = matched_l4
@@ -201,27 +209,142 @@ def get_l345_context(l4_raw: str, l5_raw: str = "", process_name: str = "") -> s
             current_desc_parts.append(pn)
 
     current_desc = " > ".join(current_desc_parts) if current_desc_parts else "미상"
+    return l3_name, current_l4, current_l5, current_desc
 
-    # L3 블록 포맷
-    lines = [
-        f"[HR 프로세스 참조: {l3_name}]",
-        f"현재 작업: {current_desc}",
-        "",
-        f"{l3_name}의 전체 구조:",
-    ]
 
-    for l4_key, l5_list in l3_block.items():
-        l5_formatted = []
-        for l5 in l5_list:
-            if l5 == current_l5:
-                l5_formatted.append(f"{l5} \u2190 \ud604\uc7ac")
-            else:
-                l5_formatted.append(l5)
+# ── L3 전체 구조 블록 (위치 표시 없음) — bench/prompt_token_report.py가 선택 전 크기 비교에 쓴다 ──
+
+_L3_STATIC_BLOCKS: dict[str, str] = {}
+
+
+def _l3_static_block(l3_name: str) -> str:
+    block = _L3_STATIC_BLOCKS.get(l3_name)
+    if block is None:
+        lines = [f"[HR 프로세스 참조: {l3_name}]", f"{l3_name}의 전체 구조:"]
+        for l4_key, l5_list in L345_TREE[l3_name].items():
+            lines.append(f"  {l4_key}: {', '.join(l5_list)}")
+        lines.append("")
+        lines.append("이 구조를 참고하여 누락 단계, 전후 흐름, 분기점을 제안하세요.")
+        block = _L3_STATIC_BLOCKS[l3_name] = "\n".join(lines)
+    return block
+
+
+# ── 관련 L4 선택 ──
+# 현재 L4가 확정되면 트리 순서상 앞뒤 L4까지 (L4 단위로 고정 → prefix 캐시가 L4별로 재사용된다).
+# L4를 모르면(L3 이름만 매칭) 플로우 라벨과 L4/L5 이름의 문자 2-gram 겹침으로 상위 L4를 고른다.
+
+_L4_GRAMS: dict[tuple[str, str], frozenset] = {}
+_SELECTED_BLOCKS: dict[tuple, str] = {}
+_GRAM_STRIP = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def _bigrams(text: str) -> set[str]:
+    grams = set()
+    for word in _GRAM_STRIP.sub(" ", text).split():
+        grams.update(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
 
-        marker = " \u2190" if l4_key == current_l4 and not current_l5 else ""
-        lines.append(f"  {l4_key}{marker}: {', '.join(l5_formatted)}")
 
-    lines.append("")
-    lines.append("이 구조를 참고하여 누락 단계, 전후 흐름, 분기점을 제안하세요.")
+def _l4_grams(l3_name: str, l4_key: str) -> frozenset:
+    grams = _L4_GRAMS.get((l3_name, l4_key))
+    if grams is None:
+        grams = _L4_GRAMS[(l3_name, l4_key)] = frozenset(_bigrams(" ".join([l4_key, *L345_TREE[l3_name][l4_key]])))
+    return grams
+
+
+def select_l4s(l3_name: str, current_l4: str = "", labels: Iterable[str] = ()) -> tuple[str, ...]:
+    """프롬프트에 남길 L4 (트리 순서). 고를 근거가 없으면 L3 전체."""
+    keys = list(L345_TREE[l3_name])
+    if current_l4 in L345_TREE[l3_name]:
+        i = keys.index(current_l4)
+        return tuple(keys[max(0, i - 1):i + 2])
+    grams = _bigrams(" ".join(labels))
+    if grams:
+        scored = sorted(((len(grams & _l4_grams(l3_name, k)), -i, k) for i, k in enumerate(keys)), reverse=True)
+        picked = {k for overlap, _, k in scored[:L345_SELECT_MAX_L4] if overlap >= 2}
+        if picked:
+            return tuple(k for k in keys if k in picked)
+    return tuple(keys)
+
+
+def _branching_lines(l3_name: str, l4s: tuple[str, ...]) -> list[str]:
+    """L3 분기점 예시 중 고른 L4의 줄 ("- 근태운영: …"은 "근태운영 및 관리"와 맞춘다). 맞는 줄이 없으면 L3 전체."""
+    hints = BRANCHING_BY_L3.get(l3_name)
+    if not hints:
+        return []
+    lines = hints.splitlines()
+    picked = []
+    for line in lines:
+        key = line.lstrip("- ").split(":", 1)[0].strip()
+        if any(key == l4 or l4.startswith(key) or key.startswith(l4) for l4 in l4s):
+            picked.append(line)
+    return picked or lines
+
+
+def _marked_l4_line(l4_key: str, l5_list: list[str], current_l4: str, current_l5: str) -> str:
+    """현재 위치 "← 현재" 표시 (L5를 알면 L5에, 모르면 L4에)."""
+    if l4_key != current_l4:
+        return f"  {l4_key}: {', '.join(l5_list)}"
+    l5_formatted = [f"{l5} \u2190 \ud604\uc7ac" if l5 == current_l5 else l5 for l5 in l5_list]
+    marker = " \u2190" if not current_l5 else ""
+    return f"  {l4_key}{marker}: {', '.join(l5_formatted)}"
+
+
+def _l3_selected_block(l3_name: str, l4s: tuple[str, ...], branching: bool,
+                       current_l4: str = "", current_l5: str = "") -> str:
+    cache_key = (l3_name, l4s, branching, current_l4, current_l5)
+    block = _SELECTED_BLOCKS.get(cache_key)
+    if block is not None:
+        return block
+    tree = L345_TREE[l3_name]
+    if len(l4s) == len(tree):
+        lines = [f"[HR 프로세스 참조: {l3_name}]", f"{l3_name}의 전체 구조:"]
+    else:
+        lines = [f"[HR 프로세스 참조: {l3_name}]", f"{l3_name}의 관련 구조 (현재 L4와 앞뒤 L4):"]
+    # 현재 위치 표시가 있는 줄부터는 L5마다 달라진다 — 그 앞(헤더·앞쪽 L4)까지는 같은 L4 요청끼리 prefix를 공유
+    lines += [_marked_l4_line(l4_key, tree[l4_key], current_l4, current_l5) for l4_key in l4s]
+    if len(l4s) != len(tree):
+        lines.append(f"  (그 외 L4 {len(tree) - len(l4s)}개 생략)")
+    if branching:
+        hint_lines = _branching_lines(l3_name, l4s)
+        if hint_lines:
+            lines += ["", f"[분기점 예시 — {l3_name}]", *hint_lines]
+    lines += ["", "이 구조를 참고하여 누락 단계, 전후 흐름, 분기점을 제안하세요."]
+    block = _SELECTED_BLOCKS[cache_key] = "\n".join(lines)
+    return block
+
+
+def _all_branching_block() -> str:
+    """L3를 모를 때 — 모든 L3의 분기점 예시 (system 프롬프트에 전체 가이드가 있던 때와 같은 정보)."""
+    return "[분기점 예시]\n" + "\n".join(f"{l3}\n{hints}" for l3, hints in BRANCHING_BY_L3.items())
+
+
+@profiled("l345")
+def get_l345_parts(l4_raw: str, l5_raw: str = "", process_name: str = "", labels: Iterable[str] = (),
+                   branching: bool = False) -> tuple[str, str]:
+    """(L3 참조 블록, '현재 작업: …' 한 줄) 반환. 매칭 실패 시 ("", "") — branching이면 모든 L3 분기점 예시.
+
+    참조 블록은 현재 L4와 앞뒤 L4만 담는다 (L4 미확정 시 labels와 겹치는 L4). branching=True면
+    그 L4들의 분기점 예시를 덧붙인다 (BRANCHING_GUIDE_CORE를 쓰는 review/coach 프롬프트용).
+    현재 L4/L5는 블록 안에 "← 현재"로 표시한다. 같은 (L3, L4 선택, branching, 현재 위치)면 블록은 글자 하나까지 같다.
+    """
+    resolved = _resolve_position(l4_raw, l5_raw, process_name)
+    if not resolved:
+        return (_all_branching_block() if branching else ""), ""
+    l3_name, current_l4, current_l5, current_desc = resolved
+    l4s = select_l4s(l3_name, current_l4, labels) if L345_SELECT else tuple(L345_TREE[l3_name])
+    return (_l3_selected_block(l3_name, l4s, branching, current_l4, current_l5),
+            f"현재 작업({l3_name}): {current_desc}")
+
 
-    return "\n".join(lines)
+def build_indexes() -> dict:
+    """기동 시 1회 — 요청 경로(get_l345_parts)가 읽는 캐시를 미리 채운다: L4별 2-gram(라벨로 L4 고르기)과
+    L4·L5 위치마다의 선택 블록(분기점 예시 유무 둘 다). 첫 요청이 조립 비용을 내지 않게 한다."""
+    for l3_name, tree in L345_TREE.items():
+        for l4_key, l5_list in tree.items():
+            _l4_grams(l3_name, l4_key)
+            l4s = select_l4s(l3_name, l4_key) if L345_SELECT else tuple(tree)
+            for l5 in ("", *l5_list):
+                for branching in (False, True):
+                    _l3_selected_block(l3_name, l4s, branching, l4_key, l5)
+    return {"l4_grams": len(_L4_GRAMS), "selected_blocks": len(_SELECTED_BLOCKS), "l4_index": len(_L4_TO_L3)}
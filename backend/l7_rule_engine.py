@@ -0,0 +1,273 @@
+"""L7 라벨 규칙 엔진 — l7_rules.json(선언형 규칙)을 한 번 컴파일해 단일 패스로 평가
+
+규칙 데이터(동사 목록, 정규식, 심각도, 메시지)는 l7_rules.json 한 곳에 있고,
+이 모듈은 기동 시 그것을 다음 형태로 컴파일한다.
+- 동사/힌트 표: 목록 순서를 유지한 tuple. 라벨이 20자 안팎이라 표를 합친 alternation 정규식 한 번보다
+  부분 문자열 검사 몇 번이 더 빠르다.
+- 정규식: 시스템명·복수 동작·의도 표현·어미 패턴을 미리 컴파일하고, guard 문자열이 라벨에 없으면
+  정규식을 돌리지 않는다 (guard = 모든 매치가 반드시 포함하는 문자열). 어미 패턴은 alternation 하나로 합친다.
+- 규칙: 규칙마다 판정 클로저 + 이슈 템플릿(고정 필드 dict, {verb}/{system}/{alternatives}/{p1}/{p2}만 채움,
+  감점 미리 계산)을 만들고 판단/그 외 노드별 적용 목록을 미리 나눈다. 라벨당 한 번의 순회로 끝난다.
+
+version_hash는 규칙 파일 정규형(JSON)의 sha256 앞 12자리다. section_hashes는 표/패턴마다 따로 계산하며,
+정규형이 키 순서를 보존한 JSON.stringify와 같으므로 프론트(rulesLoader.ts)가 같은 목록으로
+해시를 계산해 /api/l7-rules 값과 비교하면 어느 표가 어긋났는지 알 수 있다.
+"""
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = Path(__file__).resolve().parent / "l7_rules.json"
+
+
+def canonical_json(value: Any) -> str:
+    """해시용 정규형 — 키 순서 유지, 공백 없음, 비ASCII 그대로 (JS JSON.stringify와 동일)."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()[:12]
+
+
+class _Template:
+    """이슈 dict 템플릿. 자리표시자가 없는 필드는 그대로 재사용하고, 감점은 미리 계산해 둔다."""
+    __slots__ = ("fixed", "dynamic", "penalty", "reject")
+
+    def __init__(self, rule: dict, penalty: dict):
+        self.fixed = {"ruleId": rule["id"], "severity": rule["severity"], "friendlyTag": rule["friendlyTag"]}
+        self.dynamic = []
+        for field in ("message", "suggestion", "reasoning"):
+            text = rule[field]
+            if "{" in text:
+                self.dynamic.append((field, text))
+            self.fixed[field] = text
+        self.penalty = penalty.get(rule["severity"], 0)
+        self.reject = rule["severity"] == "reject"
+
+    def render(self, values: dict) -> dict:
+        issue = dict(self.fixed)
+        for field, text in self.dynamic:
+            issue[field] = text.format_map(values)
+        return issue
+
+
+def _guarded(items: list) -> tuple:
+    """[{"guard", "pattern"}] → ((guard, 컴파일된 정규식), ...). guard는 모든 매치가 포함하는 문자열(없으면 None)."""
+    out = []
+    for item in items:
+        guard = item.get("guard")
+        if guard is not None and guard not in item["pattern"].replace("(", "").replace(")", ""):  # 오타 방지용 확인
+            raise ValueError(f"guard '{guard}'가 패턴에 없음: {item['pattern']}")
+        out.append((guard, re.compile(item["pattern"])))
+    return tuple(out)
+
+
+def _first_match(guarded: tuple, text: str):
+    """목록 순서상 처음 매치되는 패턴의 match (guard가 라벨에 없으면 정규식을 돌리지 않는다)."""
+    for guard, pattern in guarded:
+        if guard is None or guard in text:
+            m = pattern.search(text)
+            if m:
+                return m
+    return None
+
+
+class L7RuleEngine:
+    """컴파일된 L7 규칙 세트. validate()는 기존 mock_validate와 같은 결과 dict를 만든다.
+
+    규칙마다 (판정 클로저, 이슈 템플릿)을 만들고, 노드 종류(판단/그 외)별로 적용 규칙 목록을 미리 나눠 둔다.
+    판정 클로저는 (라벨, 금지 동사, 시스템명) → 템플릿 값 dict 또는 None.
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.version = spec.get("version", "")
+        self.version_hash = _hash(spec)
+        self.section_hashes = {f"tables.{k}": _hash(v) for k, v in spec["tables"].items()}
+        self.section_hashes.update({f"patterns.{k}": _hash(v) for k, v in spec["patterns"].items()})
+        self.section_hashes["rules"] = _hash(spec["rules"])
+
+        tables = spec["tables"]
+        self.banned = tuple(tables["banned_verbs"])
+        self.refinable = tuple(tables["refinable_verbs"].items())
+        self.transitive = tuple(tables["transitive_verbs"])
+        self.decision_hints = tuple(tables["decision_hints"])
+        self.non_system_terms = frozenset(tables["non_system_terms"])
+
+        patterns = spec["patterns"]
+        self._system_name = _guarded(patterns["system_name"])
+        self._system_keywords = re.compile(patterns["system_keywords"])
+        self._system_upper = re.compile(patterns["system_upper"])
+        self._compound = _guarded(patterns["compound"])
+        self._intent_exclude = _guarded(patterns["intent_exclude"])
+        self._object_particle = re.compile(patterns["object_particle"])
+        self._process_ending = re.compile(patterns["process_ending"])
+        self._decision_ending = re.compile("|".join(f"(?:{p})" for p in patterns["decision_ending"]))
+
+        penalty = spec["scoring"]["penalty"]
+        self._base = spec["scoring"]["base"]
+        self._decision_checks, self._process_checks = [], []
+        for rule in spec["rules"]:
+            factory = getattr(self, f"_compile_{rule['check']}", None)
+            if factory is None:
+                raise ValueError(f"알 수 없는 규칙 check: {rule['id']} → {rule['check']}")
+            entry = (factory(rule), _Template(rule, penalty))
+            # nodeTypes: all / decision / process(= 판단 노드가 아닌 모든 노드)
+            node_types = rule.get("nodeTypes", "all")
+            if node_types in ("all", "decision"):
+                self._decision_checks.append(entry)
+            if node_types in ("all", "process"):
+                self._process_checks.append(entry)
+        self._encouragement = spec["encouragement"]
+        self._llm_failed_warning = spec["llmFailedWarning"]
+
+    def _detect_system(self, text: str) -> Optional[str]:
+        for guard, pattern in self._system_name:
+            if guard is not None and guard not in text:
+                continue
+            m = pattern.search(text)
+            if m and m.group(1):
+                candidate = m.group(1).strip()
+                if candidate.upper() in self.non_system_terms:  # 파일 형식 등 일반 용어
+                    continue
+                # 영문 대문자 포함 → 시스템명, 한국어 전용 → 시스템 키워드 필요
+                if self._system_upper.search(candidate) or self._system_keywords.search(candidate):
+                    return candidate
+        return None
+
+    # ── 규칙 컴파일: rule → 판정 클로저 ──
+
+    def _compile_too_short(self, rule):
+        limit = rule["minLength"]
+        return lambda text, banned, system: {} if len(text) < limit else None
+
+    def _compile_too_long(self, rule):
+        limit = rule["maxLength"]
+        return lambda text, banned, system: {} if len(text) > limit else None
+
+    def _compile_banned_verb(self, rule):
+        return lambda text, banned, system: {"verb": banned} if banned else None
+
+    def _compile_system_name(self, rule):
+        return lambda text, banned, system: {"system": system} if system else None
+
+    def _compile_refinable_verb(self, rule):
+        refinable = self.refinable
+
+        def check(text, banned, system):
+            if banned:  # 금지 동사가 있으면 R-03a만
+                return None
+            for verb, alternatives in refinable:
+                if verb in text:
+                    return {"verb": verb, "alternatives": alternatives}
+            return None
+        return check
+
+    def _compile_compound_action(self, rule):
+        compound, intent_exclude = self._compound, self._intent_exclude
+
+        def check(text, banned, system):
+            # 의도/희망 표현(~하고자 한다 등)은 복수 동작이 아님
+            m = _first_match(compound, text)
+            if m is None or not (m.group(1) and m.group(2)) or _first_match(intent_exclude, text):
+                return None
+            p1, p2 = m.group(1), m.group(2)
+            return {"p1": p1 if p1.endswith("다") else p1 + "다", "p2": p2 if p2.endswith("다") else p2 + "다"}
+        return check
+
+    def _compile_missing_object(self, rule):
+        limit = rule.get("minLength", 0)
+        transitive, particle = self.transitive, self._object_particle
+
+        def check(text, banned, system):
+            if len(text) < limit:
+                return None
+            for verb in transitive:
+                if verb in text:
+                    return None if particle.search(text) else {"verb": verb}
+            return None
+        return check
+
+    def _compile_missing_criterion(self, rule):
+        hints = self.decision_hints
+
+        def check(text, banned, system):
+            for hint in hints:
+                if hint in text:
+                    return None
+            return {}
+        return check
+
+    def _compile_process_ending(self, rule):
+        search = self._process_ending.search
+        return lambda text, banned, system: {} if search(text) else None
+
+    def _compile_decision_ending(self, rule):
+        search = self._decision_ending.search
+        return lambda text, banned, system: {} if search(text) else None
+
+    # ── 평가 ──
+
+    def validate(self, label: str, node_type: str = "process", llm_failed: bool = False) -> dict:
+        text = label.strip()
+        banned = None
+        for verb in self.banned:
+            if verb in text:
+                banned = verb
+                break
+        system = self._detect_system(text)
+
+        issues = []
+        penalty = 0
+        is_pass = True
+        for check, tpl in (self._decision_checks if node_type == "decision" else self._process_checks):
+            values = check(text, banned, system)
+            if values is None:
+                continue
+            issues.append(tpl.render(values) if values else dict(tpl.fixed))
+            penalty += tpl.penalty
+            if tpl.reject:
+                is_pass = False
+
+        encouragement = self._encouragement["clean" if not issues else ("pass" if is_pass else "fail")]
+        result = {"pass": is_pass, "score": max(0, self._base - penalty), "confidence": "high", "issues": issues,
+                  "rewriteSuggestion": None, "encouragement": encouragement}
+        if system:
+            result["detectedSystemName"] = system
+        if llm_failed:
+            result["llm_failed"] = True
+            result["warning"] = self._llm_failed_warning
+        return result
+
+    def describe(self) -> dict:
+        """프론트 동기화 확인용 요약 — 버전, 해시, 규칙 목록, 표 크기."""
+        return {
+            "version": self.version,
+            "hash": self.version_hash,
+            "sections": self.section_hashes,
+            "rules": [{"id": r["id"], "severity": r["severity"], "nodeTypes": r.get("nodeTypes", "all"),
+                       "friendlyTag": r["friendlyTag"]} for r in self.spec["rules"]],
+            "tables": {k: len(v) for k, v in self.spec["tables"].items()},
+        }
+
+
+_engine: Optional[L7RuleEngine] = None
+
+
+def load_rules(path: Path = RULES_PATH) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_rule_engine() -> L7RuleEngine:
+    """컴파일된 규칙 엔진 (프로세스당 1개, 첫 호출 시 컴파일)."""
+    global _engine
+    if _engine is None:
+        _engine = L7RuleEngine(load_rules())
+        logger.info(f"L7 규칙 컴파일: v{_engine.version} ({_engine.version_hash}), 규칙 {len(_engine.spec['rules'])}개")
+    return _engine
@@ -0,0 +1,103 @@
+"""최신 요청 우선 — 같은 세션의 새 요청이 오면 진행 중인 이전 LLM 호출을 취소
+
+/api/contextual-suggest는 캔버스를 고칠 때마다 호출된다. 노드를 빠르게 다섯 개 추가하면 생성 다섯 개가
+끝까지 돌지만 화면에 쓰이는 것은 마지막 하나뿐이다. (세션, 엔드포인트)마다 가장 최근 요청만 LLM을 쓰게 한다.
+
+- 키: X-Session-Id 헤더(또는 본문 sessionId) + 엔드포인트. 세션을 모르면 대체하지 않는다 (기존 동작)
+- 같은 프로세스의 이전 호출은 즉시 task.cancel() → call_llm이 httpx 스트림을 닫거나 curl 프로세스를 종료한다
+- 다른 워커가 받은 이전 호출은 shared_state("latest" 네임스페이스)에 기록된 최신 토큰을
+  LATEST_WINS_POLL 간격으로 확인해 스스로 멈춘다 (memory 백엔드면 프로세스 안에서만 의미가 있다)
+- 밀려난 요청은 Superseded를 받고, 엔드포인트는 LLM 없이 짧은 "superseded" 응답을 돌려준다
+"""
+import asyncio
+import logging
+import os
+import uuid
+from typing import Awaitable, Optional, TypeVar
+
+try:
+    from .metrics import Counter
+    from .shared_state import get_store
+except ImportError:
+    from metrics import Counter
+    from shared_state import get_store
+
+logger = logging.getLogger(__name__)
+
+LATEST_WINS_ENABLED = os.getenv("LATEST_WINS_ENABLED", "true").lower() == "true"
+LATEST_WINS_POLL = float(os.getenv("LATEST_WINS_POLL", "0.5"))
+LATEST_WINS_TTL = int(os.getenv("LATEST_WINS_TTL", "600"))  # 최신 토큰 보관 (LLM_GLOBAL_TIMEOUT보다 길게)
+
+REQUESTS_SUPERSEDED = Counter("requests_superseded_total", "In-flight requests cancelled by a newer request from the same session",
+                              ("endpoint",))
+
+_NS = "latest"
+T = TypeVar("T")
+
+
+class Superseded(Exception):
+    pass
+
+
+class LatestWins:
+    """엔드포인트 하나의 세션별 진행 중 작업."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self._inflight: dict[str, tuple[str, asyncio.Task]] = {}
+
+    async def run(self, session_id: Optional[str], coro: Awaitable[T]) -> T:
+        """coro를 실행해 결과 반환. 실행 중 같은 세션의 새 요청이 들어오면 coro를 취소하고 Superseded."""
+        if not LATEST_WINS_ENABLED or not session_id:
+            return await coro
+        key = f"{self.endpoint}|{session_id}"
+        token = uuid.uuid4().hex
+        store = get_store()
+        store.set(_NS, key, token, ttl=LATEST_WINS_TTL)
+        prev = self._inflight.get(key)
+        if prev is not None and not prev[1].done():
+            prev[1].cancel()
+
+        task = asyncio.ensure_future(coro)
+        self._inflight[key] = (token, task)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=LATEST_WINS_POLL)
+                if done:
+                    break
+                if store.get(_NS, key) != token:  # 다른 워커가 같은 세션의 새 요청을 받았다
+                    task.cancel()
+                    await asyncio.wait({task})
+                    break
+            if task.cancelled():
+                REQUESTS_SUPERSEDED.inc(endpoint=self.endpoint)
+                logger.debug(f"새 요청으로 대체되어 취소: {self.endpoint} 세션 {session_id}")
+                raise Superseded(self.endpoint)
+            return task.result()
+        except asyncio.CancelledError:
+            # 이 요청 자체가 취소됨 (클라이언트 연결 종료, 서버 종료) — 진행 중인 호출도 함께 멈춘다
+            task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key, (None,))[0] == token:
+                del self._inflight[key]
+                # 마지막 요청이 끝났으면 토큰도 지운다 (다음 요청이 덮어쓸 때까지 남겨 둘 이유가 없다)
+                if store.get(_NS, key) == token:
+                    store.delete(_NS, key)
+
+    def status(self) -> dict:
+        return {"inflight": sum(1 for _, task in self._inflight.values() if not task.done())}
+
+
+_registry: dict[str, LatestWins] = {}
+
+
+def latest_wins(endpoint: str) -> LatestWins:
+    lw = _registry.get(endpoint)
+    if lw is None:
+        lw = _registry[endpoint] = LatestWins(endpoint)
+    return lw
+
+
+def get_latest_wins_status() -> dict:
+    return {"enabled": LATEST_WINS_ENABLED, "endpoints": {name: lw.status() for name, lw in _registry.items()}}
@@ -5,14 +5,27 @@ import logging
 import os
 import re
 import shutil
-import subprocess
 import time
 from typing import Optional
 
 try:
     from .env_config import LLM_BASE_URL, LLM_MODEL, USE_MOCK, LLM_API_KEY, LLM_API_KEY_HEADER
+    from .circuit_breaker import get_breaker, get_breaker_status
+    from .metrics import estimate_tokens, record_llm_call, record_llm_parse
+    from .profiling import profiled, span
+    from .prompt_assembler import record_prompt_prefix
+    from .prompt_registry import get_prompt_registry
+    from .response_schemas import SCHEMA_MODES, get_response_schema, response_format_params, schema_params
+    from .shared_state import acquire_lease, get_store, release_lease
 except ImportError:
     from env_config import LLM_BASE_URL, LLM_MODEL, USE_MOCK, LLM_API_KEY, LLM_API_KEY_HEADER
+    from circuit_breaker import get_breaker, get_breaker_status
+    from metrics import estimate_tokens, record_llm_call, record_llm_parse
+    from profiling import profiled, span
+    from prompt_assembler import record_prompt_prefix
+    from prompt_registry import get_prompt_registry
+    from response_schemas import SCHEMA_MODES, get_response_schema, response_format_params, schema_params
+    from shared_state import acquire_lease, get_store, release_lease
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +34,15 @@ _llm_available: Optional[bool] = None
 _llm_check_time: float = 0
 _llm_cache_ttl: float = 300
 _llm_lock = asyncio.Lock()
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+LLM_POOL_KEEPALIVE = int(os.getenv("LLM_POOL_KEEPALIVE", "20"))
+LLM_WARM_CONNECTIONS = int(os.getenv("LLM_WARM_CONNECTIONS", "4"))  # 기동 시 미리 여는 keep-alive 연결 수
+LLM_CHECK_LEASE_SEC = float(os.getenv("LLM_CHECK_LEASE_SEC", "90"))  # 연결 확인 최대 소요(재시도·curl 포함)
 LLM_USE_CURL = os.getenv("LLM_USE_CURL", "auto").lower()
+# 응답 스키마 강제: auto(기동 시 서버 지원 여부 확인) | json_schema | guided_json | json_object | off
+LLM_SCHEMA_MODE = os.getenv("LLM_SCHEMA_MODE", "auto").lower()
+LLM_SCHEMA_PROBE_TTL = float(os.getenv("LLM_SCHEMA_PROBE_TTL", "3600"))  # 확인 결과 재사용 기간(초)
+_schema_lock = asyncio.Lock()
 _last_llm_error: str = ""
 
 
@@ -75,157 +96,339 @@ def _find_curl() -> Optional[str]:
     return None
 
 
-def _curl_request(method: str, url: str, headers: dict, body: Optional[dict], timeout_sec: int = 30) -> tuple[int, str]:
-    curl = _find_curl()
-    if not curl:
-        return 0, "curl_not_found"
-
+def _curl_cmd(curl: str, method: str, url: str, headers: dict, body: Optional[dict]) -> list[str]:
     cmd = [curl, "-sS", "-X", method, url]
     for k, v in headers.items():
         cmd.extend(["-H", f"{k}: {v}"])
     if body is not None:
         cmd.extend(["-H", "Content-Type: application/json", "-d", json.dumps(body, ensure_ascii=False)])
-    cmd.extend(["-w", "\n%{http_code}"])
-
+    cmd.extend(["-w", "\n%{http_code} %{time_starttransfer}"])
+    return cmd
+
+
+def _parse_curl_output(stdout: str, stderr: str, timing: Optional[dict]) -> tuple[int, str]:
+    raw = (stdout or "").strip()
+    stderr = (stderr or "").strip()
+    if not raw:
+        return 0, stderr
+    lines = raw.splitlines()
+    code_str, _, ttfb_str = lines[-1].strip().partition(" ")
+    text = "\n".join(lines[:-1]).strip()
     try:
-        cp = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_sec, check=False)
-        raw = (cp.stdout or "").strip()
-        stderr = (cp.stderr or "").strip()
-        if not raw:
-            return 0, stderr
-        lines = raw.splitlines()
-        code_str = lines[-1].strip()
-        text = "\n".join(lines[:-1]).strip()
+        code = int(code_str)
+    except ValueError:
+        code = 0
+        text = raw
+    if code == 0 and stderr:
+        return 0, stderr
+    if timing is not None and ttfb_str:
         try:
-            code = int(code_str)
+            timing["ttfb"] = float(ttfb_str)
         except ValueError:
-            code = 0
-            text = raw
-        if code == 0 and stderr:
-            return 0, stderr
-        return code, text
+            pass
+    return code, text
+
+
+async def _curl_request_async(method: str, url: str, headers: dict, body: Optional[dict], timeout_sec: int = 30,
+                              timing: Optional[dict] = None) -> tuple[int, str]:
+    """curl로 요청 (call_llm·연결 확인 공용). 이벤트 루프를 막지 않고, 호출이 취소되거나(새 요청으로 대체,
+    클라이언트 연결 종료) 시간을 넘기면 curl 프로세스를 종료한다. timing dict가 주어지면
+    time_starttransfer(TTFB, 초)를 'ttfb'에 기록."""
+    curl = _find_curl()
+    if not curl:
+        return 0, "curl_not_found"
+    try:
+        proc = await asyncio.create_subprocess_exec(*_curl_cmd(curl, method, url, headers, body),
+                                                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
     except Exception as e:
         return 0, str(e)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout_sec)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return 0, f"curl timeout ({timeout_sec}s)"
+    except asyncio.CancelledError:
+        if proc.returncode is None:
+            proc.kill()
+            await asyncio.shield(proc.wait())
+        raise
+    return _parse_curl_output(stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace"), timing)
 
 
 async def get_http_client() -> httpx.AsyncClient:
     global _http_client
     if _http_client is None:
         # Respect proxy/cert env vars from the runtime environment.
-        _http_client = httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0), trust_env=True)
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=LLM_POOL_MAX_CONNECTIONS, max_keepalive_connections=LLM_POOL_KEEPALIVE),
+            trust_env=True,
+        )
     return _http_client
 
 
-async def check_llm() -> bool:
+async def warm_llm_connections(count: int = 0) -> int:
+    """기동 시 LLM 서버로 keep-alive 연결을 미리 count개 열어 둔다 (DNS·TCP·TLS 비용을 첫 사용자 대신 부담).
+    동시에 /models를 호출해 풀에 연결이 count개 남게 한다. 성공한 연결 수를 반환."""
+    count = count or LLM_WARM_CONNECTIONS
+    if count <= 0 or USE_MOCK == "true":
+        return 0
+    client = await get_http_client()
+    headers = _build_auth_headers() or None
+
+    async def one() -> bool:
+        try:
+            r = await client.get(f"{LLM_BASE_URL}/models", timeout=10.0, headers=headers)
+            return r.status_code < 500
+        except Exception as e:
+            logger.warning(f"LLM 연결 예열 실패: {e}")
+            return False
+
+    results = await asyncio.gather(*(one() for _ in range(count)))
+    return sum(results)
+
+
+def _publish_llm_status(available: bool, checked_at: float) -> None:
+    """확인 결과를 이 워커와 공유 저장소에 함께 기록 (다른 워커는 저장소 값을 재사용)."""
+    global _llm_available, _llm_check_time, _last_llm_error
+    if available:
+        _last_llm_error = ""
+    _llm_available, _llm_check_time = available, checked_at
+    get_store().set("llm", "availability", {"available": available, "checkedAt": checked_at, "error": _last_llm_error})
+
+
+def _cached_llm_status() -> Optional[bool]:
+    """TTL 안의 확인 결과(어느 워커가 했든). 없으면 None."""
     global _llm_available, _llm_check_time, _last_llm_error
+    shared = get_store().get("llm", "availability")
+    if shared and (time.time() - shared["checkedAt"]) < _llm_cache_ttl:
+        _llm_available, _llm_check_time = shared["available"], shared["checkedAt"]
+        _last_llm_error = shared.get("error", _last_llm_error)
+        return _llm_available
+    return None
 
+
+@profiled("check_llm")
+async def check_llm() -> bool:
     if USE_MOCK == "true":
         return False
 
     # USE_MOCK=false 라도 실제 연결 확인은 수행한다.
     # 그렇지 않으면 health가 live로 오판되어 운영 확인에 혼선을 준다.
     async with _llm_lock:
-        now = time.time()
-        if _llm_available is not None and (now - _llm_check_time) < _llm_cache_ttl:
-            return _llm_available
-
-        if LLM_USE_CURL != "false":
-            curl_code, curl_text = _curl_request(
-                method="GET",
-                url=f"{LLM_BASE_URL}/models",
-                headers=_build_auth_headers(),
-                body=None,
-                timeout_sec=20,
-            )
-            if curl_code == 200:
-                _llm_available = True
-                _llm_check_time = now
-                _last_llm_error = ""
-                logger.info("LLM 연결 성공 (/models via curl)")
-                return True
-            if curl_text:
-                _last_llm_error = f"curl precheck failed: {curl_text[:200]}"
-                logger.warning(f"LLM curl 사전 확인 실패: {curl_code} {curl_text[:200]}")
+        cached = _cached_llm_status()
+        if cached is not None:
+            return cached
+        # 다른 워커가 확인 중이면 그 결과를 기다린다 (배포 전체에서 확인은 한 번에 1건).
+        # 임대 만료 시간까지만 — 그래도 결과가 없으면 마지막으로 알던 상태를 돌려준다
+        deadline = time.monotonic() + LLM_CHECK_LEASE_SEC
+        while not acquire_lease("llm-check", LLM_CHECK_LEASE_SEC):
+            if time.monotonic() >= deadline:
+                logger.warning("LLM 연결 확인 대기 시간 초과 — 마지막 확인 결과 사용")
+                return bool(_llm_available)
+            await asyncio.sleep(0.5)
+            cached = _cached_llm_status()
+            if cached is not None:
+                return cached
+        try:
+            return await _probe_llm()
+        finally:
+            release_lease("llm-check")
 
-        for attempt in range(3):
-            try:
-                client = await get_http_client()
-                for headers in _build_auth_header_candidates():
-                    r = await client.get(
-                        f"{LLM_BASE_URL}/models",
-                        timeout=5.0,
-                        headers=headers or None,
-                    )
-                    if r.status_code == 200:
-                        _llm_available = True
-                        _llm_check_time = now
-                        _last_llm_error = ""
-                        logger.info("LLM 연결 성공")
-                        return True
-                    _last_llm_error = f"/models status={r.status_code} body={r.text[:200]}"
-                    logger.warning(f"LLM 상태 확인 실패: {r.status_code}")
-            except Exception as e:
-                wait_time = 2 ** attempt
-                _last_llm_error = str(e)
-                logger.warning(f"LLM 연결 시도 {attempt + 1}/3 실패: {e}. {wait_time}초 후 재시도...")
-                if attempt < 2:
-                    await asyncio.sleep(wait_time)
-
-        if LLM_USE_CURL != "false":
-            curl_code, curl_text = _curl_request(
-                method="GET",
-                url=f"{LLM_BASE_URL}/models",
-                headers=_build_auth_headers(),
-                body=None,
-                timeout_sec=20,
-            )
-            if curl_code == 200:
-                _llm_available = True
-                _llm_check_time = now
-                _last_llm_error = ""
-                logger.info("LLM 연결 성공 (/models via curl fallback)")
-                return True
-            if curl_text:
-                _last_llm_error = f"curl fallback failed: {curl_text[:200]}"
-                logger.warning(f"LLM curl fallback 실패: {curl_code} {curl_text[:200]}")
 
-        # Some environments block /models but allow /chat/completions.
-        # Re-validate with a minimal completion request before declaring failure.
+async def _probe_llm() -> bool:
+    global _last_llm_error
+    now = time.time()
+    if LLM_USE_CURL != "false":
+        curl_code, curl_text = await _curl_request_async(
+            method="GET",
+            url=f"{LLM_BASE_URL}/models",
+            headers=_build_auth_headers(),
+            body=None,
+            timeout_sec=20,
+        )
+        if curl_code == 200:
+            _publish_llm_status(True, now)
+            logger.info("LLM 연결 성공 (/models via curl)")
+            return True
+        if curl_text:
+            _last_llm_error = f"curl precheck failed: {curl_text[:200]}"
+            logger.warning(f"LLM curl 사전 확인 실패: {curl_code} {curl_text[:200]}")
+
+    for attempt in range(3):
         try:
             client = await get_http_client()
-            probe_payload = {
-                "model": LLM_MODEL,
-                "messages": [{"role": "user", "content": "ping"}],
-                "temperature": 0,
-                "max_tokens": 1,
-            }
             for headers in _build_auth_header_candidates():
-                probe = await client.post(
-                    f"{LLM_BASE_URL}/chat/completions",
-                    json=probe_payload,
-                    timeout=20.0,
+                r = await client.get(
+                    f"{LLM_BASE_URL}/models",
+                    timeout=5.0,
                     headers=headers or None,
                 )
-                if probe.status_code == 200:
-                    _llm_available = True
-                    _llm_check_time = now
-                    _last_llm_error = ""
-                    logger.info("LLM 연결 성공 (/chat/completions probe)")
+                if r.status_code == 200:
+                    _publish_llm_status(True, now)
+                    logger.info("LLM 연결 성공")
                     return True
-                _last_llm_error = f"probe status={probe.status_code} body={probe.text[:200]}"
-                logger.warning(f"LLM probe 실패: {probe.status_code} {probe.text[:200]}")
+                _last_llm_error = f"/models status={r.status_code} body={r.text[:200]}"
+                logger.warning(f"LLM 상태 확인 실패: {r.status_code}")
         except Exception as e:
+            wait_time = 2 ** attempt
             _last_llm_error = str(e)
-            logger.warning(f"LLM probe 예외: {e}")
+            logger.warning(f"LLM 연결 시도 {attempt + 1}/3 실패: {e}. {wait_time}초 후 재시도...")
+            if attempt < 2:
+                await asyncio.sleep(wait_time)
 
-        _llm_available = False
-        _llm_check_time = now
-        logger.error("LLM 연결 불가 (3회 재시도 모두 실패)")
-        return False
+    if LLM_USE_CURL != "false":
+        curl_code, curl_text = await _curl_request_async(
+            method="GET",
+            url=f"{LLM_BASE_URL}/models",
+            headers=_build_auth_headers(),
+            body=None,
+            timeout_sec=20,
+        )
+        if curl_code == 200:
+            _publish_llm_status(True, now)
+            logger.info("LLM 연결 성공 (/models via curl fallback)")
+            return True
+        if curl_text:
+            _last_llm_error = f"curl fallback failed: {curl_text[:200]}"
+            logger.warning(f"LLM curl fallback 실패: {curl_code} {curl_text[:200]}")
+
+    # Some environments block /models but allow /chat/completions.
+    # Re-validate with a minimal completion request before declaring failure.
+    try:
+        client = await get_http_client()
+        probe_payload = {
+            "model": LLM_MODEL,
+            "messages": [{"role": "user", "content": "ping"}],
+            "temperature": 0,
+            "max_tokens": 1,
+        }
+        for headers in _build_auth_header_candidates():
+            probe = await client.post(
+                f"{LLM_BASE_URL}/chat/completions",
+                json=probe_payload,
+                timeout=20.0,
+                headers=headers or None,
+            )
+            if probe.status_code == 200:
+                _publish_llm_status(True, now)
+                logger.info("LLM 연결 성공 (/chat/completions probe)")
+                return True
+            _last_llm_error = f"probe status={probe.status_code} body={probe.text[:200]}"
+            logger.warning(f"LLM probe 실패: {probe.status_code} {probe.text[:200]}")
+    except Exception as e:
+        _last_llm_error = str(e)
+        logger.warning(f"LLM probe 예외: {e}")
+
+    _publish_llm_status(False, now)
+    logger.error("LLM 연결 불가 (3회 재시도 모두 실패)")
+    return False
+
+
+# ── 응답 스키마 강제 (response_schemas) 지원 여부 ──
+# 확인 결과는 공유 저장소("llm"/"schema_mode")에 두어 워커마다 다시 확인하지 않는다.
+_SCHEMA_PROBE = {"type": "object", "properties": {"ok": {"type": "boolean"}}, "required": ["ok"]}
 
 
-def _parse_llm_content(raw_content: str, allow_text_fallback: bool = False):
-    """LLM 응답에서 JSON을 추출. <think> 태그, 코드블록 처리 포함."""
+def _publish_schema_mode(mode: str, reason: str = "") -> None:
+    get_store().set("llm", "schema_mode", {"mode": mode, "checkedAt": time.time(), "reason": reason})
+
+
+def _cached_schema_mode() -> Optional[str]:
+    shared = get_store().get("llm", "schema_mode")
+    if shared and (time.time() - shared["checkedAt"]) < LLM_SCHEMA_PROBE_TTL:
+        return shared["mode"]
+    return None
+
+
+async def resolve_schema_mode() -> str:
+    """이번 호출에 쓸 스키마 모드. 서버가 거부했던 기록(저장소)이 설정보다 우선한다.
+    auto면 확인 결과를 쓰고, 아직 없으면 확인한다 (배포 전체 1건 — 다른 워커가 확인 중이면 이번 호출은 off)."""
+    if LLM_SCHEMA_MODE not in SCHEMA_MODES + ("auto",) or LLM_SCHEMA_MODE == "off":
+        return "off"
+    cached = _cached_schema_mode()
+    if cached is not None:
+        return cached
+    if LLM_SCHEMA_MODE != "auto":
+        return LLM_SCHEMA_MODE
+    async with _schema_lock:
+        cached = _cached_schema_mode()
+        if cached is not None:
+            return cached
+        if not acquire_lease("llm-schema-probe", LLM_CHECK_LEASE_SEC):
+            return "off"
+        try:
+            return await _probe_schema_mode()
+        finally:
+            release_lease("llm-schema-probe")
+
+
+async def _post_completion(payload: dict, timeout_sec: int) -> tuple[int, str]:
+    url = f"{LLM_BASE_URL}/chat/completions"
+    if LLM_USE_CURL != "false":
+        code, text = await _curl_request_async("POST", url, _build_auth_headers(), payload, timeout_sec)
+        if code:
+            return code, text
+    try:
+        client = await get_http_client()
+        r = await client.post(url, json=payload, timeout=float(timeout_sec), headers=_build_auth_headers() or None)
+        return r.status_code, r.text
+    except Exception as e:
+        return 0, str(e)
+
+
+async def _probe_schema_mode() -> str:
+    """작은 요청으로 json_schema → guided_json 순서로 시험. 200이고 본문이 JSON 객체인 첫 모드를 쓴다.
+    서버에 닿지 못했으면(연결 실패·5xx) 기록하지 않고 off — 다음 호출이 다시 확인한다."""
+    reasons = []
+    for mode in ("json_schema", "guided_json"):
+        payload = {
+            "model": LLM_MODEL,
+            "messages": [{"role": "user", "content": '다음 JSON만 출력하세요: {"ok": true}'}],
+            "temperature": 0,
+            "max_tokens": 32,
+            **schema_params(_SCHEMA_PROBE, mode, "probe"),
+        }
+        code, text = await _post_completion(payload, 20)
+        if code == 0 or code >= 500:
+            logger.warning(f"스키마 지원 확인 실패 ({mode}): {code} {text[:200]}")
+            return "off"
+        if code == 200:
+            try:
+                if isinstance(_parse_llm_content(_completion_content(json.loads(text), {})), dict):
+                    _publish_schema_mode(mode)
+                    logger.info(f"LLM 응답 스키마 강제 사용: {mode}")
+                    return mode
+            except Exception:
+                pass
+            reasons.append(f"{mode}: JSON이 아닌 응답")
+        else:
+            reasons.append(f"{mode}: status={code} {text[:120]}")
+    reason = "; ".join(reasons)
+    _publish_schema_mode("off", reason)
+    logger.info(f"LLM 서버가 응답 스키마 강제를 지원하지 않음 — 프롬프트 예시만 사용: {reason}")
+    return "off"
+
+
+def _drop_schema_params(payload: dict, stats: dict, detail: str) -> bool:
+    """400 응답이고 스키마 파라미터를 보냈다면 빼고 다시 보내도록 True.
+    스키마 없이 성공하면 call_llm이 배포 전체를 off로 기록한다 (다른 400 — 프롬프트 길이 등 — 과 구분)."""
+    keys = [k for k in ("response_format", "guided_json") if k in payload]
+    if not keys:
+        return False
+    for k in keys:
+        del payload[k]
+    logger.warning(f"LLM 서버가 요청을 거부 ({stats['schema']}) — 스키마 없이 재요청: {detail[:200]}")
+    stats["schema_rejected"] = f"{stats['schema']}: {detail[:120]}"
+    stats["schema"] = "off"
+    return True
+
+
+@profiled("llm_parse")
+def _parse_llm_content(raw_content: str, allow_text_fallback: bool = False, stats: Optional[dict] = None):
+    """LLM 응답에서 JSON을 추출. <think> 태그, 코드블록 처리 포함.
+    stats가 주어지면 stats["parse"]에 json(그대로 파싱) | repaired(잘라내고 파싱) | text(산문 폴백)를 기록."""
     content = raw_content
     if "<think>" in content:
         content = content.split("</think>")[-1]
@@ -233,43 +436,97 @@ def _parse_llm_content(raw_content: str, allow_text_fallback: bool = False):
         content = content.split("```json")[1].split("```")[0]
     elif "```" in content:
         content = content.split("```")[1].split("```")[0]
+    parse = "json" if content.strip() == raw_content.strip() else "repaired"
 
     try:
-        return json.loads(content.strip())
+        result = json.loads(content.strip())
     except json.JSONDecodeError:
         match = re.search(r"\{.*\}", content, re.DOTALL)
         if match:
-            return json.loads(match.group())
-        if allow_text_fallback:
-            text = content.strip()
-            if text:
-                return {"speech": text, "suggestions": [], "quickQueries": []}
+            result, parse = json.loads(match.group()), "repaired"
+        elif allow_text_fallback and content.strip():
+            result, parse = {"speech": content.strip(), "suggestions": [], "quickQueries": []}, "text"
+        else:
+            raise
+    if stats is not None:
+        stats["parse"] = parse
+    return result
+
+
+def _parse_completion(content: str, allow_text_fallback: bool, endpoint: str, stats: dict):
+    """_parse_llm_content + 시도별 파싱 결과 메트릭 (llm_parse_total — 스키마 모드별로 나눠 적용 전후 실패율 비교)."""
+    try:
+        result = _parse_llm_content(content, allow_text_fallback, stats)
+    except Exception:
+        record_llm_parse(endpoint, stats.get("schema"), "failed")
         raise
+    record_llm_parse(endpoint, stats.get("schema"), stats["parse"])
+    return result
 
 
 LLM_GLOBAL_TIMEOUT = int(os.getenv("LLM_GLOBAL_TIMEOUT", "180"))
 
 
 async def call_llm(system_prompt: str, user_message: str, allow_text_fallback: bool = False,
-                   max_tokens: int = 2000, temperature: float = 0.7):
+                   max_tokens: int = 2000, temperature: float = 0.7, endpoint: str = "default"):
+    """LLM 호출. endpoint는 Circuit Breaker 클래스 구분과 메트릭 라벨에 사용.
+    breaker가 열려 있으면 네트워크 호출 없이 즉시 None을 반환한다."""
     global _last_llm_error
+    prompt_chars = len(system_prompt) + len(user_message)
+    # system 템플릿은 레지스트리에 미리 센 값이 있다 — 매 호출 다시 세는 것은 user 메시지뿐
+    prompt_tokens_est = get_prompt_registry().tokens_for(system_prompt) + estimate_tokens(user_message)
+    stats = {"transport": "", "retries": 0, "ttfb": None, "usage": None, "prefix_hit": None, "schema": "off"}
+
     available = await check_llm()
     if not available and USE_MOCK != "false":
+        record_llm_call(endpoint, prompt_chars, prompt_tokens_est, "unavailable", 0.0, stats)
+        return None
+
+    breaker = get_breaker(LLM_BASE_URL, endpoint)
+    if not breaker.allow():
+        _last_llm_error = f"circuit_open:{breaker.name}"
+        record_llm_call(endpoint, prompt_chars, prompt_tokens_est, "circuit_open", 0.0, stats)
         return None
 
+    if get_response_schema(endpoint) is not None:
+        stats["schema"] = await resolve_schema_mode()
+    stats["prefix_hit"] = record_prompt_prefix(endpoint, system_prompt, user_message)
+    result = None
+    outcome = "failure"
+    start_time = time.perf_counter()
     try:
-        return await asyncio.wait_for(
-            _call_llm_inner(system_prompt, user_message, allow_text_fallback, max_tokens, temperature),
+        result = await asyncio.wait_for(
+            _call_llm_inner(system_prompt, user_message, allow_text_fallback, max_tokens, temperature, endpoint, stats),
             timeout=LLM_GLOBAL_TIMEOUT,
         )
     except asyncio.TimeoutError:
+        outcome = "timeout"
         _last_llm_error = f"global_timeout_{LLM_GLOBAL_TIMEOUT}s"
         logger.error(f"LLM 전체 타임아웃 ({LLM_GLOBAL_TIMEOUT}초 초과)")
-        return None
+    except asyncio.CancelledError:
+        breaker.abandon()
+        record_llm_call(endpoint, prompt_chars, prompt_tokens_est, "cancelled",
+                        time.perf_counter() - start_time, stats)
+        raise
+    if result is not None:
+        outcome = "success"
+        if stats.get("schema_rejected"):  # 스키마를 빼니 성공 — 이 서버는 해당 모드를 지원하지 않는다
+            _publish_schema_mode("off", f"rejected {stats['schema_rejected']}")
+    breaker.record(result is not None)
+    record_llm_call(endpoint, prompt_chars, prompt_tokens_est, outcome, time.perf_counter() - start_time, stats)
+    return result
+
+
+def _completion_content(parsed: dict, stats: dict) -> str:
+    """chat/completions 응답에서 본문을 꺼내고 usage를 stats에 기록."""
+    usage = parsed.get("usage")
+    if isinstance(usage, dict):
+        stats["usage"] = usage
+    return parsed["choices"][0]["message"]["content"]
 
 
 async def _call_llm_inner(system_prompt: str, user_message: str, allow_text_fallback: bool,
-                          max_tokens: int, temperature: float):
+                          max_tokens: int, temperature: float, endpoint: str, stats: dict):
     global _last_llm_error
     client = await get_http_client()
     payload = {
@@ -280,23 +537,32 @@ async def _call_llm_inner(system_prompt: str, user_message: str, allow_text_fall
         ],
         "temperature": temperature,
         "max_tokens": max_tokens,
+        **response_format_params(endpoint, stats["schema"]),
     }
     headers = _build_auth_headers()
 
     if LLM_USE_CURL != "false":
-        curl_code, curl_text = _curl_request(
-            method="POST",
-            url=f"{LLM_BASE_URL}/chat/completions",
-            headers=headers or {},
-            body=payload,
-            timeout_sec=70,
-        )
+        stats["transport"] = "curl"
+        curl_timing: dict = {}
+        for _ in range(2):
+            with span("llm_net"):
+                curl_code, curl_text = await _curl_request_async(
+                    method="POST",
+                    url=f"{LLM_BASE_URL}/chat/completions",
+                    headers=headers or {},
+                    body=payload,
+                    timeout_sec=70,
+                    timing=curl_timing,
+                )
+            if not (curl_code == 400 and _drop_schema_params(payload, stats, curl_text)):
+                break
+        stats["ttfb"] = curl_timing.get("ttfb")
         if curl_code == 200:
             try:
                 parsed = json.loads(curl_text)
-                content = parsed["choices"][0]["message"]["content"]
+                content = _completion_content(parsed, stats)
                 _set_llm_connected()
-                return _parse_llm_content(content, allow_text_fallback)
+                return _parse_completion(content, allow_text_fallback, endpoint, stats)
             except Exception as e:
                 logger.error(f"curl 우선 경로 파싱 실패: {e}")
         elif curl_text:
@@ -304,28 +570,41 @@ async def _call_llm_inner(system_prompt: str, user_message: str, allow_text_fall
             logger.warning(f"curl 우선 경로 실패: {curl_code} {curl_text[:200]}")
 
     for attempt in range(3):
+        stats["transport"] = "httpx"
+        if attempt > 0 or LLM_USE_CURL != "false":
+            stats["retries"] += 1
         try:
-            start_time = time.time()
+            start_time = time.perf_counter()
             r = None
             http_error = None
             for h in _build_auth_header_candidates():
                 try:
-                    r = await client.post(f"{LLM_BASE_URL}/chat/completions", json=payload, timeout=60.0, headers=h or None)
+                    request = client.build_request("POST", f"{LLM_BASE_URL}/chat/completions", json=payload,
+                                                   timeout=60.0, headers=h or None)
+                    with span("llm_net"):
+                        r = await client.send(request, stream=True)
+                        stats["ttfb"] = time.perf_counter() - start_time
+                        try:
+                            await r.aread()
+                        finally:
+                            await r.aclose()
                     r.raise_for_status()
                     break
                 except httpx.HTTPStatusError as he:
                     http_error = he
                     _last_llm_error = f"http status={he.response.status_code} body={he.response.text[:200]}"
                     continue
+            if r is not None and r.status_code == 400 and _drop_schema_params(payload, stats, r.text):
+                continue
             if r is None:
                 if http_error:
                     raise http_error
                 raise RuntimeError("LLM request failed without response")
-            content = r.json()["choices"][0]["message"]["content"]
-            elapsed = time.time() - start_time
+            content = _completion_content(r.json(), stats)
+            elapsed = time.perf_counter() - start_time
             logger.info(f"LLM 응답 시간: {elapsed:.2f}초")
             _set_llm_connected()
-            return _parse_llm_content(content, allow_text_fallback)
+            return _parse_completion(content, allow_text_fallback, endpoint, stats)
         except asyncio.TimeoutError:
             wait_time = 2 ** attempt
             _last_llm_error = f"timeout_attempt_{attempt + 1}"
@@ -344,19 +623,25 @@ async def _call_llm_inner(system_prompt: str, user_message: str, allow_text_fall
                 await asyncio.sleep(wait_time)
 
     if LLM_USE_CURL != "false":
-        curl_code, curl_text = _curl_request(
-            method="POST",
-            url=f"{LLM_BASE_URL}/chat/completions",
-            headers=headers or {},
-            body=payload,
-            timeout_sec=70,
-        )
+        stats["transport"] = "curl"
+        stats["retries"] += 1
+        curl_timing = {}
+        with span("llm_net"):
+            curl_code, curl_text = await _curl_request_async(
+                method="POST",
+                url=f"{LLM_BASE_URL}/chat/completions",
+                headers=headers or {},
+                body=payload,
+                timeout_sec=70,
+                timing=curl_timing,
+            )
+        stats["ttfb"] = curl_timing.get("ttfb", stats["ttfb"])
         if curl_code == 200:
             try:
                 parsed = json.loads(curl_text)
-                content = parsed["choices"][0]["message"]["content"]
+                content = _completion_content(parsed, stats)
                 _set_llm_connected()
-                return _parse_llm_content(content, allow_text_fallback)
+                return _parse_completion(content, allow_text_fallback, endpoint, stats)
             except Exception as e:
                 logger.error(f"curl fallback 응답 파싱 실패: {e}")
                 return None
@@ -369,10 +654,8 @@ async def _call_llm_inner(system_prompt: str, user_message: str, allow_text_fall
 
 
 def _set_llm_connected() -> None:
-    global _llm_available, _llm_check_time, _last_llm_error
-    _llm_available = True
-    _llm_check_time = time.time()
-    _last_llm_error = ""
+    if not _llm_available or time.time() - _llm_check_time > 1:  # 연속 성공마다 저장소를 쓰지 않도록
+        _publish_llm_status(True, time.time())
 
 
 def get_llm_debug_status() -> dict:
@@ -382,10 +665,15 @@ def get_llm_debug_status() -> dict:
         "use_mock": USE_MOCK,
         "auth_header": LLM_API_KEY_HEADER,
         "use_curl": LLM_USE_CURL,
+        "schema_mode": {"configured": LLM_SCHEMA_MODE, **(get_store().get("llm", "schema_mode") or {})},
         "last_error": _last_llm_error,
     }
 
 
+def get_circuit_status() -> dict:
+    return get_breaker_status()
+
+
 async def close_http_client() -> None:
     global _http_client
     if _http_client:
@@ -0,0 +1,146 @@
+"""이벤트 루프 지연 모니터 + 블로킹 호출 탐지기
+
+- 루프 안의 틱 태스크: interval마다 깨어나 예정 시각 대비 지연(lag)을 기록하고 heartbeat를 갱신
+- 루프 밖의 watchdog 스레드: heartbeat가 임계값 이상 멈추면 그 순간 루프 스레드의
+  스택을 캡처한다 → 무엇이 루프를 막았는지(동기 curl, 큰 프롬프트 생성 등)를 운영 중에 잡아낸다
+- /api/health의 event_loop 항목으로 지연 분위수와 최근 블로킹 지점을 노출
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as _Counter, deque
+from typing import Optional
+
+try:
+    from .metrics import Counter, Histogram
+except ImportError:
+    from metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() != "false"
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "200"))
+LOOP_MONITOR_WINDOW = int(os.getenv("LOOP_MONITOR_WINDOW", "6000"))  # 샘플 수 (50ms × 6000 ≈ 5분)
+LOOP_BLOCK_STACK_DEPTH = int(os.getenv("LOOP_BLOCK_STACK_DEPTH", "12"))
+
+LOOP_LAG = Histogram("event_loop_lag_seconds", "Event loop scheduling lag",
+                     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+LOOP_BLOCKS = Counter("event_loop_blocks_total", "Event loop stalls longer than the block threshold")
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, int(round((len(ordered) - 1) * p / 100)))
+    return ordered[k]
+
+
+class LoopMonitor:
+    def __init__(self):
+        self._samples: deque = deque(maxlen=LOOP_MONITOR_WINDOW)
+        self._blocks: deque = deque(maxlen=50)
+        self._block_sites: _Counter = _Counter()
+        self._heartbeat = time.monotonic()
+        self._open_block: Optional[dict] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ── 루프 안: 지연 측정 ──
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = LOOP_MONITOR_INTERVAL_MS / 1000
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            self._samples.append(lag)
+            LOOP_LAG.observe(lag)
+            block = self._open_block
+            if block is not None:
+                block["blockedMs"] = round(lag * 1000 + interval * 1000, 1)
+                self._open_block = None
+                logger.warning(f"이벤트 루프 블로킹 {block['blockedMs']}ms @ {block['site']}")
+
+    # ── 루프 밖: 정지 감지 + 스택 캡처 ──
+    def _watch(self) -> None:
+        threshold = LOOP_BLOCK_THRESHOLD_MS / 1000
+        poll = max(0.01, threshold / 4)
+        while not self._stop.wait(poll):
+            stalled = time.monotonic() - self._heartbeat
+            if stalled < threshold + LOOP_MONITOR_INTERVAL_MS / 1000 or self._open_block is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)[-LOOP_BLOCK_STACK_DEPTH:]
+            site = self._blame(stack)
+            block = {
+                "at": round(time.time(), 3),
+                "blockedMs": round(stalled * 1000, 1),  # 루프 복귀 시 최종값으로 갱신
+                "site": site,
+                "stack": [f"{f.filename}:{f.lineno} in {f.name}" for f in stack],
+            }
+            self._open_block = block
+            self._blocks.append(block)
+            self._block_sites[site] += 1
+            LOOP_BLOCKS.inc()
+
+    @staticmethod
+    def _blame(stack) -> str:
+        """스택에서 프로젝트 코드의 가장 안쪽 프레임을 블로킹 지점으로 본다."""
+        here = os.path.dirname(os.path.abspath(__file__))
+        for f in reversed(stack):
+            if os.path.abspath(f.filename).startswith(here):
+                return f"{os.path.basename(f.filename)}:{f.lineno} in {f.name}"
+        f = stack[-1]
+        return f"{os.path.basename(f.filename)}:{f.lineno} in {f.name}"
+
+    def start(self) -> None:
+        if not LOOP_MONITOR_ENABLED or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        ordered = sorted(self._samples)
+        recent = list(self._blocks)[-5:]
+        return {
+            "enabled": LOOP_MONITOR_ENABLED and self._task is not None,
+            "samples": len(ordered),
+            "lag_ms": {
+                "p50": round(_percentile(ordered, 50) * 1000, 2),
+                "p95": round(_percentile(ordered, 95) * 1000, 2),
+                "p99": round(_percentile(ordered, 99) * 1000, 2),
+                "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            },
+            "block_threshold_ms": LOOP_BLOCK_THRESHOLD_MS,
+            "blocks_total": int(LOOP_BLOCKS.value()),
+            "top_block_sites": [{"site": s, "count": n} for s, n in self._block_sites.most_common(5)],
+            "recent_blocks": [{k: v for k, v in b.items() if k != "stack"} | {"stack": b["stack"][-6:]}
+                              for b in reversed(recent)],
+        }
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,199 @@
+"""경량 메트릭 수집 + Prometheus 텍스트 포맷 출력 (/metrics)
+
+외부 의존성 없이 Counter / Gauge / Histogram만 최소 구현한다.
+단일 이벤트 루프에서 갱신되므로 별도 락은 두지 않는다.
+"""
+import json
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+_REGISTRY: list = []
+
+# 초 단위 지연 버킷: 사내 GPU 응답은 수백 ms ~ 수십 초 분포
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120, 180)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+def _fmt_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_value(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        _REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(k, "")) for k in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def label_values(self, label: str) -> list[str]:
+        """기록된 시계열에 나타난 label 값 (정렬, 중복 제거)."""
+        i = self.labelnames.index(label)
+        return sorted({key[i] for key in self._values})
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, list] = {}  # key → [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, series in sorted(self._series.items()):
+            for i, bound in enumerate(self.buckets):
+                le = f'le="{_fmt_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {series[i]}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(round(series[-2], 6))}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 대략적 토큰 추정.
+    영문/숫자는 약 4자당 1토큰, 한글 등 비ASCII는 약 1.5자당 1토큰으로 본다."""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    other_chars = len(text) - ascii_chars
+    return int(math.ceil(ascii_chars / 4 + other_chars / 1.5))
+
+
+# ── LLM 호출 메트릭 ──
+LLM_REQUESTS = Counter("llm_requests_total", "LLM calls by endpoint, transport and outcome",
+                       ("endpoint", "transport", "outcome"))
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Total LLM call latency including retries",
+                        ("endpoint", "transport"))
+LLM_TTFB = Histogram("llm_time_to_first_byte_seconds", "Time until the LLM response headers arrived",
+                     ("endpoint", "transport"))
+LLM_PROMPT_TOKENS_EST = Histogram("llm_prompt_tokens_estimated", "Estimated prompt tokens per call",
+                                  ("endpoint",), buckets=TOKEN_BUCKETS)
+LLM_PROMPT_CHARS = Counter("llm_prompt_chars_total", "Prompt characters sent", ("endpoint",))
+LLM_USAGE_TOKENS = Counter("llm_usage_tokens_total", "Token usage reported by the completion response",
+                           ("endpoint", "kind"))
+LLM_RETRIES = Counter("llm_retries_total", "Retries beyond the first attempt", ("endpoint",))
+LLM_PARSE = Counter("llm_parse_total", "Completion body parse results per attempt (json|repaired|text|failed)",
+                    ("endpoint", "schema", "result"))
+CACHE_REQUESTS = Counter("response_cache_requests_total", "Response cache lookups", ("cache", "result"))
+FALLBACK_RESPONSES = Counter("fallback_responses_total", "Responses served per fallback level",
+                             ("endpoint", "level", "source"))
+
+
+def record_llm_call(endpoint: str, prompt_chars: int, prompt_tokens_est: int, outcome: str,
+                    elapsed: float, stats: dict) -> None:
+    """LLM 1회 호출(재시도 포함)의 결과를 메트릭에 반영하고 구조화 로그를 남긴다."""
+    transport = stats.get("transport") or "none"
+    LLM_REQUESTS.inc(endpoint=endpoint, transport=transport, outcome=outcome)
+    LLM_PROMPT_CHARS.inc(prompt_chars, endpoint=endpoint)
+    LLM_PROMPT_TOKENS_EST.observe(prompt_tokens_est, endpoint=endpoint)
+    if outcome in ("circuit_open", "unavailable"):
+        return
+    LLM_LATENCY.observe(elapsed, endpoint=endpoint, transport=transport)
+    if stats.get("ttfb") is not None:
+        LLM_TTFB.observe(stats["ttfb"], endpoint=endpoint, transport=transport)
+    if stats.get("retries"):
+        LLM_RETRIES.inc(stats["retries"], endpoint=endpoint)
+    usage = stats.get("usage") or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if isinstance(usage.get(kind), (int, float)):
+            LLM_USAGE_TOKENS.inc(usage[kind], endpoint=endpoint, kind=kind)
+    # vLLM/OpenAI가 prefix 캐시 적중 토큰을 알려주면 실측값도 함께 집계
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    if isinstance(cached, (int, float)):
+        LLM_USAGE_TOKENS.inc(cached, endpoint=endpoint, kind="cached_tokens")
+    logger.info("llm_call %s", json.dumps({
+        "endpoint": endpoint,
+        "outcome": outcome,
+        "transport": transport,
+        "prompt_chars": prompt_chars,
+        "prompt_tokens_est": prompt_tokens_est,
+        "usage": usage or None,
+        "ttfb_ms": round(stats["ttfb"] * 1000) if stats.get("ttfb") is not None else None,
+        "total_ms": round(elapsed * 1000),
+        "retries": stats.get("retries", 0),
+        "prefix_hit_est": round(stats["prefix_hit"], 3) if stats.get("prefix_hit") is not None else None,
+    }, ensure_ascii=False))
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_llm_parse(endpoint: str, schema: str, result: str) -> None:
+    LLM_PARSE.inc(endpoint=endpoint, schema=schema or "off", result=result)
+
+
+def record_fallback(endpoint: str, level: int, source: str) -> None:
+    FALLBACK_RESPONSES.inc(endpoint=endpoint, level=level, source=source)
@@ -0,0 +1,135 @@
+"""요청 단위 구간(stage) 타이밍 — Server-Timing 헤더 + 느린 요청 링 버퍼
+
+- span("이름") 컨텍스트 매니저 / @profiled("이름") 데코레이터로 구간을 잰다.
+- 요청이 없는 곳(CLI, 백그라운드 작업)에서는 contextvar가 비어 있어 아무 비용 없이 통과한다.
+- ServerTimingMiddleware가 요청마다 기록기를 만들고 응답 헤더에 구간별 합계를 붙인다.
+"""
+import asyncio
+import functools
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "true").lower() != "false"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "1000"))
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "200"))
+
+
+class RequestTiming:
+    __slots__ = ("method", "path", "started_at", "start", "stages", "total_ms", "status")
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.stages: dict[str, list] = {}  # name → [합계 ms, 횟수]
+        self.total_ms = 0.0
+        self.status = 0
+
+    def add(self, name: str, ms: float) -> None:
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [ms, 1]
+        else:
+            entry[0] += ms
+            entry[1] += 1
+
+    def server_timing(self) -> str:
+        parts = [f"{name};dur={ms:.1f}" for name, (ms, _) in self.stages.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "startedAt": round(self.started_at, 3),
+            "totalMs": round(self.total_ms, 1),
+            "stages": {name: {"ms": round(ms, 1), "count": n} for name, (ms, n) in self.stages.items()},
+        }
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+_recent: deque = deque(maxlen=PROFILE_RING_SIZE)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, (time.perf_counter() - t0) * 1000)
+
+
+def profiled(name: str):
+    """함수 전체를 하나의 stage로 측정하는 데코레이터 (sync/async 모두 지원)."""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _keep(timing: RequestTiming) -> None:
+    if timing.total_ms >= PROFILE_SLOW_MS or random.random() < PROFILE_SAMPLE_RATE:
+        _recent.append(timing)
+
+
+def get_slow_requests(limit: int = 20) -> list[dict]:
+    ranked = sorted(_recent, key=lambda t: t.total_ms, reverse=True)
+    return [t.to_dict() for t in ranked[:limit]]
+
+
+class ServerTimingMiddleware:
+    """순수 ASGI 미들웨어: 요청별 RequestTiming을 열고 Server-Timing 헤더를 붙인다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(scope.get("method", ""), scope.get("path", ""))
+        token = _current.set(timing)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing.status = message.get("status", 0)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            timing.total_ms = (time.perf_counter() - timing.start) * 1000
+            _current.reset(token)
+            _keep(timing)
@@ -0,0 +1,110 @@
+"""프롬프트 조립기 — 업스트림(vLLM) prefix 캐시 재사용을 위한 섹션 배치
+
+vLLM의 automatic prefix caching은 "앞에서부터 똑같은" 토큰 블록만 재사용한다.
+그래서 user 메시지도 변하지 않는 것부터 자주 바뀌는 것 순으로 배치한다.
+
+    system 템플릿(엔드포인트별 고정) → L345 참조(현재 L4 줄의 "← 현재" 표시 전까지 고정) → 프로세스 컨텍스트
+    → 플로우 설명 → 대화 기록 → 질문
+
+PrefixCacheEstimator는 서버 쪽 블록 캐시를 흉내 내 prefix 적중률을 추정한다.
+(실제 적중 여부는 응답 usage.prompt_tokens_details.cached_tokens가 있을 때 그 값을 함께 본다)
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+try:
+    from .metrics import Counter
+except ImportError:
+    from metrics import Counter
+
+PROMPT_PREFIX_BLOCK_CHARS = int(os.getenv("PROMPT_PREFIX_BLOCK_CHARS", "64"))
+PROMPT_PREFIX_CACHE_BLOCKS = int(os.getenv("PROMPT_PREFIX_CACHE_BLOCKS", "50000"))
+
+# 정적 → 휘발 순서. 같은 순위 안에서는 추가한 순서를 유지한다.
+SECTION_ORDER = ("reference", "context", "flow", "history", "question")
+
+PROMPT_PREFIX_CHARS = Counter("llm_prompt_prefix_chars_total",
+                              "Prompt characters whose prefix block was (estimated) already cached upstream",
+                              ("endpoint", "result"))
+
+
+def assemble_prompt(reference: str = "", context: str = "", flow: str = "", history: str = "",
+                    question: str = "") -> str:
+    """user 메시지를 정적 → 휘발 순으로 조립한다. 빈 섹션은 건너뛴다."""
+    sections = {"reference": reference, "context": context, "flow": flow, "history": history,
+                "question": question}
+    parts = [sections[name].strip("\n") for name in SECTION_ORDER if sections[name] and sections[name].strip()]
+    return "\n\n".join(parts)
+
+
+class PrefixCacheEstimator:
+    """블록 단위 연쇄 해시로 업스트림 prefix 캐시를 근사한다.
+
+    프롬프트를 고정 길이 블록으로 자르고, 블록 i의 해시는 (블록 i-1의 해시 + 블록 i 내용)으로 만든다.
+    앞에서부터 이미 본 해시가 이어지는 만큼을 캐시 적중으로 본다 (LRU, 용량 제한).
+    """
+
+    def __init__(self, block_chars: int = PROMPT_PREFIX_BLOCK_CHARS, capacity: int = PROMPT_PREFIX_CACHE_BLOCKS):
+        self.block_chars = max(1, block_chars)
+        self.capacity = capacity
+        self._blocks: OrderedDict[bytes, None] = OrderedDict()
+
+    @property
+    def tracked_blocks(self) -> int:
+        return len(self._blocks)
+
+    def observe(self, text: str) -> int:
+        """text를 보낸 것으로 기록하고, 이미 캐시되어 있었을 prefix 문자 수를 반환."""
+        prev = b""
+        hit_chars = 0
+        matching = True
+        for i in range(0, len(text), self.block_chars):
+            block = text[i:i + self.block_chars]
+            if len(block) < self.block_chars:
+                break  # 꽉 차지 않은 마지막 블록은 캐시되지 않는다
+            digest = hashlib.blake2b(prev + block.encode("utf-8"), digest_size=8).digest()
+            if matching and digest in self._blocks:
+                self._blocks.move_to_end(digest)
+                hit_chars += len(block)
+            else:
+                matching = False
+                self._blocks[digest] = None
+                if len(self._blocks) > self.capacity:
+                    self._blocks.popitem(last=False)
+            prev = digest
+        return hit_chars
+
+
+_estimator = PrefixCacheEstimator()
+
+
+def record_prompt_prefix(endpoint: str, system_prompt: str, user_message: str) -> float:
+    """실제로 전송되는 프롬프트의 prefix 적중률(0~1) 추정치를 기록하고 반환."""
+    text = f"{system_prompt}\n{user_message}"
+    if not text:
+        return 0.0
+    hit = _estimator.observe(text)
+    PROMPT_PREFIX_CHARS.inc(hit, endpoint=endpoint, result="hit")
+    PROMPT_PREFIX_CHARS.inc(len(text) - hit, endpoint=endpoint, result="miss")
+    return hit / len(text)
+
+
+def get_prefix_cache_status() -> dict:
+    """엔드포인트별 누적 prefix 적중률 추정치."""
+    endpoints = PROMPT_PREFIX_CHARS.label_values("endpoint")
+    by_endpoint = {}
+    total_hit = total_all = 0.0
+    for ep in endpoints:
+        hit = PROMPT_PREFIX_CHARS.value(endpoint=ep, result="hit")
+        miss = PROMPT_PREFIX_CHARS.value(endpoint=ep, result="miss")
+        by_endpoint[ep] = {"hit_rate": round(hit / (hit + miss), 3) if hit + miss else 0.0,
+                           "prompt_chars": int(hit + miss)}
+        total_hit += hit
+        total_all += hit + miss
+    return {
+        "block_chars": _estimator.block_chars,
+        "tracked_blocks": _estimator.tracked_blocks,
+        "hit_rate": round(total_hit / total_all, 3) if total_all else 0.0,
+        "endpoints": by_endpoint,
+    }
@@ -0,0 +1,148 @@
+"""프롬프트 템플릿 레지스트리 — 이름, 내용 해시(버전), 미리 계산한 토큰 추정치
+
+prompt_templates.py의 상수는 모듈 로드 시 한 번 조립되는 f-string이라 크기·버전을 추적하는 곳이 없었다.
+레지스트리는 대문자 문자열 상수를 모두 등록하고(블록 상수 포함), 엔드포인트별로 어떤 system 템플릿을 쓰는지 기록한다.
+문자열 dict 상수(BRANCHING_BY_L3 등)는 "키\n값" 줄을 정의 순서대로 이은 텍스트로 등록한다.
+
+- version: 내용의 blake2b 해시 앞 12자리. 템플릿 문구가 바뀌면 값이 바뀐다
+- cache_version(endpoint): 엔드포인트가 쓰는 템플릿·참조 데이터 버전들을 합친 해시 — 응답 캐시 키 앞에 붙여
+  템플릿을 고치면 그 템플릿으로 만든 캐시 항목만 더 이상 적중하지 않게 한다 (남은 항목은 TTL로 사라진다)
+- tokens_for(text): call_llm이 매 호출 system 프롬프트 토큰을 다시 세지 않도록 등록된 템플릿은 미리 센 값을 돌려준다
+- 상태는 /api/debug/prompts, 템플릿별 토큰은 /metrics의 prompt_template_tokens
+"""
+import hashlib
+from typing import Optional
+
+try:
+    from . import prompt_templates
+    from .metrics import Gauge, estimate_tokens
+except ImportError:
+    import prompt_templates
+    from metrics import Gauge, estimate_tokens
+
+PROMPT_TEMPLATE_TOKENS = Gauge("prompt_template_tokens", "Estimated tokens of each registered prompt template", ("template",))
+
+# 엔드포인트 → LLM system 프롬프트로 쓰는 템플릿 (call_llm의 endpoint 라벨 기준).
+# chat은 의도에 따라 COACH_TEMPLATE 또는 KNOWLEDGE_PROMPT(chat_orchestrator)를 쓰므로 캐시용으로 둘을 나눈다.
+ENDPOINT_TEMPLATES: dict[str, tuple[str, ...]] = {
+    "review": ("REVIEW_SYSTEM",),
+    "chat": ("COACH_TEMPLATE", "KNOWLEDGE_PROMPT"),
+    "chat-coach": ("COACH_TEMPLATE",),
+    "chat-knowledge": ("KNOWLEDGE_PROMPT",),
+    "flow-overview": ("FLOW_OVERVIEW_SYSTEM",),
+    "interview-start": ("FLOW_OVERVIEW_SYSTEM",),
+    "contextual-suggest": ("CONTEXTUAL_SUGGEST_SYSTEM",),
+    "first-shape-welcome": ("FIRST_SHAPE_SYSTEM",),
+    "analyze-pdd": ("PDD_ANALYSIS",),
+    "pdd-insights": ("PDD_INSIGHTS_SYSTEM",),
+    "categorize-nodes": ("CATEGORIZE_PROMPT",),
+    "suggest-phases": ("SUGGEST_PHASES_SYSTEM",),
+}
+
+# 엔드포인트 → system 템플릿은 아니지만 user 메시지 참조 블록에 들어가 답변을 바꾸는 데이터.
+# l345_reference가 BRANCHING_BY_L3에서 현재 L3/L4의 분기점 예시를 골라 review/chat 참조 블록에 붙인다.
+ENDPOINT_REFERENCES: dict[str, tuple[str, ...]] = {
+    "review": ("BRANCHING_BY_L3",),
+    "chat": ("BRANCHING_BY_L3",),
+    "chat-coach": ("BRANCHING_BY_L3",),
+    "chat-knowledge": ("BRANCHING_BY_L3",),
+}
+
+
+class PromptTemplate:
+    __slots__ = ("name", "text", "version", "tokens", "chars")
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        self.version = hashlib.blake2b(text.encode("utf-8"), digest_size=6).hexdigest()
+        self.tokens = estimate_tokens(text)
+        self.chars = len(text)
+
+    def info(self) -> dict:
+        return {"name": self.name, "version": self.version, "tokens": self.tokens, "chars": self.chars}
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._by_name: dict[str, PromptTemplate] = {}
+        self._by_text: dict[str, PromptTemplate] = {}
+        self._endpoints: dict[str, tuple[str, ...]] = {}
+        self._references: dict[str, tuple[str, ...]] = {}
+
+    def register(self, name: str, text: str, endpoints: tuple[str, ...] = (),
+                 references: tuple[str, ...] = ()) -> PromptTemplate:
+        """같은 이름으로 다시 등록하면 교체. endpoints를 주면 그 엔드포인트가 이 템플릿을 system 프롬프트로,
+        references를 주면 user 메시지 참조 데이터로 쓰는 것으로 기록 (둘 다 cache_version에 들어간다)."""
+        old = self._by_name.get(name)
+        if old is not None and self._by_text.get(old.text) is old:
+            del self._by_text[old.text]
+        tpl = self._by_name[name] = PromptTemplate(name, text)
+        self._by_text.setdefault(text, tpl)
+        for target, used in ((self._endpoints, endpoints), (self._references, references)):
+            for endpoint in used:
+                names = target.get(endpoint, ())
+                if name not in names:
+                    target[endpoint] = names + (name,)
+        PROMPT_TEMPLATE_TOKENS.set(tpl.tokens, template=name)
+        return tpl
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        return self._by_name.get(name)
+
+    def tokens_for(self, text: str) -> int:
+        """등록된 템플릿이면 미리 센 토큰 수, 아니면 그 자리에서 추정."""
+        tpl = self._by_text.get(text)
+        return tpl.tokens if tpl is not None else estimate_tokens(text)
+
+    def cache_version(self, endpoint: str) -> str:
+        """엔드포인트가 쓰는 템플릿 버전의 합성 해시 (응답 캐시 키 접두사). 모르는 엔드포인트면 "" (키 그대로)."""
+        names = self._endpoints.get(endpoint, ()) + self._references.get(endpoint, ())
+        if not names:
+            return ""
+        joined = "|".join(f"{n}={self._by_name[n].version}" for n in names if n in self._by_name)
+        return hashlib.blake2b(joined.encode("utf-8"), digest_size=4).hexdigest()
+
+    def status(self) -> dict:
+        templates = sorted((t.info() for t in self._by_name.values()), key=lambda t: -t["tokens"])
+        endpoints = {}
+        for endpoint, names in sorted(self._endpoints.items()):
+            tpls = [self._by_name[n] for n in names if n in self._by_name]
+            endpoints[endpoint] = {"templates": [t.name for t in tpls], "tokens": max((t.tokens for t in tpls), default=0),
+                                   "references": [n for n in self._references.get(endpoint, ()) if n in self._by_name],
+                                   "cacheVersion": self.cache_version(endpoint)}
+        return {"templates": templates, "endpoints": endpoints}
+
+
+def _dict_text(value: dict) -> Optional[str]:
+    """{str: str} 상수 → 등록용 텍스트. 다른 형태의 dict면 None (등록하지 않음)."""
+    if not all(isinstance(k, str) and isinstance(v, str) for k, v in value.items()):
+        return None
+    return "\n".join(f"{k}\n{v}" for k, v in value.items())
+
+
+def _build_registry() -> PromptRegistry:
+    registry = PromptRegistry()
+    used_by: dict[str, list[str]] = {}
+    referenced_by: dict[str, list[str]] = {}
+    for mapping, target in ((ENDPOINT_TEMPLATES, used_by), (ENDPOINT_REFERENCES, referenced_by)):
+        for endpoint, names in mapping.items():
+            for name in names:
+                target.setdefault(name, []).append(endpoint)
+    for name, value in vars(prompt_templates).items():
+        if not name.isupper():
+            continue
+        text = value if isinstance(value, str) else _dict_text(value) if isinstance(value, dict) else None
+        if text is not None:
+            registry.register(name, text, tuple(used_by.get(name, ())), tuple(referenced_by.get(name, ())))
+    return registry
+
+
+_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    global _registry
+    if _registry is None:
+        _registry = _build_registry()
+    return _registry
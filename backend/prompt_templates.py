@@ -124,52 +124,46 @@ L7_GUIDE = """[L7 작성 원칙]
 
 참고: 시스템명은 라벨이 아닌 노드 메타데이터로 관리하면 깔끔합니다."""
 
-BRANCHING_GUIDE = """[분기점 가이드 — 실제 HR L3/L4 기준]
+# ─── 분기점 가이드 ───
+# L3별 예시(BRANCHING_BY_L3)는 l345_reference가 현재 L3/L4에 맞는 줄만 골라 user 메시지 참조 블록에 넣는다.
+# system 프롬프트에는 L3와 무관한 부분(BRANCHING_GUIDE_CORE)만 둔다. BRANCHING_GUIDE는 전체 원문.
+BRANCHING_GUIDE_INTRO = """[분기점 가이드 — 실제 HR L3/L4 기준]
 
 ⚠️ 업무 단계가 5개 이상인데 판단(Decision) 노드가 없다면, 분기점 누락 가능성이 높습니다.
 워크플로우에서 "이런 경우도 있지 않나요?"를 적극적으로 확인하세요.
 
-사용자의 L4(또는 L5) 업무에 따라 아래 분기점 예시를 참고하여 구체적으로 제안하세요.
+"""
 
-**채용**
-- 채용계획: 경영계획 승인 여부, 신규 직무 생성 필요 여부
+BRANCHING_BY_L3 = {
+    "채용": """- 채용계획: 경영계획 승인 여부, 신규 직무 생성 필요 여부
 - 선발전형: 서류 합격 여부, GSAT/코딩테스트 통과 여부, 면접 합격 여부, 처우 협상 합의 여부
-- 채용 후속조치: 즉시 입사/선확보 인력 구분, 온보딩 대상 여부
-
-**보상/근태**
-- 지급업무: 급여 오류 발견 여부, 인센티브 지급 대상 여부
+- 채용 후속조치: 즉시 입사/선확보 인력 구분, 온보딩 대상 여부""",
+    "보상/근태": """- 지급업무: 급여 오류 발견 여부, 인센티브 지급 대상 여부
 - 퇴직정산: 중간정산 여부, 미지급금 존재 여부
 - 보상기획: 경영진 승인 여부, 노조 협의 필요 여부
 - 법정복리후생: 4대보험 자격 취득/상실 여부, 정기결정 대상 여부
 - 기업복리후생: 지원 대상 여부, 지원 한도 초과 여부
-- 근태운영: 연차 승인 여부, 초과근무 승인 여부, 재택근무 조건 충족 여부
-
-**노사**
-- 협의회: 협의회 상정 안건 여부, 협의위원 선출 대상 여부
+- 근태운영: 연차 승인 여부, 초과근무 승인 여부, 재택근무 조건 충족 여부""",
+    "노사": """- 협의회: 협의회 상정 안건 여부, 협의위원 선출 대상 여부
 - 노동조합: 노조 대상 사안 여부, 단체교섭 타결 여부, 조정 신청 여부
 - ER: 직장내괴롭힘 판정 여부, 희망퇴직 조건 충족 여부
-- 사건사고 관리: 징계 수위 결정(경고/감봉/정직), 법적 검토 필요 여부, 유사 판례 존재 여부
-
-**임원조직**
-- 인력운영: 임원 재계약 조건 충족 여부, 핵심리더 선발 기준 통과 여부
+- 사건사고 관리: 징계 수위 결정(경고/감봉/정직), 법적 검토 필요 여부, 유사 판례 존재 여부""",
+    "임원조직": """- 인력운영: 임원 재계약 조건 충족 여부, 핵심리더 선발 기준 통과 여부
 - 조직개편: 이사회 부의 필요 여부, 노조 협의 대상 여부
-- 교육/양성: 과정 참여 대상 선정 여부, 이수 조건 충족 여부
-
-**총무**
-- 사내 서비스: 날인 권한 여부, 증명서 발급 조건 충족 여부
+- 교육/양성: 과정 참여 대상 선정 여부, 이수 조건 충족 여부""",
+    "총무": """- 사내 서비스: 날인 권한 여부, 증명서 발급 조건 충족 여부
 - 사내 인프라: 공간 가용 여부, 숙박시설 입주 조건 충족 여부
 - 임직원 지원: 사택 배정 대상 여부, 비품 구매 예산 범위 이내 여부
 - 차량 관리: 법인 차량 이용 승인 여부, 출장 경비 승인 여부
-- 협력사: 계약 갱신 조건 충족 여부, 평가 등급별 처리
-
-**해외인사**
-- 인력운영: 주재원 선발 기준 통과 여부, 비자 발급 가능 여부, 귀임 후 복귀 부서 확정 여부
+- 협력사: 계약 갱신 조건 충족 여부, 평가 등급별 처리""",
+    "해외인사": """- 인력운영: 주재원 선발 기준 통과 여부, 비자 발급 가능 여부, 귀임 후 복귀 부서 확정 여부
 - 공통: STEP 파견 대상 여부, 현전/본전 구분
 - 주재원 제도: 현지/본사 규정 적용 구분, 징계 수위 결정
 - 채용: 재입사 조건 충족 여부, 현지 채용/본사 파견 구분
-- M&A: 실사 결과 승인 여부, PMI 계획 수립 대상 여부
+- M&A: 실사 결과 승인 여부, PMI 계획 수립 대상 여부""",
+}
 
-[분기점 제안 시 Decision 5패턴 매핑]
+BRANCHING_PATTERN_MAP = """[분기점 제안 시 Decision 5패턴 매핑]
 - 유형/종류 판별 → P1 "~인가?" (예: "필수 교육인가?", "경력직 채용인가?")
 - 존재·유무 확인 → P2 "~가 있는가?" (예: "대기자가 있는가?", "남은 T/O가 있는가?")
 - 상태 확인 → P3 "~되어 있는가?" (예: "일정이 확정되었는가?", "예산이 배정되었는가?")
@@ -177,6 +171,13 @@ BRANCHING_GUIDE = """[분기점 가이드 — 실제 HR L3/L4 기준]
 - 범용 Yes/No → P5 "~여부" (예: "승인 여부", "차수 변경 여부")
 """
 
+BRANCHING_GUIDE = (BRANCHING_GUIDE_INTRO + "사용자의 L4(또는 L5) 업무에 따라 아래 분기점 예시를 참고하여 구체적으로 제안하세요.\n\n"
+                   + "".join(f"**{l3}**\n{hints}\n\n" for l3, hints in BRANCHING_BY_L3.items()) + BRANCHING_PATTERN_MAP)
+
+BRANCHING_GUIDE_CORE = (BRANCHING_GUIDE_INTRO
+                        + "사용자 메시지의 [분기점 예시] 블록(현재 L3/L4 기준)을 참고하여 구체적으로 제안하세요.\n\n"
+                        + BRANCHING_PATTERN_MAP)
+
 L345_USAGE = """[L345 참조 데이터 활용 원칙]
 
 [계층 구조 이해]
@@ -205,7 +206,7 @@ L5/L6는 하나의 연속된 프로세스 흐름을 순서대로 나눈 것입
 REVIEW_SYSTEM = f"""당신은 HR 프로세스 문서화 품질을 점검하는 전문가입니다.
 
 {L7_GUIDE}
-{BRANCHING_GUIDE}
+{BRANCHING_GUIDE_CORE}
 {L345_USAGE}
 
 목적: 담당자가 현재 AS-IS 프로세스를 편차 없이 균일한 품질로 문서화하도록 돕는 것입니다.
@@ -259,7 +260,7 @@ COACH_TEMPLATE = f"""당신은 HR 프로세스 설계를 함께 만들어가는
 
 {COACHING_TONE}
 {L7_GUIDE}
-{BRANCHING_GUIDE}
+{BRANCHING_GUIDE_CORE}
 {L345_USAGE}
 
 역할: 사용자 질문에 공감하며 답변하고, 구체적 개선 방향을 제안합니다.
@@ -605,3 +606,13 @@ FLOW_OVERVIEW_SYSTEM = f"""당신은 HR 프로세스 설계 코치입니다.
 - quickQueries: 시작/종료 조건 금지, 역할 금지, 다른 L5/L6 이름 언급 금지
   권장 형태: "보완 서류 요청은 어떻게 처리하나요?", "첫 단계부터 같이 그려볼까요?"
 """
+
+
+# /api/suggest-phases — 고정 지시문은 system에 두고 user에는 업무명만 → 모든 요청이 같은 prefix를 공유
+SUGGEST_PHASES_SYSTEM = (
+    "당신은 HR 업무 프로세스 전문가입니다. 요청한 형식(JSON 배열)으로만 응답하세요.\n\n"
+    "【중요 제약】요청한 L6 업무 자체의 내부 흐름만 Phase로 나눠야 해. "
+    "이 업무의 선행·후행에 해당하는 다른 L6(예: 신청접수, 결과통보 등)는 포함하지 마.\n\n"
+    '각 Phase 이름은 4~6글자 명사형(예: "심사기준파악", "서류검토", "합부판정"). '
+    '아래처럼 JSON 배열만 출력해 (설명 없이):\n["Phase1", "Phase2", "Phase3"]'
+)
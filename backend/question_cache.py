@@ -0,0 +1,197 @@
+"""지식 질문 유사 중복 캐시 — 문자 n-gram MinHash/LSH (임베딩 서비스 없이 CPU만)
+
+"L7이 뭐야?", "L7이란?", "L7 뜻 알려줘"처럼 표현만 다른 지식 질문은 사용자마다 반복되고,
+/api/chat의 knowledge 의도는 플로우를 노드 수만 보내므로 답이 플로우에 거의 좌우되지 않는다.
+정규화한 질문 텍스트가 충분히 비슷하면 LLM 답변을 캐시에서 돌려준다.
+
+- 정규화: NFKC + 소문자, 공백·문장부호 제거, 끝의 질문 어구("이란", "뭐야", "알려줘" 등) 제거
+- 유사도: 문자 2-gram 집합의 Jaccard. MinHash 서명(QUESTION_CACHE_PERM개)을 밴드로 나눈 LSH 버킷으로
+  후보만 고른 뒤, 저장해 둔 n-gram 집합으로 정확한 Jaccard를 계산해 QUESTION_CACHE_THRESHOLD 이상이면 적중
+- 범위: L3 단위 (같은 질문도 L3 참조 블록이 다르면 답이 다를 수 있다). 앞선 대화를 가리키는 후속 질문은 제외
+- 기본 임계값 0.8은 보수적으로 잡았다 — "승인/반려 노드 라벨은 어떻게 쓰나요"처럼 한 단어만 다른 질문이 0.7 안팎이다
+- 범위 앞에 답변을 만든 템플릿 버전(prompt_registry.cache_version)을 붙여, 템플릿이 바뀌면 이전 답변은 적중하지 않는다
+- 항목·버킷은 shared_state 저장소(qcache / qcache-lsh)에 TTL로 두어 워커 간 공유된다.
+  해시는 프로세스마다 달라지는 hash() 대신 blake2b, 순열 계수는 고정 시드로 만든다.
+"""
+import hashlib
+import logging
+import os
+import random
+import re
+import unicodedata
+from typing import Any, Optional
+
+try:
+    from .metrics import Counter, Histogram, record_cache
+    from .prompt_registry import get_prompt_registry
+    from .shared_state import get_store
+except ImportError:
+    from metrics import Counter, Histogram, record_cache
+    from prompt_registry import get_prompt_registry
+    from shared_state import get_store
+
+logger = logging.getLogger(__name__)
+
+QUESTION_CACHE_ENABLED = os.getenv("QUESTION_CACHE_ENABLED", "true").lower() == "true"
+QUESTION_CACHE_THRESHOLD = float(os.getenv("QUESTION_CACHE_THRESHOLD", "0.8"))
+QUESTION_CACHE_TTL = int(os.getenv("QUESTION_CACHE_TTL", "86400"))
+QUESTION_CACHE_MAXSIZE = int(os.getenv("QUESTION_CACHE_MAXSIZE", "2000"))
+QUESTION_CACHE_PERM = int(os.getenv("QUESTION_CACHE_PERM", "64"))
+QUESTION_CACHE_BANDS = int(os.getenv("QUESTION_CACHE_BANDS", "16"))
+
+QUESTION_CACHE_MATCHES = Counter("question_cache_matches_total", "Near-duplicate question cache hits by match kind",
+                                 ("cache", "match"))
+QUESTION_CACHE_SIMILARITY = Histogram("question_cache_similarity", "Jaccard similarity of the best candidate per lookup",
+                                      ("cache",), buckets=(0.2, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0))
+
+_NGRAM = 2
+_MERSENNE = (1 << 61) - 1
+_BUCKET_CAP = 16  # 버킷당 보관할 항목 ID 수 (최근 것부터)
+
+# 질문 끝에 붙는 어구 — 긴 것부터 반복 제거 ("L7이 뭔지 알려줘" → "l7").
+# 조사는 뒤따르는 어구와 붙은 형태로만 뗀다 ("인사평가란"의 "가"를 지우지 않도록). "란/이란"은 조사 없이.
+_ASK_TAILS = ("무엇인가요", "무엇인가", "무엇이야", "무엇", "뭐예요", "뭐에요", "뭐야", "뭔가요", "뭔지", "의미", "뜻")
+_PLAIN_TAILS = ("란", "이란", "알려줘", "알려주세요", "알려줄래", "설명해줘", "설명해주세요", "설명해줄래",
+                "궁금해", "궁금해요", "궁금합니다", "에대해", "에대해서", "의의미", "의뜻")
+_QUESTION_TAILS = sorted({p + t for p in ("", "이", "가", "은", "는") for t in _ASK_TAILS} | set(_PLAIN_TAILS),
+                         key=len, reverse=True)
+_STRIP = re.compile(r"[\W_]+", re.UNICODE)
+# 앞선 대화를 가리키는 후속 질문("그건 왜요?", "방금 말한 거")은 답이 대화에 좌우되므로 캐시하지 않는다
+_FOLLOW_UP = re.compile(r"^\s*(그|이|저)(거|건|게|걸|럼|런|래|렇)|방금|아까|위에서|앞에서|말씀하신|말한")
+
+
+def normalize_question(text: str) -> str:
+    """비교용 정규형: 공백·부호 없는 소문자 + 끝의 질문 어구 제거. 전부 어구뿐이면 어구 제거 전 값."""
+    core = _STRIP.sub("", unicodedata.normalize("NFKC", text).lower())
+    full = core
+    changed = True
+    while changed and core:
+        changed = False
+        for tail in _QUESTION_TAILS:
+            if core.endswith(tail) and len(core) > len(tail):
+                core = core[: -len(tail)]
+                changed = True
+                break
+    return core or full
+
+
+def cacheable(question: str) -> bool:
+    return not _FOLLOW_UP.search(question)
+
+
+def shingles(norm: str) -> set[str]:
+    if len(norm) <= _NGRAM:
+        return {norm} if norm else set()
+    return {norm[i:i + _NGRAM] for i in range(len(norm) - _NGRAM + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _h64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class QuestionCache:
+    """L3 범위별 유사 질문 → 응답 캐시."""
+
+    def __init__(self, name: str, threshold: float = QUESTION_CACHE_THRESHOLD, ttl: float = QUESTION_CACHE_TTL,
+                 maxsize: int = QUESTION_CACHE_MAXSIZE, num_perm: int = QUESTION_CACHE_PERM, bands: int = QUESTION_CACHE_BANDS,
+                 version: str = ""):
+        if num_perm % bands:
+            raise ValueError(f"QUESTION_CACHE_PERM({num_perm})은 QUESTION_CACHE_BANDS({bands})의 배수여야 합니다")
+        self.name = name
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.version = version
+        rng = random.Random(0x5EED)  # 워커 간 같은 서명이 나오도록 고정 시드
+        self._perms = [(rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(num_perm)]
+        self._ns = f"qcache:{name}"
+        self._ns_lsh = f"qcache-lsh:{name}"
+        self._store = get_store()
+
+    def signature(self, grams: set[str]) -> list[int]:
+        hashed = [_h64(g) for g in grams]
+        return [min((a * h + b) % _MERSENNE for h in hashed) for a, b in self._perms]
+
+    def _scope(self, scope: str) -> str:
+        return f"{self.version}/{scope}" if self.version else scope
+
+    def _band_keys(self, scope: str, sig: list[int]) -> list[str]:
+        r = self.rows
+        return [f"{scope}|{i}|{hashlib.blake2b(repr(sig[i * r:(i + 1) * r]).encode(), digest_size=8).hexdigest()}"
+                for i in range(self.bands)]
+
+    def lookup(self, scope: str, question: str) -> Optional[tuple[Any, float]]:
+        """(캐시된 값, 유사도) 또는 None. 정규형이 같으면 서명 계산 없이 바로 적중."""
+        norm = normalize_question(question)
+        if not norm or not cacheable(question):
+            return None
+        scope = self._scope(scope)
+        entry = self._store.get(self._ns, f"{scope}|{norm}")
+        if entry is not None:
+            record_cache(self.name, True)
+            QUESTION_CACHE_MATCHES.inc(cache=self.name, match="exact")
+            QUESTION_CACHE_SIMILARITY.observe(1.0, cache=self.name)
+            return entry["value"], 1.0
+
+        grams = shingles(norm)
+        candidates = dict.fromkeys(k for key in self._band_keys(scope, self.signature(grams))
+                                   for k in self._store.get(self._ns_lsh, key) or ())
+        best, best_sim = None, 0.0
+        for key in candidates:
+            cand = self._store.get(self._ns, key)
+            if cand is None:  # 만료/제거된 항목이 버킷에 남은 경우
+                continue
+            sim = jaccard(grams, set(cand["grams"]))
+            if sim > best_sim:
+                best, best_sim = cand, sim
+        if candidates:
+            QUESTION_CACHE_SIMILARITY.observe(best_sim, cache=self.name)
+        hit = best is not None and best_sim >= self.threshold
+        record_cache(self.name, hit)
+        if not hit:
+            return None
+        QUESTION_CACHE_MATCHES.inc(cache=self.name, match="near")
+        logger.debug(f"유사 질문 캐시 적중 ({best_sim:.2f}): '{question}' ≈ '{best['question']}'")
+        return best["value"], best_sim
+
+    def store(self, scope: str, question: str, value: Any) -> None:
+        norm = normalize_question(question)
+        if not norm or not cacheable(question):
+            return
+        scope = self._scope(scope)
+        grams = shingles(norm)
+        key = f"{scope}|{norm}"
+        self._store.set(self._ns, key, {"question": question, "grams": sorted(grams), "value": value}, ttl=self.ttl)
+        self._store.trim(self._ns, self.maxsize)
+
+        def add(ids):
+            ids = [k for k in (ids or []) if k != key]
+            return (ids + [key])[-_BUCKET_CAP:], None
+        for band_key in self._band_keys(scope, self.signature(grams)):
+            self._store.update(self._ns_lsh, band_key, add, ttl=self.ttl)
+        self._store.trim(self._ns_lsh, self.maxsize * self.bands)
+
+    def status(self) -> dict:
+        return {"entries": self._store.count(self._ns), "threshold": self.threshold, "ttl": self.ttl,
+                "bands": self.bands, "rows": self.rows, "version": self.version}
+
+
+_knowledge_cache: Optional[QuestionCache] = None
+
+
+def get_knowledge_cache() -> Optional[QuestionCache]:
+    """knowledge 의도 /api/chat용 캐시. QUESTION_CACHE_ENABLED=false면 None."""
+    global _knowledge_cache
+    if not QUESTION_CACHE_ENABLED:
+        return None
+    if _knowledge_cache is None:
+        _knowledge_cache = QuestionCache("chat-knowledge", version=get_prompt_registry().cache_version("chat-knowledge"))
+    return _knowledge_cache
@@ -0,0 +1,110 @@
+"""이름 붙은 TTL 응답 캐시 — interview-start, suggest-phases 등 컨텍스트만으로 결정되는 응답용
+
+- 항목별 TTL(워밍업 항목은 길게), 최대 크기 초과 시 가장 오래된 항목부터 제거
+- 만료 시각은 벽시계(time.time()) 기준이라 스냅샷 파일로 다른 프로세스에 넘길 수 있다
+- 조회 결과는 metrics.record_cache로 적중/미스가 집계된다
+- 항목은 shared_state 저장소("cache:<이름>" 네임스페이스)에 있어 SHARED_STATE_BACKEND=sqlite면
+  모든 워커가 같은 캐시를 읽고 쓴다 (한 워커가 데우면 전체가 적중)
+- version(응답을 만든 프롬프트 템플릿 해시, prompt_registry.cache_version)을 키 앞에 붙인다.
+  템플릿이 바뀐 배포에서는 이전 항목(스냅샷·공유 저장소 포함)이 적중하지 않고 TTL로 사라진다
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Optional
+
+try:
+    from .metrics import record_cache
+    from .shared_state import get_store
+except ImportError:
+    from metrics import record_cache
+    from shared_state import get_store
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "5000"))
+
+
+class ResponseCache:
+    def __init__(self, name: str, ttl: float, maxsize: int = RESPONSE_CACHE_MAXSIZE, version: str = ""):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.version = version
+        self._ns = f"cache:{name}"
+        self._store = get_store()
+
+    def _key(self, key: str) -> str:
+        return f"{self.version}|{key}" if self.version else key
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._store.get(self._ns, self._key(key))
+        record_cache(self.name, value is not None)
+        return value
+
+    def remaining_ttl(self, key: str) -> float:
+        """남은 유효 시간(초). 없거나 만료면 0. 메트릭에는 집계하지 않는다 (워밍업 건너뛰기 판단용)."""
+        expires_at = self._store.expires_at(self._ns, self._key(key))
+        return max(0.0, expires_at - time.time()) if expires_at else 0.0
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._store.set(self._ns, self._key(key), value, ttl=self.ttl if ttl is None else ttl)
+        self._store.trim(self._ns, self.maxsize)
+
+    def __len__(self) -> int:
+        return self._store.count(self._ns)
+
+    def snapshot(self) -> list[dict]:
+        return [{"key": k, "expiresAt": exp, "value": v} for k, v, exp in self._store.items(self._ns)]
+
+    def restore(self, entries: list[dict]) -> int:
+        now = time.time()
+        loaded = 0
+        for e in entries:
+            if e.get("expiresAt", 0) > now and "key" in e:
+                self._store.set(self._ns, e["key"], e.get("value"), expires_at=e["expiresAt"])
+                loaded += 1
+        return loaded
+
+
+_CACHES: dict[str, ResponseCache] = {}
+
+
+def get_cache(name: str, ttl: float, version: str = "") -> ResponseCache:
+    cache = _CACHES.get(name)
+    if cache is None:
+        cache = _CACHES[name] = ResponseCache(name, ttl, version=version)
+    return cache
+
+
+def save_snapshot(path: str) -> int:
+    data = {name: cache.snapshot() for name, cache in _CACHES.items()}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"savedAt": time.time(), "caches": data}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return sum(len(v) for v in data.values())
+
+
+def load_snapshot(path: str) -> int:
+    """스냅샷 파일의 유효 항목을 캐시에 적재. 파일이 없거나 깨졌으면 0."""
+    if not path or not os.path.exists(path):
+        return 0
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        logger.warning(f"캐시 스냅샷 로드 실패 ({path}): {e}")
+        return 0
+    loaded = 0
+    for name, entries in (data.get("caches") or {}).items():
+        cache = _CACHES.get(name)
+        if cache is not None:
+            loaded += cache.restore(entries)
+    logger.info(f"캐시 스냅샷 적재: {loaded}건 ({path})")
+    return loaded
+
+
+def get_cache_status() -> dict:
+    return {name: {"entries": len(cache), "ttl": cache.ttl, "version": cache.version} for name, cache in _CACHES.items()}
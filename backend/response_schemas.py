@@ -0,0 +1,151 @@
+"""엔드포인트별 응답 JSON 스키마 — 스키마 유도 디코딩(guided decoding)용
+
+지금까지는 프롬프트의 "응답 형식 (JSON)" 예시에만 기대서 모델이 형식을 지키기를 바랐다.
+코드블록·<think>·앞뒤 설명이 섞이면 _parse_llm_content가 정규식으로 건져내고, 그래도 깨지면
+생성 전체를 다시 돌렸다(재시도 최대 3회 + curl 폴백). 이 모듈은 prompt_templates의 응답 형식을
+JSON 스키마로 옮겨 두고, 서버가 지원하면 요청에 실어 디코딩 단계에서 형식을 강제하게 한다.
+
+- 스키마는 call_llm의 endpoint 라벨 기준 (prompt_registry.ENDPOINT_TEMPLATES와 같은 이름)
+- 모드: json_schema(OpenAI 호환 response_format), guided_json(구버전 vLLM 확장 파라미터),
+  json_object(스키마 없이 JSON만 강제), off(보내지 않음 — 기존 동작)
+- 어떤 모드를 쓸지는 llm_service가 정한다 (LLM_SCHEMA_MODE, auto면 기동 시 1회 확인)
+- 템플릿의 응답 형식을 바꾸면 여기 스키마도 함께 고친다 — 다르면 모델이 프롬프트와 스키마 사이에서 헤맨다
+"""
+from typing import Optional
+
+SCHEMA_MODES = ("json_schema", "guided_json", "json_object", "off")
+
+_STR = {"type": "string"}
+_STR_LIST = {"type": "array", "items": _STR}
+_NODE_ID = {"type": ["string", "null"]}
+_LEVEL = {"type": "string", "enum": ["high", "medium", "low"]}
+
+_SUGGESTION = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": ["ADD", "MODIFY", "DELETE"]},
+        "type": {"type": "string", "enum": ["PROCESS", "DECISION", "END", "START", "SUBPROCESS"]},
+        "summary": _STR,
+        "labelSuggestion": _STR,
+        "newLabel": _STR,
+        "insertAfterNodeId": _NODE_ID,
+        "targetNodeId": _NODE_ID,
+        "reason": _STR,
+    },
+    "required": ["action", "summary"],
+}
+
+# REVIEW_SYSTEM / COACH_TEMPLATE / KNOWLEDGE_PROMPT / FLOW_OVERVIEW_SYSTEM 공통 형태
+_COACH = {
+    "type": "object",
+    "properties": {
+        "speech": _STR,
+        "suggestions": {"type": "array", "items": _SUGGESTION},
+        "quickQueries": _STR_LIST,
+    },
+    "required": ["speech", "suggestions", "quickQueries"],
+}
+
+_CONTEXTUAL_SUGGEST = {
+    "type": "object",
+    "properties": {"guidance": _STR, "tone": _STR, "quickQueries": _STR_LIST},
+    "required": ["guidance", "quickQueries"],
+}
+
+_FIRST_SHAPE = {
+    "type": "object",
+    "properties": {
+        "greeting": _STR,
+        "processFlowExample": _STR,
+        "guidanceText": _STR,
+        "suggestions": {"type": "array", "items": _SUGGESTION},
+        "quickQueries": _STR_LIST,
+    },
+    "required": ["greeting", "suggestions", "quickQueries"],
+}
+
+_PDD_ANALYSIS = {
+    "type": "object",
+    "properties": {
+        "recommendations": {"type": "array", "items": {
+            "type": "object",
+            "properties": {"nodeId": _STR, "nodeLabel": _STR, "suggestedCategory": _STR, "reason": _STR,
+                           "confidence": _LEVEL},
+            "required": ["nodeId", "suggestedCategory"],
+        }},
+        "summary": _STR,
+    },
+    "required": ["recommendations", "summary"],
+}
+
+
+def _step_items(**props) -> dict:
+    return {"type": "array", "items": {"type": "object", "properties": props, "required": list(props)}}
+
+
+_PDD_INSIGHTS = {
+    "type": "object",
+    "properties": {
+        "summary": _STR,
+        "inefficiencies": _step_items(step=_STR, issue=_STR, impact=_LEVEL),
+        "digitalWorker": _step_items(step=_STR, reason=_STR, type={"type": "string", "enum": ["RPA", "AI", "Chatbot"]}),
+        "sscCandidates": _step_items(step=_STR, reason=_STR),
+        "redesign": _step_items(suggestion=_STR, benefit=_STR),
+    },
+    "required": ["summary", "inefficiencies", "digitalWorker", "sscCandidates", "redesign"],
+}
+
+# CATEGORIZE_PROMPT / SUGGEST_PHASES_SYSTEM은 배열을 최상위로 요구한다 (엔드포인트도 배열을 기대)
+_CATEGORIZE = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "nodeId": _STR,
+            "suggestedCategory": {"type": "string",
+                                  "enum": ["as_is", "digital_worker", "ssc_transfer", "delete_target"]},
+            "confidence": _LEVEL,
+            "reasoning": _STR,
+        },
+        "required": ["nodeId", "suggestedCategory", "confidence", "reasoning"],
+    },
+}
+
+_SUGGEST_PHASES = {"type": "array", "items": _STR, "minItems": 2, "maxItems": 6}
+
+RESPONSE_SCHEMAS: dict[str, dict] = {
+    "review": _COACH,
+    "chat": _COACH,
+    "flow-overview": _COACH,
+    "interview-start": _COACH,
+    "contextual-suggest": _CONTEXTUAL_SUGGEST,
+    "first-shape-welcome": _FIRST_SHAPE,
+    "analyze-pdd": _PDD_ANALYSIS,
+    "pdd-insights": _PDD_INSIGHTS,
+    "categorize-nodes": _CATEGORIZE,
+    "suggest-phases": _SUGGEST_PHASES,
+}
+
+
+def get_response_schema(endpoint: str) -> Optional[dict]:
+    return RESPONSE_SCHEMAS.get(endpoint)
+
+
+def schema_params(schema: dict, mode: str, name: str = "response") -> dict:
+    """chat/completions 요청에 더할 파라미터. off이거나 모르는 모드면 빈 dict."""
+    if mode == "json_schema":
+        return {"response_format": {"type": "json_schema",
+                                    "json_schema": {"name": name.replace("-", "_"), "schema": schema}}}
+    if mode == "guided_json":
+        return {"guided_json": schema}
+    if mode == "json_object" and schema.get("type") == "object":  # json_object는 최상위 배열을 허용하지 않는다
+        return {"response_format": {"type": "json_object"}}
+    return {}
+
+
+def response_format_params(endpoint: str, mode: str) -> dict:
+    """엔드포인트 스키마를 모드에 맞는 요청 파라미터로. 스키마가 없는 엔드포인트면 빈 dict."""
+    schema = RESPONSE_SCHEMAS.get(endpoint)
+    if schema is None:
+        return {}
+    return schema_params(schema, mode, endpoint)
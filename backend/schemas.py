@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Any, Optional
 
 
 class FlowNode(BaseModel):
@@ -24,7 +24,13 @@ class FlowEdge(BaseModel):
     targetHandle: Optional[str] = None
 
 
-class ReviewRequest(BaseModel):
+# 플로우 목록을 받는 요청 모델. wire_format.FlowIngestRoute가 본문을 직접 디코딩한 인스턴스를 넘기므로
+# FastAPI가 인스턴스를 다시 검증하지 않도록 명시한다 (pydantic 기본값이지만 라우트가 이 설정에 기대고 있다).
+class _FlowRequest(BaseModel):
+    model_config = ConfigDict(revalidate_instances="never")
+
+
+class ReviewRequest(_FlowRequest):
     currentNodes: list[FlowNode]
     currentEdges: list[FlowEdge]
     userMessage: str = ""
@@ -32,7 +38,11 @@ class ReviewRequest(BaseModel):
     swimLaneLabels: list[str] = []
 
 
-class ChatRequest(BaseModel):
+class AnalyzeAllRequest(ReviewRequest):
+    parts: list[str] = ["review", "pddInsights", "analyzePdd"]
+
+
+class ChatRequest(_FlowRequest):
     message: str
     context: dict
     currentNodes: list[FlowNode] = []
@@ -43,20 +53,107 @@ class ChatRequest(BaseModel):
 
 
 class ValidateL7Request(BaseModel):
+    # 라벨 하나만 검사하므로 플로우 전체(currentNodes/currentEdges)는 받지 않는다 — 보내도 무시됨
     nodeId: str
     label: str
     nodeType: str
     context: dict
-    currentNodes: list[FlowNode] = []
-    currentEdges: list[FlowEdge] = []
 
 
-class ContextualSuggestRequest(BaseModel):
+class ContextualSuggestRequest(_FlowRequest):
     context: dict
     currentNodes: list[FlowNode] = []
     currentEdges: list[FlowEdge] = []
+    # 같은 세션의 이전 contextual-suggest를 취소하는 데 쓴다 (X-Session-Id 헤더가 우선)
+    sessionId: Optional[str] = None
 
 
-class CategorizeNodesRequest(BaseModel):
+class CategorizeNodesRequest(_FlowRequest):
     context: dict
     nodes: list[FlowNode]
+
+
+class JobSubmitRequest(BaseModel):
+    # kind별 요청 본문 — 하나면 payload, 여러 플로우(L4 전체 등)를 한 작업으로 돌리려면 payloads
+    kind: str
+    payload: Optional[dict] = None
+    payloads: list[dict] = []
+
+
+# ── 응답 모델 (형태가 고정된 엔드포인트) ──
+# LLM이 덧붙이는 필드도 그대로 내보내도록 extra="allow", 값이 없는 선택 필드는 exclude_unset으로 생략한다.
+class _OpenModel(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True, coerce_numbers_to_str=True)
+
+
+class L7Issue(_OpenModel):
+    ruleId: str
+    severity: str
+    friendlyTag: str = ""
+    message: str = ""
+    suggestion: str = ""
+    reasoning: str = ""
+
+
+class ValidateL7Response(_OpenModel):
+    pass_: bool = Field(alias="pass")
+    score: int
+    confidence: str
+    issues: list[L7Issue]
+    rewriteSuggestion: Optional[str] = None
+    encouragement: str = ""
+
+
+# review·categorize-nodes 응답은 LLM 출력을 그대로 담는다. 형식이 어긋난 값(null, 문자열 대신 배열 등)으로
+# 검증이 실패하면 응답 전체가 500이 되므로, 아래 필드는 거절하지 않고 기본값·문자열로 맞춘다.
+def _as_text(value, default: str = "") -> str:
+    if value is None or isinstance(value, (dict, list)):
+        return default
+    return str(value)
+
+
+class ReviewResponse(_OpenModel):
+    speech: str = ""
+    suggestions: list[dict[str, Any]] = []
+    quickQueries: list[Any] = []
+
+    @field_validator("speech", mode="before")
+    @classmethod
+    def _speech(cls, v):
+        return _as_text(v)
+
+    @field_validator("suggestions", mode="before")
+    @classmethod
+    def _suggestions(cls, v):
+        return [item for item in v if isinstance(item, dict)] if isinstance(v, list) else []
+
+    @field_validator("quickQueries", mode="before")
+    @classmethod
+    def _quick_queries(cls, v):
+        return [q for q in v if q is not None] if isinstance(v, list) else []
+
+
+class NodeCategorization(_OpenModel):
+    nodeId: str
+    category: Optional[str] = None
+    confidence: str = "medium"
+    reasoning: str = ""
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def _category(cls, v):
+        return _as_text(v) or None
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _confidence(cls, v):
+        return _as_text(v) or "medium"
+
+    @field_validator("reasoning", mode="before")
+    @classmethod
+    def _reasoning(cls, v):
+        return _as_text(v)
+
+
+class CategorizeNodesResponse(_OpenModel):
+    categorizations: list[NodeCategorization] = []
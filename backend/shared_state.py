@@ -0,0 +1,320 @@
+"""워커 간 공유 상태 저장소 — circuit breaker, LLM 가용성, 응답 캐시
+
+uvicorn --workers N으로 띄우면 워커마다 breaker 카운터·LLM 확인 결과·캐시가 따로 놀아
+N개 워커가 각자 LLM을 확인하고, 각자 실패를 세고, 각자 캐시를 데운다.
+이 저장소를 쓰면 배포 전체가 하나처럼 차단·복구·캐시한다.
+
+SHARED_STATE_BACKEND:
+  memory  프로세스 내 dict (기본, 단일 워커)
+  sqlite  로컬 SQLite 파일 하나(WAL)를 같은 호스트의 모든 워커가 공유 — 외부 서비스 불필요
+
+- 값은 JSON으로 직렬화할 수 있어야 한다. 항목마다 만료 시각(벽시계)을 둘 수 있다.
+- update()는 읽기-수정-쓰기를 원자적으로 수행한다 (sqlite: BEGIN IMMEDIATE로 워커 간 직렬화).
+- 모든 연산은 동기이고 이벤트 루프에서 바로 호출된다. 그래서 sqlite 잠금 대기는
+  SHARED_STATE_BUSY_TIMEOUT(기본 50ms)까지만 하고, 넘으면 그 연산은 프로세스 내 저장소로 대신한다
+  (그동안은 워커별 상태 — 차단·캐시가 잠시 워커마다 따로 논다). 임대는 대신하지 않고 획득 실패로 본다.
+- 기본 파일 위치는 backend 디렉터리 (공용 /tmp에 두면 다른 사용자가 미리 만들어 두거나 내용을 바꿀 수 있다).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    from .metrics import Counter
+except ImportError:
+    from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "memory").lower()
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", str(Path(__file__).resolve().parent / "shared_state.sqlite3"))
+SHARED_STATE_TRIM_EVERY = int(os.getenv("SHARED_STATE_TRIM_EVERY", "64"))  # sqlite: set N회마다 크기 제한 적용
+# sqlite 잠금 대기 상한(초). 이벤트 루프를 막는 시간이므로 짧게 — 넘으면 프로세스 내 저장소로 대신한다
+SHARED_STATE_BUSY_TIMEOUT = float(os.getenv("SHARED_STATE_BUSY_TIMEOUT", "0.05"))
+
+SHARED_STATE_FALLBACKS = Counter("shared_state_fallbacks_total",
+                                 "SQLite shared-state operations served by the in-process store because the database was busy",
+                                 ("op",))
+
+
+class MemoryStore:
+    """프로세스 내 저장소. 네임스페이스별 OrderedDict(삽입/갱신 순) — 크기 제한 시 오래된 것부터 제거."""
+    backend = "memory"
+
+    def __init__(self):
+        self._data: dict[str, OrderedDict[str, tuple[Optional[float], Any]]] = {}
+
+    def _ns(self, ns: str) -> OrderedDict:
+        data = self._data.get(ns)
+        if data is None:
+            data = self._data[ns] = OrderedDict()
+        return data
+
+    def _live(self, ns: str, key: str, now: float) -> Optional[tuple[Optional[float], Any]]:
+        data = self._ns(ns)
+        entry = data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= now:
+            del data[key]
+            return None
+        return entry
+
+    def get(self, ns: str, key: str, default: Any = None) -> Any:
+        entry = self._live(ns, key, time.time())
+        return default if entry is None else entry[1]
+
+    def expires_at(self, ns: str, key: str) -> Optional[float]:
+        entry = self._live(ns, key, time.time())
+        return entry[0] if entry else None
+
+    def set(self, ns: str, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        data = self._ns(ns)
+        data[key] = (expires_at if expires_at is not None else (time.time() + ttl if ttl is not None else None), value)
+        data.move_to_end(key)
+
+    def delete(self, ns: str, key: str) -> None:
+        self._ns(ns).pop(key, None)
+
+    def update(self, ns: str, key: str, fn: Callable[[Any], tuple[Any, Any]], ttl: Optional[float] = None,
+               local_fallback: bool = True) -> Any:
+        """fn(현재값 또는 None) → (새 값, 반환값). 새 값이 None이면 삭제. local_fallback은 SQLiteStore용."""
+        entry = self._live(ns, key, time.time())
+        new_value, result = fn(None if entry is None else entry[1])
+        if new_value is None:
+            self.delete(ns, key)
+        else:
+            self.set(ns, key, new_value, ttl=ttl, expires_at=None if ttl is not None or entry is None else entry[0])
+        return result
+
+    def items(self, ns: str) -> list[tuple[str, Any, Optional[float]]]:
+        now = time.time()
+        return [(k, v, exp) for k, (exp, v) in self._ns(ns).items() if exp is None or exp > now]
+
+    def count(self, ns: str) -> int:
+        return len(self._ns(ns))
+
+    def trim(self, ns: str, maxsize: int) -> None:
+        data = self._ns(ns)
+        while len(data) > maxsize:
+            data.popitem(last=False)
+
+    def status(self) -> dict:
+        return {"backend": self.backend, "namespaces": {ns: len(d) for ns, d in sorted(self._data.items())}}
+
+
+class SQLiteStore:
+    """로컬 SQLite 파일 공유 저장소. 프로세스마다 연결 1개(+스레드 락), fork 후에는 다시 연결한다.
+
+    잠금을 SHARED_STATE_BUSY_TIMEOUT 안에 못 얻은 연산은 _fallback(MemoryStore)이 대신 처리한다.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._sets = 0
+        self._fallback = MemoryStore()
+        self._warned_at = 0.0
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=SHARED_STATE_BUSY_TIMEOUT, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS kv (ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                         "expires_at REAL, updated_at REAL NOT NULL, PRIMARY KEY (ns, key))")
+            conn.execute("CREATE INDEX IF NOT EXISTS kv_ns_updated ON kv (ns, updated_at)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _local(self, op: str, err: sqlite3.OperationalError) -> MemoryStore:
+        SHARED_STATE_FALLBACKS.inc(op=op)
+        now = time.monotonic()
+        if now - self._warned_at >= 60:  # 잠금 경합이 이어지면 분당 1회만 기록
+            self._warned_at = now
+            logger.warning(f"공유 상태 저장소 잠김 ({op}: {err}) — 프로세스 내 저장소로 대신함")
+        return self._fallback
+
+    def _row(self, conn, ns: str, key: str, now: float):
+        row = conn.execute("SELECT value, expires_at FROM kv WHERE ns = ? AND key = ?", (ns, key)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        return row
+
+    def _write(self, conn, ns: str, key: str, value: Any, expires_at: Optional[float], now: float) -> None:
+        conn.execute("INSERT INTO kv (ns, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+                     "ON CONFLICT (ns, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, "
+                     "updated_at = excluded.updated_at",
+                     (ns, key, json.dumps(value, ensure_ascii=False, separators=(",", ":")), expires_at, now))
+
+    def get(self, ns: str, key: str, default: Any = None) -> Any:
+        try:
+            with self._lock:
+                row = self._row(self._connect(), ns, key, time.time())
+        except sqlite3.OperationalError as e:
+            return self._local("get", e).get(ns, key, default)
+        if row is None:  # 잠겨 있던 동안 프로세스 내 저장소에 쓴 값
+            return self._fallback.get(ns, key, default)
+        return json.loads(row[0])
+
+    def expires_at(self, ns: str, key: str) -> Optional[float]:
+        try:
+            with self._lock:
+                row = self._row(self._connect(), ns, key, time.time())
+        except sqlite3.OperationalError as e:
+            return self._local("expires_at", e).expires_at(ns, key)
+        return row[1] if row else self._fallback.expires_at(ns, key)
+
+    def set(self, ns: str, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        now = time.time()
+        try:
+            with self._lock:
+                self._write(self._connect(), ns, key, value,
+                            expires_at if expires_at is not None else (now + ttl if ttl is not None else None), now)
+                self._sets += 1
+        except sqlite3.OperationalError as e:
+            self._local("set", e).set(ns, key, value, ttl=ttl, expires_at=expires_at)
+
+    def delete(self, ns: str, key: str) -> None:
+        self._fallback.delete(ns, key)
+        try:
+            with self._lock:
+                self._connect().execute("DELETE FROM kv WHERE ns = ? AND key = ?", (ns, key))
+        except sqlite3.OperationalError as e:
+            self._local("delete", e)
+
+    def update(self, ns: str, key: str, fn: Callable[[Any], tuple[Any, Any]], ttl: Optional[float] = None,
+               local_fallback: bool = True) -> Any:
+        """fn(현재값 또는 None) → (새 값, 반환값). 새 값이 None이면 삭제. 워커 간 원자적.
+
+        잠금을 못 얻으면 프로세스 내 저장소에 적용한다. local_fallback=False면 sqlite3.OperationalError를 그대로 올린다.
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    now = time.time()
+                    row = self._row(conn, ns, key, now)
+                    new_value, result = fn(None if row is None else json.loads(row[0]))
+                    if new_value is None:
+                        conn.execute("DELETE FROM kv WHERE ns = ? AND key = ?", (ns, key))
+                    else:
+                        expires_at = now + ttl if ttl is not None else (row[1] if row else None)
+                        self._write(conn, ns, key, new_value, expires_at, now)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.OperationalError as e:
+            if not local_fallback:
+                raise
+            return self._local("update", e).update(ns, key, fn, ttl=ttl)
+        return result
+
+    def items(self, ns: str) -> list[tuple[str, Any, Optional[float]]]:
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT key, value, expires_at FROM kv WHERE ns = ? AND (expires_at IS NULL OR expires_at > ?) "
+                    "ORDER BY updated_at", (ns, time.time())).fetchall()
+        except sqlite3.OperationalError as e:
+            return self._local("items", e).items(ns)
+        return [(k, json.loads(v), exp) for k, v, exp in rows]
+
+    def count(self, ns: str) -> int:
+        try:
+            with self._lock:
+                return self._connect().execute("SELECT COUNT(*) FROM kv WHERE ns = ?", (ns,)).fetchone()[0]
+        except sqlite3.OperationalError as e:
+            return self._local("count", e).count(ns)
+
+    def trim(self, ns: str, maxsize: int) -> None:
+        """만료 항목과 maxsize를 넘는 오래된 항목 제거. 매번 하면 비싸므로 set SHARED_STATE_TRIM_EVERY회마다."""
+        self._fallback.trim(ns, maxsize)
+        if self._sets < SHARED_STATE_TRIM_EVERY:
+            return
+        try:
+            with self._lock:
+                self._sets = 0
+                conn = self._connect()
+                conn.execute("DELETE FROM kv WHERE ns = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                             (ns, time.time()))
+                conn.execute("DELETE FROM kv WHERE ns = ? AND key IN (SELECT key FROM kv WHERE ns = ? "
+                             "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)", (ns, ns, maxsize))
+        except sqlite3.OperationalError as e:
+            self._local("trim", e)  # 다음 주기에 다시 (_sets는 이미 0)
+
+    def status(self) -> dict:
+        try:
+            with self._lock:
+                rows = self._connect().execute("SELECT ns, COUNT(*) FROM kv GROUP BY ns ORDER BY ns").fetchall()
+        except sqlite3.OperationalError as e:
+            rows = []
+            self._local("status", e)
+        return {"backend": self.backend, "path": self.path, "namespaces": dict(rows),
+                "fallback": self._fallback.status()["namespaces"]}
+
+
+_store = None
+
+
+def get_store():
+    """설정된 백엔드의 저장소 (프로세스당 1개). sqlite를 열 수 없으면 memory로 대체한다."""
+    global _store
+    if _store is None:
+        if SHARED_STATE_BACKEND == "sqlite":
+            try:
+                _store = SQLiteStore(SHARED_STATE_PATH)
+                logger.info(f"공유 상태 저장소: sqlite ({SHARED_STATE_PATH})")
+            except sqlite3.Error as e:
+                logger.error(f"공유 상태 저장소 열기 실패 ({SHARED_STATE_PATH}): {e} — 프로세스 내 저장소로 대체")
+                _store = MemoryStore()
+        else:
+            _store = MemoryStore()
+    return _store
+
+
+def _owner() -> str:
+    return f"{os.getpid()}"
+
+
+def acquire_lease(name: str, ttl: float) -> bool:
+    """배포 전체에서 하나만 잡을 수 있는 임대. 보유자가 없거나 만료됐을 때만 가져간다.
+
+    재진입하지 않는다 — 같은 프로세스가 이미 쥐고 있어도 False (예약 워밍업과 기동 워밍업이 겹치지 않게).
+    sqlite가 잠겨 있으면 프로세스 내 저장소로 대신하지 않고 False (다른 워커도 같은 임대를 잡을 수 있게 되므로).
+    만료 시각은 값({"owner", "until"})에 둔다 — 저장소 TTL로 두면 획득에 실패한 쪽의 update가 보유자의
+    임대를 매번 연장해, 보유자가 죽어도 기다리는 워커들이 임대를 영영 살려 둔다.
+    """
+    owner = _owner()
+
+    def take(holder):
+        now = time.time()
+        if isinstance(holder, dict) and holder.get("until", 0) > now:
+            return holder, False
+        return {"owner": owner, "until": now + ttl}, True
+    try:
+        return get_store().update("lease", name, take, local_fallback=False)
+    except sqlite3.OperationalError as e:
+        logger.info(f"임대 획득 보류 ({name}): {e}")
+        return False
+
+
+def release_lease(name: str) -> None:
+    owner = _owner()
+    try:
+        get_store().update("lease", name, lambda holder: (None, None) if isinstance(holder, dict)
+                           and holder.get("owner") == owner else (holder, None),
+                           local_fallback=False)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"임대 반환 실패 ({name}): {e} — TTL 만료 후 풀린다")
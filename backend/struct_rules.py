@@ -0,0 +1,217 @@
+"""플로우 구조 규칙 (S-Rules) — 프론트 utils/structRules.ts의 백엔드 이식
+
+내보낸 플로우 JSON(exportFlow의 nodes/edges dict)을 받아 S-01~S-15를 판정한다.
+판정 조건·메시지·ruleId는 structRules.ts와 같다. 노드별 in/out 연결을 한 번만 모아 두고
+규칙마다 재사용하므로 노드 수백 개 플로우도 O(N+E)에 가깝게 끝난다.
+"""
+from typing import Any, Optional
+
+DEFAULT_LABELS = {"새 태스크", "새 판단", "새 서브프로세스", "New Task"}
+
+
+def _node_type(n: dict) -> str:
+    return n.get("type") or n.get("nodeType") or (n.get("data") or {}).get("nodeType") or "process"
+
+
+def _label(n: dict) -> str:
+    return n.get("label") or (n.get("data") or {}).get("label") or ""
+
+
+def _issue(rule_id: str, message: str, node_ids: Optional[list] = None, edge_ids: Optional[list] = None) -> dict:
+    issue: dict[str, Any] = {"ruleId": rule_id, "severity": "warning", "message": message}
+    if edge_ids is not None:
+        issue["edgeIds"] = edge_ids
+    if node_ids is not None:
+        issue["nodeIds"] = node_ids
+    return issue
+
+
+def _find_cycles(node_ids: list, adjacency: dict) -> list[list]:
+    """structRules.ts의 재귀 DFS와 같은 순서로 사이클(back edge)을 찾는다. 깊은 플로우를 위해 반복문으로."""
+    node_set = set(node_ids)
+    visited: set = set()
+    cycles = []
+    for root in node_ids:
+        if root in visited:
+            continue
+        visited.add(root)
+        path = [root]
+        pos = {root: 0}  # 현재 DFS 스택 위 노드 → path 위치
+        stack = [iter(adjacency.get(root, ()))]
+        while stack:
+            nxt = next(stack[-1], None)
+            if nxt is None:
+                stack.pop()
+                del pos[path.pop()]
+                continue
+            if nxt not in node_set:
+                continue
+            if nxt in pos:
+                cycles.append(path[pos[nxt]:])
+                continue
+            if nxt in visited:
+                continue
+            visited.add(nxt)
+            pos[nxt] = len(path)
+            path.append(nxt)
+            stack.append(iter(adjacency.get(nxt, ())))
+    return cycles
+
+
+def analyze_structure(nodes: list[dict], edges: list[dict], mode: Optional[str] = None) -> list[dict]:
+    """S-Rules 판정 → 이슈 목록 (structRules.ts analyzeStructure와 같은 순서·형식)."""
+    issues = []
+    types = {n["id"]: _node_type(n) for n in nodes}
+    flow_nodes = [n for n in nodes if types[n["id"]] not in ("start", "end")]
+    delete_target_ids = dict.fromkeys(n["id"] for n in nodes if mode == "TO-BE" and n.get("category") == "delete_target")
+
+    out_edges: dict[str, list[dict]] = {}
+    in_count: dict[str, int] = {}
+    for e in edges:
+        out_edges.setdefault(e["source"], []).append(e)
+        in_count[e["target"]] = in_count.get(e["target"], 0) + 1
+    adjacency = {src: [e["target"] for e in es] for src, es in out_edges.items()}
+    out_count = {src: len(es) for src, es in out_edges.items()}
+
+    # S-01: 종료 노드 필수
+    if not any(t == "end" for t in types.values()):
+        issues.append(_issue("S-01", "종료 노드가 없으면 프로세스 범위가 불명확할 수 있어요."))
+
+    # S-02: 빈 라벨 방치
+    default_label_ids = [n["id"] for n in flow_nodes if not _label(n).strip() or _label(n).strip() in DEFAULT_LABELS]
+    if default_label_ids:
+        issues.append(_issue("S-02", f"기본 라벨이 그대로인 단계가 {len(default_label_ids)}개 있어요. 구체적인 라벨로 바꿔주세요.",
+                             default_label_ids))
+
+    # S-03: 고아 노드 — delete_target 제외 (고립이 정상)
+    connected = set(out_count) | set(in_count)
+    orphan_ids = [n["id"] for n in flow_nodes if n["id"] not in connected and n["id"] not in delete_target_ids]
+    if orphan_ids:
+        issues.append(_issue("S-03", f"연결되지 않은 단계 {len(orphan_ids)}개가 있습니다.", orphan_ids))
+
+    # S-04: 흐름 끊김 (나가는 연결 없음) — 고아는 S-03에서 처리
+    no_outgoing_ids = [n["id"] for n in flow_nodes
+                       if types[n["id"]] in ("process", "decision", "subprocess", "parallel")
+                       and n["id"] not in delete_target_ids and n["id"] in connected and n["id"] not in out_count]
+    if no_outgoing_ids:
+        issues.append(_issue("S-04", f"나가는 연결이 없는 단계 {len(no_outgoing_ids)}개가 있어요. 흐름이 끊길 수 있습니다.",
+                             no_outgoing_ids))
+
+    # S-05a: 암묵적 분기 / S-05b: 암묵적 합류
+    implicit_branch_ids = [n["id"] for n in nodes
+                           if types[n["id"]] in ("process", "subprocess", "start") and out_count.get(n["id"], 0) > 1]
+    if implicit_branch_ids:
+        issues.append(_issue("S-05", f"프로세스 노드에서 2개 이상 분기하는 곳이 {len(implicit_branch_ids)}개 있어요. "
+                                     "동시에 진행되는 병렬 작업이라면 병렬(+) 게이트웨이를, 조건에 따라 하나만 실행된다면 "
+                                     "판단(◇) 노드를 사용해 명시적으로 표현해주세요.", implicit_branch_ids))
+    implicit_merge_ids = [n["id"] for n in nodes
+                          if types[n["id"]] in ("process", "subprocess") and in_count.get(n["id"], 0) > 1]
+    if implicit_merge_ids:
+        issues.append(_issue("S-05b", f"프로세스 노드로 2개 이상 흐름이 합류하는 곳이 {len(implicit_merge_ids)}개 있어요. "
+                                      "병렬 작업이 끝나는 합류 지점이라면 병렬(+) Join 게이트웨이를 추가해 명시적으로 닫아주세요.",
+                             implicit_merge_ids))
+
+    # S-06: 중복 연결 (같은 source→target 2개 이상, 첫 번째는 유지)
+    seen_keys: set = set()
+    duplicate_edges = []
+    for e in edges:
+        key = (e["source"], e["target"])
+        if key in seen_keys:
+            duplicate_edges.append(e)
+        seen_keys.add(key)
+    if duplicate_edges:
+        issues.append(_issue("S-06", f"동일한 방향의 중복 연결이 {len(duplicate_edges)}개 있어요.",
+                             list(dict.fromkeys(e["source"] for e in duplicate_edges if e["source"])),
+                             [e["id"] for e in duplicate_edges]))
+
+    decision_ids = [n["id"] for n in nodes if types[n["id"]] == "decision"]
+
+    # S-07: 무의미 판단 (나가는 연결 1개)
+    trivial_ids = [nid for nid in decision_ids if out_count.get(nid, 0) == 1]
+    if trivial_ids:
+        issues.append(_issue("S-07", f"분기 경로가 1개뿐인 판단 노드 {len(trivial_ids)}개가 있어요. "
+                                     "분기가 불필요하다면 프로세스 노드로 변경해보세요.", trivial_ids))
+
+    # S-08: 판단 분기 연결의 조건 라벨 누락
+    unlabeled_edge_ids, unlabeled_node_ids = [], []
+    for nid in decision_ids:
+        outs = out_edges.get(nid, [])
+        if len(outs) >= 2:
+            unlabeled = [e["id"] for e in outs if not (e.get("label") or "").strip()]
+            if unlabeled:
+                unlabeled_edge_ids.extend(unlabeled)
+                unlabeled_node_ids.append(nid)
+    if unlabeled_edge_ids:
+        issues.append(_issue("S-08", f"판단 노드의 분기 연결 {len(unlabeled_edge_ids)}개에 조건 라벨이 없어요. "
+                                     "'Yes/No' 또는 구체적 조건을 적어주세요. 💡 판단 노드에서 새로 연결하면 Yes/No가 자동으로 붙습니다.",
+                             unlabeled_node_ids, unlabeled_edge_ids))
+
+    # S-09: 다중 시작
+    start_ids = [n["id"] for n in nodes if types[n["id"]] == "start"]
+    if len(start_ids) > 1:
+        issues.append(_issue("S-09", f"시작 노드가 {len(start_ids)}개 있어요. 의도된 구조인지 확인해주세요. "
+                                     "일반적으로 프로세스는 시작점이 1개입니다.", start_ids))
+
+    # S-10: 과다 분기 (나가는 연결 4개 이상)
+    excessive_ids = [nid for nid in decision_ids if out_count.get(nid, 0) >= 4]
+    if excessive_ids:
+        issues.append(_issue("S-10", f"분기가 4개 이상인 판단 노드 {len(excessive_ids)}개가 있어요. "
+                                     "중첩 판단으로 분해하면 가독성이 좋아집니다.", excessive_ids))
+
+    # S-11: 모델 복잡도 (시작/종료 제외 50개 초과)
+    if len(flow_nodes) > 50:
+        issues.append(_issue("S-11", f"전체 노드가 {len(flow_nodes)}개로, 50개를 초과했어요. "
+                                     "서브프로세스로 분해하면 관리가 쉬워집니다."))
+
+    # S-12: 탈출 조건 없는 루프 — 사이클 내 모든 노드에서 사이클 밖으로 나가는 연결이 없으면 경고
+    labels = {n["id"]: _label(n) for n in nodes}
+    for cycle in _find_cycles([n["id"] for n in nodes], adjacency):
+        cycle_set = set(cycle)
+        if not any(t not in cycle_set for nid in cycle for t in adjacency.get(nid, ())):
+            cycle_labels = " → ".join(labels[nid] for nid in cycle if labels.get(nid))
+            issues.append(_issue("S-12", f"탈출 조건이 없는 루프가 감지되었어요: {cycle_labels}. "
+                                         "루프 내 판단 노드에 탈출 분기를 추가해주세요.", cycle))
+
+    # S-13: TO-BE 삭제 대상 노드 연결 잔존
+    if mode == "TO-BE" and delete_target_ids:
+        connected_delete_ids = [nid for nid in delete_target_ids if nid in connected]
+        if connected_delete_ids:
+            issues.append(_issue("S-13", f"삭제 대상 셰이프 {len(connected_delete_ids)}개에 연결이 남아 있어요. "
+                                         "삭제 대상은 고립 노드여야 합니다. 연결된 엣지를 제거해주세요.", connected_delete_ids))
+
+    # S-14: 병렬 Split에 대응하는 Join 없음 / degree 불일치, S-15: Join에 선행 Split 없음
+    parallel_ids = [n["id"] for n in nodes if types[n["id"]] == "parallel"]
+    if parallel_ids:
+        parallel_set = set(parallel_ids)
+        matched_join_ids: set = set()
+        for split in (nid for nid in parallel_ids if out_count.get(nid, 0) >= 2):
+            reachable_sets = []
+            for start in adjacency[split]:
+                reachable: dict = {}  # 방문 순서 유지
+                queue, seen, head = [start], set(), 0
+                while head < len(queue):
+                    cur = queue[head]
+                    head += 1
+                    if cur in seen:
+                        continue
+                    seen.add(cur)
+                    if cur in parallel_set and cur != split:
+                        reachable[cur] = True
+                    queue.extend(t for t in adjacency.get(cur, ()) if t not in seen)
+                reachable_sets.append(reachable)
+            join = next((nid for nid in reachable_sets[0] if all(nid in s for s in reachable_sets)), None)
+            if join is None:
+                issues.append(_issue("S-14", "병렬 분기(+) 게이트웨이에 대응하는 합류(Join)가 없어요. "
+                                             "Split/Join은 반드시 쌍으로 사용해야 합니다.", [split]))
+            else:
+                matched_join_ids.add(join)
+                split_out, join_in = out_count[split], in_count.get(join, 0)
+                if split_out != join_in:
+                    issues.append(_issue("S-14", f"병렬 분기(Split)에서 {split_out}개로 나눴지만 합류(Join)로 들어오는 경로가 "
+                                                 f"{join_in}개예요. 쪼갠 수만큼 Join으로 들어와야 합니다.", [split, join]))
+        unmatched_joins = [nid for nid in parallel_ids if in_count.get(nid, 0) >= 2 and nid not in matched_join_ids]
+        if unmatched_joins:
+            issues.append(_issue("S-15", f"병렬 합류(Join) 게이트웨이 {len(unmatched_joins)}개에 대응하는 분기(Split)가 없어요. "
+                                         "Join에는 반드시 선행 Split이 있어야 합니다.", unmatched_joins))
+
+    return issues
@@ -0,0 +1,149 @@
+"""표준 프로세스 응답 캐시 워밍업 — L345 트리 전체
+
+/api/interview-start, /api/suggest-phases 응답은 L4/L5/L6 컨텍스트에만 의존한다.
+표준 L4/L5 조합은 l345_reference.L345_TREE에 모두 있으므로(L6 활동은 프론트의
+processData.ts), 한가한 시간에 미리 생성해 긴 TTL로 캐시에 넣어 두면
+아침 첫 사용자의 20초+ 콜드 호출이 밀리초 단위 캐시 적중으로 바뀐다.
+
+두 가지 실행 방식:
+  1) CLI — 별도 프로세스에서 생성 후 스냅샷 파일로 저장, 서버는 시작 시 적재
+       python warmup.py --concurrency 3 --out warmup_snapshot.json
+  2) 서버 내 작업 — WARMUP_HOUR=3 이면 매일 03시에 백그라운드로 실행 (WARMUP_ON_STARTUP=true면 기동 직후 1회)
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+try:
+    from .l345_reference import L345_TREE
+except ImportError:
+    from l345_reference import L345_TREE
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = Path(__file__).resolve().parent
+WARMUP_SNAPSHOT = os.getenv("WARMUP_SNAPSHOT", str(_BACKEND_DIR / "warmup_snapshot.json"))
+WARMUP_TTL = int(os.getenv("WARMUP_TTL", str(48 * 3600)))
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "3"))
+WARMUP_LEASE_SEC = int(os.getenv("WARMUP_LEASE_SEC", str(6 * 3600)))  # 다중 워커에서 한 워커만 실행 (최대 소요시간)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+WARMUP_L6_SOURCE = os.getenv("WARMUP_L6_SOURCE", str(_BACKEND_DIR.parent / "frontend" / "src" / "data" / "processData.ts"))
+
+
+def _parse_hour(raw: str) -> Optional[int]:
+    """WARMUP_HOUR 해석. 비었거나 0~23 정수가 아니면 None(예약 실행 안 함) — 오타로 기동이 멈추지 않게 경고만 남긴다."""
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        hour = int(raw)
+    except ValueError:
+        hour = -1
+    if not 0 <= hour <= 23:
+        logger.warning(f"WARMUP_HOUR={raw!r}는 0~23 정수가 아님 — 예약 워밍업을 끈다")
+        return None
+    return hour
+
+
+WARMUP_HOUR = _parse_hour(os.getenv("WARMUP_HOUR", ""))  # None = 예약 실행 안 함, 0~23 = 매일 해당 시각
+
+
+def _load_l6_activities(path: str) -> dict[tuple[str, str], list[str]]:
+    """프론트 processData.ts에서 (L4, L5) → [L6 활동] 추출. 파일이 없거나 형식이 다르면 빈 dict."""
+    try:
+        text = Path(path).read_text(encoding="utf-8-sig")
+        start = text.index("=", text.index("hrModules")) + 1  # 타입 표기 HRModule[]의 [] 건너뛰기
+        body = text[text.index("[", start):text.rindex("]") + 1]
+        modules = json.loads(re.sub(r",(\s*[\]}])", r"\1", body))  # 후행 쉼표 허용
+    except Exception:
+        return {}
+    l6_map: dict[tuple[str, str], list[str]] = {}
+    for mod in modules:
+        for l4 in mod.get("l4_list", []):
+            for task in l4.get("tasks", []):
+                l6_map[(l4.get("l4", ""), task.get("l5", ""))] = list(task.get("l6_activities", []))
+    return l6_map
+
+
+def standard_contexts(l6_source: str = WARMUP_L6_SOURCE) -> list[dict]:
+    """워밍업 대상 컨텍스트 목록. L6 목록이 있으면 L6별로, 없으면 L5명을 processName으로 쓴다."""
+    l6_map = _load_l6_activities(l6_source) if l6_source else {}
+    contexts = []
+    for l3, l4_dict in L345_TREE.items():
+        for l4, l5_list in l4_dict.items():
+            for l5 in l5_list:
+                for l6 in l6_map.get((l4, l5)) or [l5]:
+                    contexts.append({"l3": l3, "l4": l4, "l5": l5, "processName": l6})
+    return contexts
+
+
+async def warm_up(tasks: dict[str, Callable[[dict], Awaitable[bool]]], contexts: list[dict],
+                  concurrency: int = WARMUP_CONCURRENCY) -> dict:
+    """contexts × tasks를 동시 concurrency개로 실행. 각 task는 캐시에 넣었으면 True를 반환한다."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    stats = {name: {"ok": 0, "failed": 0} for name in tasks}
+    started = time.perf_counter()
+
+    async def run(name: str, fn, ctx: dict) -> None:
+        async with sem:
+            try:
+                ok = await fn(ctx)
+            except Exception:
+                logger.exception(f"워밍업 실패: {name} {ctx.get('l5')}/{ctx.get('processName')}")
+                ok = False
+            stats[name]["ok" if ok else "failed"] += 1
+
+    await asyncio.gather(*(run(name, fn, ctx) for ctx in contexts for name, fn in tasks.items()))
+    elapsed = time.perf_counter() - started
+    logger.info(f"워밍업 완료: 컨텍스트 {len(contexts)}개, {elapsed:.1f}초, {stats}")
+    return {"contexts": len(contexts), "elapsedSec": round(elapsed, 1), "tasks": stats}
+
+
+def seconds_until_hour(hour: int, now: datetime.datetime = None) -> float:
+    now = now or datetime.datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def run_daily(job: Callable[[], Awaitable], hour: int) -> None:
+    """매일 hour시에 job 실행 (취소될 때까지)."""
+    while True:
+        await asyncio.sleep(seconds_until_hour(hour))
+        try:
+            await job()
+        except Exception:
+            logger.exception("예약 워밍업 실패")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="표준 프로세스 응답 캐시 워밍업 (L345 트리 전체)")
+    parser.add_argument("--concurrency", type=int, default=WARMUP_CONCURRENCY)
+    parser.add_argument("--out", default=WARMUP_SNAPSHOT, help="스냅샷 파일 경로 (서버가 시작 시 적재)")
+    parser.add_argument("--limit", type=int, default=0, help="앞에서부터 N개 컨텍스트만 (점검용)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    import app as backend_app
+
+    async def _run() -> dict:
+        try:
+            return await backend_app.warm_standard_responses(args.concurrency, args.limit)
+        finally:
+            await backend_app.close_http_client()
+
+    stats = asyncio.run(_run())
+    saved = backend_app.save_snapshot(args.out)
+    print(json.dumps({**stats, "saved": saved, "snapshot": args.out}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
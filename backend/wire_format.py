@@ -0,0 +1,207 @@
+"""경량 플로우 요청 수신 — 압축 와이어 포맷 + 슬롯 기반 노드/엣지 디코딩
+
+노드가 수백 개인 요청에서 FastAPI 기본 경로는 json.loads로 dict 트리를 만든 뒤
+pydantic이 노드마다 FlowNode를 다시 만든다(쓰지 않는 position까지).
+플로우 목록(currentNodes/currentEdges/nodes)을 받는 엔드포인트는 이 라우트가 본문을 직접 디코딩한다.
+
+Content-Type별 경로:
+  application/json (기본, 호환)         pydantic model_validate_json 한 번으로 파싱+검증 (dict 트리 생략)
+  application/vnd.flow.columnar+json    열 지향 JSON — nodes/edges를 {"cols": [...], "rows": [[...], ...]}로 전송
+  application/msgpack                   msgpack (msgpack 설치 시) — 본문 구조는 열 지향 JSON과 같다
+
+압축 포맷의 노드/엣지는 LiteNode/LiteEdge(namedtuple)로 만들고 필수 필드(id/type/label, id/source/target)만 확인한다.
+나머지 필드(context, message 등)는 요청 모델로 그대로 검증한다.
+열 지향 대신 일반 객체 배열을 보내도 된다.
+"""
+import json
+import logging
+from collections import namedtuple
+from operator import itemgetter
+from typing import Any
+
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from starlette.requests import Request
+
+try:
+    from .fast_json import FastJSONRoute
+    from .profiling import span
+    from .schemas import FlowEdge, FlowNode
+except ImportError:
+    from fast_json import FastJSONRoute
+    from profiling import span
+    from schemas import FlowEdge, FlowNode
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_JSON = "application/vnd.flow.columnar+json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+# FlowNode/FlowEdge와 같은 속성을 갖는 검증 생략용 경량 구조체 (namedtuple — 생성이 C 수준 tuple 생성 한 번)
+# 노드는 읽기 전용으로만 쓰이므로 불변이어도 된다. 생략된 필드(position 포함)는 None.
+LiteNode = namedtuple("LiteNode", tuple(FlowNode.model_fields), defaults=(None,) * len(FlowNode.model_fields))
+LiteEdge = namedtuple("LiteEdge", tuple(FlowEdge.model_fields), defaults=(None,) * len(FlowEdge.model_fields))
+LiteNode.model_dump = LiteEdge.model_dump = lambda self, **_: self._asdict()
+_REQUIRED = {LiteNode: ("id", "type", "label"), LiteEdge: ("id", "source", "target")}
+
+
+def _flow_fields(model: type[BaseModel]) -> dict[str, type]:
+    """요청 모델에서 list[FlowNode]/list[FlowEdge] 필드 → 경량 클래스."""
+    out = {}
+    for name, field in model.model_fields.items():
+        args = getattr(field.annotation, "__args__", ())
+        if args == (FlowNode,):
+            out[name] = LiteNode
+        elif args == (FlowEdge,):
+            out[name] = LiteEdge
+    return out
+
+
+def _invalid(loc: tuple, item, field: str) -> RequestValidationError:
+    missing = not isinstance(item, dict) or field not in item
+    return RequestValidationError([{"type": "missing" if missing else "string_type", "loc": (*loc, field),
+                                    "msg": "Field required" if missing else "Input should be a valid string",
+                                    "input": item}])
+
+
+def _decode_items(lite_cls: type, raw: Any, loc: tuple) -> list:
+    """열 지향({"cols", "rows"}) 또는 객체 배열 → 경량 구조체 목록. 필수 필드가 문자열이 아니면 RequestValidationError."""
+    fields = lite_cls._fields
+    required = _REQUIRED[lite_cls]
+    if isinstance(raw, dict) and "cols" in raw:
+        cols = list(raw.get("cols") or [])
+        rows = raw.get("rows") or []
+        pad = len(cols)  # 없는 열은 행 끝에 덧붙인 None 자리를 가리킨다
+        pick = itemgetter(*[cols.index(f) if f in cols else pad for f in fields])
+        out = []
+        for i, row in enumerate(rows):
+            if not isinstance(row, list) or len(row) != pad:
+                raise RequestValidationError([{"type": "list_type", "loc": (*loc, "rows", i),
+                                               "msg": f"Row should be a list of {pad} values", "input": row}])
+            out.append(lite_cls._make(pick(row + [None])))
+        for f in required:
+            j = fields.index(f)
+            for i, item in enumerate(out):
+                if type(item[j]) is not str:
+                    raise _invalid((*loc, "rows", i), dict(zip(cols, rows[i])), f)
+        return out
+    if not isinstance(raw, list):
+        raise RequestValidationError([{"type": "list_type", "loc": loc, "msg": "Input should be a valid list", "input": raw}])
+    out = []
+    for i, item in enumerate(raw):
+        if not isinstance(item, dict):
+            raise RequestValidationError([{"type": "dict_type", "loc": (*loc, i), "msg": "Input should be a valid dictionary", "input": item}])
+        for f in required:
+            if type(item.get(f)) is not str:
+                raise _invalid((*loc, i), item, f)
+        out.append(lite_cls._make([item.get(f) for f in fields]))
+    return out
+
+
+def _loads(body: bytes, content_type: str) -> Any:
+    if content_type in MSGPACK_TYPES:
+        return msgpack.unpackb(body, raw=False)
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def decode_compact(model: type[BaseModel], body: bytes, content_type: str) -> BaseModel:
+    """압축 포맷 본문 → 요청 모델. 플로우 목록은 경량 객체로, 나머지 필드는 모델 검증."""
+    try:
+        data = _loads(body, content_type)
+    except Exception as e:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": f"본문 디코딩 실패: {e}", "input": {}}])
+    if not isinstance(data, dict):
+        raise RequestValidationError([{"type": "model_attributes_type", "loc": ("body",), "msg": "Input should be an object", "input": data}])
+    flow_fields = _flow_fields(model)
+    lite = {name: _decode_items(cls, data[name], ("body", name)) for name, cls in flow_fields.items() if name in data}
+    rest = {k: v for k, v in data.items() if k not in lite}
+    try:
+        obj = model.model_validate({**rest, **{name: [] for name in lite}})
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+    # 검증을 마친 모델에 경량 목록을 채운다 (model_copy(update=)는 검증 없이 필드 값만 바꾼다)
+    return obj.model_copy(update=lite) if lite else obj
+
+
+def decode_json(model: type[BaseModel], body: bytes) -> BaseModel:
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        # 깨진 JSON은 FastAPI 기본 경로처럼 원문(bytes)을 응답에 싣지 않는다
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"]),
+                                       **({"input": {}} if err["type"] == "json_invalid" else {})}
+                                      for err in e.errors(include_url=False)])
+
+
+def _media_type(request: Request) -> str:
+    return request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+def _is_compact(content_type: str) -> bool:
+    return content_type == COLUMNAR_JSON or (msgpack is not None and content_type in MSGPACK_TYPES)
+
+
+class DecodedRequest(Request):
+    """본문을 이미 디코딩한 요청. FastAPI는 JSON 본문을 request.json()으로 읽으므로 그 결과로 요청 모델을 돌려준다."""
+
+    def __init__(self, request: Request, body: bytes, parsed: BaseModel):
+        # 압축 포맷(msgpack 등)도 FastAPI가 JSON 본문으로 읽도록 content-type을 맞춘다
+        scope = dict(request.scope)
+        scope["headers"] = [(k, v) for k, v in request.scope["headers"] if k != b"content-type"]
+        scope["headers"].append((b"content-type", b"application/json"))
+        super().__init__(scope, request.receive)
+        self._decoded_body = body
+        self._decoded = parsed
+
+    async def body(self) -> bytes:
+        return self._decoded_body
+
+    async def json(self) -> Any:
+        return self._decoded
+
+
+def _accepts_decoded(model: Any) -> bool:
+    """이 라우트가 맡을 요청 모델인가 — 플로우 목록 필드가 있고, 모델 인스턴스를 다시 검증하지 않는 설정이어야 한다.
+    revalidate_instances가 'never'가 아니면 경량 목록이 다시 FlowNode로 검증되므로 기본 경로에 맡긴다."""
+    return (isinstance(model, type) and issubclass(model, BaseModel) and bool(_flow_fields(model))
+            and model.model_config.get("revalidate_instances", "never") == "never")
+
+
+class FlowIngestRoute(FastJSONRoute):
+    """플로우 목록을 받는 엔드포인트의 본문을 직접 디코딩해 완성된 요청 모델을 FastAPI에 넘긴다.
+
+    DecodedRequest.json()이 요청 모델 인스턴스를 돌려주고, 모델 설정이 revalidate_instances='never'
+    (schemas의 요청 모델이 명시)라 FastAPI의 본문 검증은 인스턴스를 그대로 통과시킨다 — 디코딩은 여기서 한 번만.
+    플로우 필드가 없는 엔드포인트나 multipart 등 다른 본문은 기본 경로 그대로.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        model = getattr(getattr(getattr(self, "body_field", None), "field_info", None), "annotation", None)
+        if not _accepts_decoded(model):
+            return handler
+
+        async def flow_handler(request: Request):
+            content_type = _media_type(request)
+            compact = _is_compact(content_type)
+            if not compact and content_type not in ("", "application/json"):
+                return await handler(request)
+            body = await request.body()
+            if not body:
+                return await handler(request)
+            with span("decode"):
+                parsed = decode_compact(model, body, content_type) if compact else decode_json(model, body)
+            return await handler(DecodedRequest(request, body, parsed))
+
+        return flow_handler
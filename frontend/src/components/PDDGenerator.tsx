@@ -104,16 +104,18 @@ export default function PDDGenerator({ onClose }: { onClose: () => void }) {
     setInsightsLoading(true);
     try {
       const processNodes = nodes.filter(n => ['process', 'decision', 'subprocess'].includes(n.data.nodeType));
-      const r = await fetch(`${API_BASE_URL}/pdd-insights`, {
+      // /analyze-all의 pddInsights 파트만 요청 — 이 화면은 카테고리 추천(analyzePdd)을 쓰지 않으므로 생성도 1회
+      const r = await fetch(`${API_BASE_URL}/analyze-all`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ currentNodes: processNodes.map(n => ({ id: n.id, type: n.data.nodeType, label: n.data.label, category: n.data.category, swimLaneId: n.data.swimLaneId })), currentEdges: edges.map(e => ({ id: e.id, source: e.source, target: e.target, label: e.label })), context: ctx || {} }),
+        body: JSON.stringify({ currentNodes: processNodes.map(n => ({ id: n.id, type: n.data.nodeType, label: n.data.label, category: n.data.category, swimLaneId: n.data.swimLaneId })), currentEdges: edges.map(e => ({ id: e.id, source: e.source, target: e.target, label: e.label })), context: ctx || {}, parts: ['pddInsights'] }),
       });
       if (!r.ok) {
         const errText = await r.text().catch(() => '');
         throw new Error(`HTTP ${r.status}: ${errText.slice(0, 100)}`);
       }
-      const data = await r.json();
+      const all = await r.json();
+      const data = all.pddInsights;
       setInsights(data);
       // 인사이트 저장
       try {
@@ -23,6 +23,9 @@ function debugTrace(event: string, payload?: Record<string, any>) {
   console.debug(`[pm-v5][${now}] ${event}`, payload || {});
 }
 
+// 탭(세션) 식별자 — 백엔드가 같은 세션의 이전 contextual-suggest 생성을 취소하는 데 쓴다
+const SESSION_ID = `${generateId('sess')}-${Math.random().toString(36).slice(2, 8)}`;
+
 interface HistoryEntry { nodes: Node<FlowNodeData>[]; edges: Edge[]; }
 
 function extractBotText(d: any): string {
@@ -891,10 +894,11 @@ export const useStore = create<AppStore>((set, get) => ({
         const { nodes: sn, edges: se } = serialize(nodes, edges);
         debugTrace('contextualSuggest:start', { nodeCount: sn.length, edgeCount: se.length });
         const r = await fetch(`${API_BASE_URL}/contextual-suggest`, {
-          method: 'POST', headers: { 'Content-Type': 'application/json' },
+          method: 'POST', headers: { 'Content-Type': 'application/json', 'X-Session-Id': SESSION_ID },
           body: JSON.stringify({ context: processContext || {}, currentNodes: sn, currentEdges: se }),
         });
         const d = await r.json();
+        if (d.superseded) return; // 더 최근 요청이 있어 이 응답은 버려짐
         debugTrace('contextualSuggest:success', { hasGuidance: !!(d.guidance || d.hint), quickQueries: (d.quickQueries || []).length });
         if (d.guidance || d.quickQueries?.length) {
           addMessage({
@@ -31,6 +31,32 @@ interface ChatActionDeps {
 
 const PLACEHOLDER_LABELS = new Set(['새 태스크', '새 단계', '분기 조건?', '판단 조건', 'L6 프로세스', '하위 절차']);
 
+// SSE 응답을 이벤트 단위로 읽는다 (/chat/stream: provisional → final). ": ping" 주석 줄은 무시.
+async function readEvents(response: Response, onEvent: (event: string, data: any) => void): Promise<void> {
+  if (!response.body) return;
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep = buffer.indexOf('\n\n');
+    while (sep >= 0) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = 'message';
+      const data: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trimStart());
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join('\n')));
+      sep = buffer.indexOf('\n\n');
+    }
+  }
+}
+
 export function createChatActions(set: StoreSet, get: StoreGet, deps: ChatActionDeps) {
   const { generateId, debugTrace, extractBotText, friendlyTag } = deps;
 
@@ -122,7 +148,8 @@ export function createChatActions(set: StoreSet, get: StoreGet, deps: ChatAction
         const recentTurns = buildRecentTurns(get().messages);
         const conversationSummary = buildConversationSummary(get().messages);
         const activeLaneLabels = dividerYs.length > 0 ? swimLaneLabels.slice(0, dividerYs.length + 1) : [];
-        const response = await fetch(`${API_BASE_URL}/chat`, {
+        // 점진 응답: 규칙 기반 코칭(provisional)을 바로 보여주고, LLM 답(final)이 오면 같은 말풍선을 교체
+        const response = await fetch(`${API_BASE_URL}/chat/stream`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({
@@ -141,25 +168,39 @@ export function createChatActions(set: StoreSet, get: StoreGet, deps: ChatAction
           throw new Error(`HTTP ${response.status} ${response.statusText} ${errorText.slice(0, 300)}`);
         }
 
-        const data = await response.json();
-        const validSuggestions = (data.suggestions || []).filter(
-          (suggestion: any) =>
-            suggestion.summary?.trim() || suggestion.newLabel?.trim() || suggestion.labelSuggestion?.trim(),
-        );
-        debugTrace('chat:success', {
-          hasText: !!(data.message || data.speech || data.guidance),
-          suggestions: validSuggestions.length,
-          quickQueries: (data.quickQueries || []).length,
-        });
-
-        addMessage({
-          id: generateId('msg'),
-          role: 'bot',
-          text: extractBotText(data),
-          suggestions: validSuggestions.map((suggestion: any) => ({ action: suggestion.action || 'ADD', ...suggestion })),
-          quickQueries: data.quickQueries || [],
-          timestamp: Date.now(),
+        const botId = generateId('msg');
+        let shown = false;
+        let gotFinal = false;
+        await readEvents(response, (event, data) => {
+          if (event !== 'provisional' && event !== 'final') return;
+          gotFinal = gotFinal || event === 'final';
+          const validSuggestions = (data.suggestions || []).filter(
+            (suggestion: any) =>
+              suggestion.summary?.trim() || suggestion.newLabel?.trim() || suggestion.labelSuggestion?.trim(),
+          );
+          debugTrace(event === 'final' ? 'chat:success' : 'chat:provisional', {
+            hasText: !!(data.message || data.speech || data.guidance),
+            suggestions: validSuggestions.length,
+            quickQueries: (data.quickQueries || []).length,
+            source: data.source,
+          });
+          const message: ChatMessage = {
+            id: botId,
+            role: 'bot',
+            text: extractBotText(data),
+            suggestions: validSuggestions.map((suggestion: any) => ({ action: suggestion.action || 'ADD', ...suggestion })),
+            quickQueries: data.quickQueries || [],
+            timestamp: Date.now(),
+          };
+          if (!shown) {
+            shown = true;
+            addMessage(message);
+          } else {
+            set((state) => ({ messages: state.messages.map((m) => (m.id === botId ? message : m)) }));
+          }
         });
+        // 최종 답 없이 끊겼으면 규칙 코칭이라도 남긴다 — 아무것도 못 받았을 때만 오류 표시
+        if (!gotFinal && !shown) throw new Error('chat stream ended without final event');
       } catch {
         debugTrace('chat:error');
         addMessage({